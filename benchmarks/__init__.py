@@ -0,0 +1 @@
+"""Offline benchmarks of discroid's hot paths, run with `python -m benchmarks`"""
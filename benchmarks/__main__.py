@@ -0,0 +1,62 @@
+"""Runs the benchmarks and prints their results as JSON
+
+    python -m benchmarks [suite ...] [--quick] [--output results.json]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import sys
+import time
+
+import discroid
+
+SUITES = {
+    "gateway": "benchmarks.bench_gateway",
+    "casts": "benchmarks.bench_casts",
+    "dispatch": "benchmarks.bench_dispatch",
+    "rest": "benchmarks.bench_rest",
+    "member_list": "benchmarks.bench_member_list",
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("suites", nargs="*", help=f"the suites to run out of {', '.join(SUITES)}, all of them by default")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, to check that the suites still run")
+    parser.add_argument("--output", help="writes the results to a file instead of stdout")
+    args = parser.parse_args()
+
+    if unknown := [name for name in args.suites if name not in SUITES]:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+
+    report = {
+        "discroid": discroid.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "quick": args.quick,
+        "suites": dict(),
+    }
+
+    for name in args.suites or SUITES:
+        print(f"running {name}", file=sys.stderr)
+        started = time.perf_counter()
+        report["suites"][name] = importlib.import_module(SUITES[name]).run(quick=args.quick)
+        print(f"finished {name} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Construction rate and memory of the casts built for every event"""
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+from discroid.Casts import Message, User
+
+from .harness import measure, memory
+from .payloads import message, state, user
+
+if TYPE_CHECKING:
+    from typing import Callable
+
+
+def bench_construction(cast, payloads: list[dict], *, repeat: int, **options) -> dict:
+    _state = state()
+
+    def run():
+        for payload in payloads:
+            cast(payload, _state, **options)
+
+    result = measure(run, number=1, repeat=repeat)
+    result["objects"] = len(payloads)
+    result["objects_per_second"] = len(payloads) / result["best_seconds"]
+    return result
+
+
+class Unslotted:
+    """Holds the fields of a cast in an instance __dict__, the way the casts did before they used __slots__"""
+
+
+def unslotted(cast):
+    copy = Unslotted()
+    for cls in type(cast).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            name = f"_{cls.__name__}{name}" if name.startswith("__") else name
+            if hasattr(cast, name):
+                setattr(copy, name, getattr(cast, name))
+    return copy
+
+
+def bench_memory(cast, payload: Callable[[int], dict], *, number: int, **options) -> dict:
+    """The bytes per object of 'number' casts kept alive, before (an instance __dict__ and the raw payload) and after"""
+    _state = state()
+    indexes = iter(range(number))
+    after = memory(lambda: cast(payload(next(indexes)), _state, **options), number=number)
+
+    _state = state()
+    indexes = iter(range(number))
+    before_options = {**options, "keep_raw": True} if cast is Message else options
+    before = memory(lambda: unslotted(cast(payload(next(indexes)), _state, **before_options)), number=number)
+
+    return {
+        "number": number,
+        "bytes_per_object": after["bytes_per_object"],
+        "bytes_per_object_before": before["bytes_per_object"],
+        "shallow_bytes": sys.getsizeof(cast(payload(0), _state, **options)),
+        "shallow_bytes_before": sys.getsizeof(copy := unslotted(cast(payload(0), _state, **before_options))) + sys.getsizeof(copy.__dict__),
+        "peak_bytes": after["peak_bytes"],
+    }
+
+
+def run(*, quick: bool = False) -> dict:
+    number = 2000 if quick else 20000
+    objects = 20000 if quick else 1000000
+    repeat = 3 if quick else 5
+
+    users = [user(index) for index in range(number)]
+    messages = [message(index) for index in range(number)]
+
+    return {
+        "user": bench_construction(User, users, repeat=repeat),
+        "user.memory": bench_memory(User, user, number=objects),
+        "message": bench_construction(Message, messages, repeat=repeat),
+        "message.memory": bench_memory(Message, message, number=objects),
+        "message[lazy]": bench_construction(Message, messages, repeat=repeat, lazy=True),
+        "message[lazy].memory": bench_memory(Message, message, number=objects, lazy=True),
+    }
@@ -0,0 +1,99 @@
+"""Routing dispatches through Websocket.socket_loop to listeners and handlers"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from discroid.Dispatcher import Dispatcher
+from discroid.Websocket import Websocket
+
+from .harness import result
+from .payloads import dispatch, state
+
+
+class Exhausted(Exception):
+    pass
+
+
+async def run_loop(payloads: list[dict], *, handlers: int, listeners: int, other_listeners: int, lazy: bool) -> float:
+    loop = asyncio.get_running_loop()
+    dispatcher = Dispatcher(max_concurrency=256, max_queue_size=len(payloads) * max(handlers, 1) + 1)
+    websocket = Websocket(9, dispatcher=dispatcher, lazy_casts=lazy)
+    websocket._state = state(wss=websocket, loop=loop)
+    dispatcher.start(loop)
+
+    async def handler(_):
+        pass
+
+    for _ in range(handlers):
+        websocket.register_handler("MESSAGE_CREATE", func=handler)
+    # listeners that never match, so that every one of them is checked for every event
+    futures = [
+        websocket.register_listner("MESSAGE_CREATE", check=lambda message: False, future=loop.create_future())
+        for _ in range(listeners)
+    ]
+    # pending wait_for calls on the events that aren't dispatched, spread over a hundred of them
+    futures.extend(
+        websocket.register_listner(f"OTHER_EVENT_{index % 100}", check=lambda data: True, future=loop.create_future())
+        for index in range(other_listeners)
+    )
+
+    iterator = iter(payloads)
+
+    async def receive():
+        try:
+            return next(iterator)
+        except StopIteration:
+            raise Exhausted from None
+
+    websocket.receive = receive
+
+    started = time.perf_counter()
+    try:
+        await websocket.socket_loop()
+    except Exhausted:
+        pass
+
+    expected = len(payloads) * handlers
+    while dispatcher.dispatched < expected:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    for future in futures:
+        future.cancel()
+    await dispatcher.close()
+    return elapsed
+
+
+def bench(payloads: list[dict], *, handlers: int, listeners: int, repeat: int, other_listeners: int = 0, lazy: bool = False) -> dict:
+    timings = [
+        asyncio.run(run_loop(payloads, handlers=handlers, listeners=listeners, other_listeners=other_listeners, lazy=lazy))
+        for _ in range(repeat)
+    ]
+
+    _result = result(timings, 1)
+    _result.update(
+        {
+            "events": len(payloads),
+            "handlers": handlers,
+            "listeners": listeners,
+            "other_listeners": other_listeners,
+            "events_per_second": len(payloads) / _result["best_seconds"],
+        }
+    )
+    return _result
+
+
+def run(*, quick: bool = False) -> dict:
+    events = 2000 if quick else 100000
+    repeat = 3 if quick else 5
+    payloads = [dispatch(index) for index in range(events)]
+
+    results = dict()
+    for handlers, listeners in ((0, 0), (1, 0), (10, 0), (1, 100), (10, 1000)):
+        results[f"handlers={handlers},listeners={listeners}"] = bench(payloads, handlers=handlers, listeners=listeners, repeat=repeat)
+    # the listeners of other events are never looked at, however many of them are pending
+    others = 1000 if quick else 10000
+    results[f"handlers=1,listeners=0,other_listeners={others}"] = bench(payloads, handlers=1, listeners=0, other_listeners=others, repeat=repeat)
+    results["handlers=1,listeners=0,lazy"] = bench(payloads, handlers=1, listeners=0, repeat=repeat, lazy=True)
+    return results
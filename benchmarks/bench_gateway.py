@@ -0,0 +1,120 @@
+"""Inflating and decoding gateway frames, per codec and encoding"""
+from __future__ import annotations
+
+import os
+import tempfile
+
+from discroid import ETF
+from discroid.Codec import CODECS, ETFCodec, get_codec
+from discroid.Replay import Recorder, read_recording
+from discroid.Websocket import Websocket
+
+from .harness import measure
+from .payloads import dispatch, member, zlib_stream
+
+
+def bench_decompress(codec_name: str, *, messages: int, repeat: int) -> dict:
+    codec = get_codec(codec_name)
+    payloads = [codec.dumps(dispatch(index)) for index in range(messages)]
+    payloads = [payload.encode("utf-8") if isinstance(payload, str) else payload for payload in payloads]
+    # every tenth message is split across frames, like a large GUILD_CREATE would be
+    frames = zlib_stream(payloads[: messages - messages // 10]) + zlib_stream(payloads[messages - messages // 10 :], max_frame_size=256)
+
+    compressed = sum(len(frame) for frame in frames)
+    inflated = sum(len(payload) for payload in payloads)
+
+    def run():
+        # a fresh socket per run, the zlib context is bound to the stream it inflates
+        websocket = Websocket(9, codec=codec)
+        for frame in frames:
+            websocket.decompress(frame)
+
+    result = measure(run, number=1, repeat=repeat)
+    result.update(
+        {
+            "messages": messages,
+            "frames": len(frames),
+            "compressed_bytes": compressed,
+            "inflated_bytes": inflated,
+            "messages_per_second": messages / result["best_seconds"],
+            "inflated_megabytes_per_second": inflated / result["best_seconds"] / 2**20,
+        }
+    )
+    return result
+
+
+def bench_replay(codec_name: str, *, messages: int, repeat: int) -> dict:
+    """Replays a recorded zlib-stream through read_recording, starting with a READY large enough to span many frames"""
+    codec = get_codec(codec_name)
+    ready = dispatch(0, "READY", {"guilds": [{"id": "800000000000000000", "members": [member(index)["member"] for index in range(2000)]}]})
+    payloads = [codec.dumps(payload) for payload in [ready] + [dispatch(index + 1) for index in range(messages)]]
+    payloads = [payload.encode("utf-8") if isinstance(payload, str) else payload for payload in payloads]
+
+    # the gateway splits large messages across frames, 4096 bytes is what it is usually read in
+    frames = zlib_stream(payloads, max_frame_size=4096)
+    fd, path = tempfile.mkstemp(suffix=".drpl")
+    os.close(fd)
+    try:
+        with Recorder(path) as recorder:
+            for frame in frames:
+                recorder.record(frame)
+
+        def run() -> int:
+            websocket = Websocket(9, codec=codec)
+            return sum(websocket.decompress(frame.data) is not None for frame in read_recording(path))
+
+        assert run() == len(payloads), "the replay did not decode every recorded message"
+        result = measure(run, number=1, repeat=repeat)
+        recording_bytes = os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+    result.update(
+        {
+            "messages": len(payloads),
+            "frames": len(frames),
+            "continuation_frames": len(frames) - len(payloads),
+            "recording_bytes": recording_bytes,
+            "inflated_bytes": sum(len(payload) for payload in payloads),
+            "messages_per_second": len(payloads) / result["best_seconds"],
+        }
+    )
+    return result
+
+
+def bench_decode(codec_name: str, *, messages: int, repeat: int) -> dict:
+    codec = ETFCodec() if codec_name == "etf" else get_codec(codec_name)
+    payloads = [codec.dumps(dispatch(index)) for index in range(messages)]
+
+    def run():
+        for payload in payloads:
+            codec.loads(payload)
+
+    result = measure(run, number=1, repeat=repeat)
+    result.update(
+        {
+            "messages": messages,
+            "bytes": sum(len(payload) for payload in payloads),
+            "messages_per_second": messages / result["best_seconds"],
+        }
+    )
+    return result
+
+
+def run(*, quick: bool = False) -> dict:
+    messages = 1000 if quick else 10000
+    repeat = 3 if quick else 5
+
+    results = dict()
+    for name in CODECS:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        results[f"decompress[{name}]"] = bench_decompress(name, messages=messages, repeat=repeat)
+        results[f"replay[{name}]"] = bench_replay(name, messages=messages, repeat=repeat)
+        results[f"decode[{name}]"] = bench_decode(name, messages=messages, repeat=repeat)
+
+    results["decode[etf]"] = bench_decode("etf", messages=messages, repeat=repeat)
+    results["decode[etf]"]["erlpack"] = ETF.erlpack is not None
+    return results
@@ -0,0 +1,125 @@
+"""Applying a recorded GUILD_MEMBER_LIST_UPDATE stream of a 100k member guild"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import tempfile
+import time
+
+from discroid.MemberList import ChunkedList
+from discroid.Replay import Recorder, load_payloads
+
+from .harness import measure, result
+from .payloads import dispatch, member, state, zlib_stream
+
+GUILD_ID = "800000000000000000"
+RANGE = 100
+
+
+def update(sequence: int, ops: list[dict], members: int) -> dict:
+    data = {
+        "guild_id": GUILD_ID,
+        "id": "everyone",
+        "member_count": members,
+        "online_count": members,
+        "groups": [{"id": "online", "count": members}],
+        "ops": ops,
+    }
+    return dispatch(sequence, "GUILD_MEMBER_LIST_UPDATE", data)
+
+
+def generate(members: int, churn: int, *, seed: int = 0) -> tuple[list[dict], list[dict]]:
+    """The SYNC of every range of the list, followed by moves, updates and resyncs at random positions"""
+    rng = random.Random(seed)
+    items = [{"group": {"id": "online", "count": members}}] + [member(index) for index in range(members)]
+
+    sync = [
+        update(start // RANGE, [{"op": "SYNC", "range": [start, start + RANGE - 1], "items": items[start : start + RANGE]}], members)
+        for start in range(0, len(items), RANGE)
+    ]
+
+    changes = list()
+    for index in range(churn):
+        roll = rng.random()
+        position = rng.randrange(1, members)
+        if roll < 0.6:
+            # a member changing status moves to another position
+            ops = [{"op": "DELETE", "index": position}, {"op": "INSERT", "index": rng.randrange(1, members), "item": member(members + index)}]
+        elif roll < 0.95:
+            ops = [{"op": "UPDATE", "index": position, "item": member(position)}]
+        else:
+            start = position - position % RANGE
+            ops = [
+                {"op": "INVALIDATE", "range": [start, start + RANGE - 1]},
+                {"op": "SYNC", "range": [start, start + RANGE - 1], "items": items[start : start + RANGE]},
+            ]
+        changes.append(update(len(sync) + index, ops, members))
+    return sync, changes
+
+
+def record(path: str, payloads: list[dict]) -> None:
+    with Recorder(path) as recorder:
+        for frame in zlib_stream([json.dumps(payload).encode("utf-8") for payload in payloads]):
+            recorder.record(frame)
+
+
+def bench_replay(sync: list[dict], changes: list[dict], *, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "member_list.drpl")
+        record(path, sync + changes)
+        payloads = [payload["d"] for _, payload in load_payloads(path)]
+
+    sync_payloads, change_payloads = payloads[: len(sync)], payloads[len(sync) :]
+    sync_timings, change_timings = list(), list()
+    for _ in range(repeat):
+        _state = state()
+
+        started = time.perf_counter()
+        for data in sync_payloads:
+            _state.member_lists.apply(data, _state)
+        sync_timings.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for data in change_payloads:
+            _state.member_lists.apply(data, _state)
+        change_timings.append(time.perf_counter() - started)
+
+    ops = sum(len(data["ops"]) for data in change_payloads)
+    member_list = _state.member_lists.get(int(GUILD_ID))
+
+    sync_result = result(sync_timings, len(sync_payloads))
+    sync_result["items_per_second"] = len(member_list) / sync_result["best_seconds"]
+    change_result = result(change_timings, len(change_payloads))
+    change_result["ops"] = ops
+    change_result["ops_per_second"] = ops / change_result["best_seconds"]
+    return {"length": len(member_list), "sync": sync_result, "changes": change_result}
+
+
+def bench_structure(factory, size: int, operations: int, *, repeat: int) -> dict:
+    rng = random.Random(0)
+    positions = [rng.randrange(size) for _ in range(operations)]
+    values = factory(range(size))
+
+    def run():
+        for position in positions:
+            values.insert(position, values.pop(position))
+            values[position]
+
+    _result = measure(run, number=1, repeat=repeat)
+    _result["operations_per_second"] = operations / _result["best_seconds"]
+    return _result
+
+
+def run(*, quick: bool = False) -> dict:
+    members = 10000 if quick else 100000
+    churn = 2000 if quick else 20000
+    repeat = 2 if quick else 3
+
+    sync, changes = generate(members, churn)
+    return {
+        "replay": bench_replay(sync, changes, repeat=repeat),
+        # a move is a pop and an insert, followed by a lookup
+        "moves[chunked_list]": bench_structure(ChunkedList, members, churn, repeat=repeat),
+        "moves[list]": bench_structure(list, members, churn, repeat=repeat),
+    }
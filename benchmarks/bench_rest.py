@@ -0,0 +1,138 @@
+"""The overhead RequestHandler.request adds on top of aiohttp, against a local stub of the REST API"""
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import time
+
+import aiohttp
+from aiohttp import web
+
+from discroid.RequestHandler import RequestHandler
+
+from .harness import result
+from .payloads import message, state, user
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.51 Safari/537.36"
+RATELIMIT_HEADERS = {
+    "X-RateLimit-Limit": "1000000",
+    "X-RateLimit-Remaining": "999999",
+    "X-RateLimit-Reset-After": "60",
+    "X-RateLimit-Bucket": "stub",
+}
+
+
+class Stub:
+    """Answers every request right away with a canned payload"""
+
+    def __init__(self):
+        self.requests: int = 0
+        self.url: str = None
+
+        self.__runner: web.AppRunner = None
+        self.__user: bytes = json.dumps(user(0)).encode("utf-8")
+        self.__message: bytes = json.dumps(message(0)).encode("utf-8")
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/users/{user_id}", self.get_user)
+        app.router.add_get("/channels/{channel_id}", self.get_user)
+        app.router.add_post("/channels/{channel_id}/messages", self.post_message)
+
+        self.__runner = web.AppRunner(app, access_log=None)
+        await self.__runner.setup()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        await web.SockSite(self.__runner, sock).start()
+
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        return self.url
+
+    async def close(self) -> None:
+        await self.__runner.cleanup()
+
+    async def get_user(self, _: web.Request) -> web.Response:
+        self.requests += 1
+        return web.Response(body=self.__user, content_type="application/json", headers=RATELIMIT_HEADERS)
+
+    async def post_message(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await request.read()
+        return web.Response(body=self.__message, content_type="application/json", headers=RATELIMIT_HEADERS)
+
+
+async def timed(coroutine_factory, *, repeat: int) -> list[float]:
+    timings = list()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coroutine_factory()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run_async(*, requests: int, concurrency: int, repeat: int) -> dict:
+    stub = Stub()
+    url = await stub.start()
+
+    http = RequestHandler()
+    http.base_route = url
+    http._state = state(http=http)
+    await http.set_headers(token="token", locale="en-US", user_agent=USER_AGENT)
+
+    results = dict()
+    try:
+        async with aiohttp.ClientSession() as session:
+
+            async def raw_sequential():
+                for _ in range(requests):
+                    async with session.get(f"{url}/users/@me") as response:
+                        json.loads(await response.read())
+
+            async def sequential():
+                for _ in range(requests):
+                    await http.request("GET", "/users/@me")
+
+            async def concurrent():
+                for start in range(0, requests, concurrency):
+                    await asyncio.gather(*(http.request("GET", f"/channels/{index}") for index in range(start, start + concurrency)))
+
+            async def coalesced():
+                for _ in range(0, requests, concurrency):
+                    await asyncio.gather(*(http.request("GET", "/users/@me") for _ in range(concurrency)))
+
+            async def send_message():
+                for _ in range(requests):
+                    await http.send_message(900000000000000000, "benchmark")
+
+            # warm up the connection pools
+            await raw_sequential()
+            await sequential()
+
+            for name, factory in (
+                ("aiohttp.sequential_get", raw_sequential),
+                ("request.sequential_get", sequential),
+                ("request.concurrent_get", concurrent),
+                ("request.coalesced_get", coalesced),
+                ("request.send_message", send_message),
+            ):
+                served = stub.requests
+                _result = result(await timed(factory, repeat=repeat), requests)
+                _result["http_requests_per_run"] = (stub.requests - served) / repeat
+                results[name] = _result
+
+        baseline = results["aiohttp.sequential_get"]["best_seconds"] / requests
+        per_request = results["request.sequential_get"]["best_seconds"] / requests
+        results["request.overhead"] = {
+            "seconds_per_request": per_request - baseline,
+            "ratio": per_request / baseline if baseline else None,
+        }
+    finally:
+        await http.close()
+        await stub.close()
+    return results
+
+
+def run(*, quick: bool = False) -> dict:
+    return asyncio.run(run_async(requests=200 if quick else 2000, concurrency=50, repeat=3 if quick else 5))
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+
+def measure(func: Callable[[], Any], *, number: int, repeat: int = 5) -> dict[str, float]:
+    """Times 'number' calls of func, 'repeat' times, and reports the rate of the best and median runs"""
+    timings = list()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return result(timings, number)
+
+
+def result(timings: list[float], number: int) -> dict[str, float]:
+    best = min(timings)
+    median = statistics.median(timings)
+    return {
+        "number": number,
+        "repeat": len(timings),
+        "best_seconds": best,
+        "median_seconds": median,
+        "ops_per_second": number / best if best else float("inf"),
+        "median_ops_per_second": number / median if median else float("inf"),
+    }
+
+
+def memory(factory: Callable[[], Any], *, number: int) -> dict[str, float]:
+    """The memory allocated per object while keeping 'number' objects built by factory alive"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = [factory() for _ in range(number)]
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del objects
+    return {
+        "number": number,
+        "bytes_per_object": (after - before) / number,
+        "peak_bytes": peak - before,
+    }
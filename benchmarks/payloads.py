@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import random
+import zlib
+
+from discroid.Websocket import OPCODE
+
+
+def user(index: int) -> dict:
+    return {
+        "id": str(100000000000000000 + index),
+        "username": f"user{index}",
+        "discriminator": f"{index % 10000:04}",
+        "avatar": "a" * 32,
+        "public_flags": 0,
+    }
+
+
+def message(index: int, *, channel_id: int = 900000000000000000, users: int = 1000) -> dict:
+    return {
+        "id": str(1000000000000000000 + index),
+        "type": 0,
+        "content": f"message number {index} " + "lorem ipsum dolor sit amet " * random.randint(1, 8),
+        "channel_id": str(channel_id + index % 50),
+        "guild_id": "800000000000000000",
+        "author": user(index % users),
+        "attachments": [],
+        "embeds": [{"title": "embed", "description": "description", "color": 0}] if index % 10 == 0 else [],
+        "mentions": [user((index + 1) % users)] if index % 4 == 0 else [],
+        "mention_roles": [],
+        "mention_everyone": False,
+        "pinned": False,
+        "tts": False,
+        "timestamp": "2022-07-01T00:00:00.000000+00:00",
+        "edited_timestamp": None,
+        "flags": 0,
+        "nonce": str(index),
+    }
+
+
+def member(index: int) -> dict:
+    return {
+        "member": {
+            "user": user(index),
+            "roles": ["700000000000000000"],
+            "nick": None,
+            "joined_at": "2022-07-01T00:00:00.000000+00:00",
+            "presence": {"status": "online", "activities": []},
+        }
+    }
+
+
+def dispatch(index: int, event: str = "MESSAGE_CREATE", data: dict = None) -> dict:
+    return {"op": OPCODE.DISPATCH, "t": event, "s": index + 1, "d": message(index) if data is None else data}
+
+
+def zlib_stream(payloads: list[bytes], *, max_frame_size: int = None) -> list[bytes]:
+    """Deflates the payloads as one zlib-stream, the way the gateway sends them, optionally splitting large messages"""
+    deflater = zlib.compressobj()
+
+    frames = list()
+    for payload in payloads:
+        data = deflater.compress(payload) + deflater.flush(zlib.Z_SYNC_FLUSH)
+        if max_frame_size:
+            frames.extend(data[i : i + max_frame_size] for i in range(0, len(data), max_frame_size))
+        else:
+            frames.append(data)
+    return frames
+
+
+def state(**kwargs):
+    """A client state without a connection, enough to build casts and run the parsers"""
+    from discroid.Cache import EntityCache, MessageCache
+    from discroid.Client import State
+    from discroid.MemberList import MemberLists
+    from discroid.MemberRequests import MemberRequests
+    from discroid.Outbound import OutboundQueue
+
+    defaults = {
+        "wss": None,
+        "http": None,
+        "loop": None,
+        "client": None,
+        "messages": MessageCache(),
+        "entities": EntityCache(),
+        "outbound": OutboundQueue(None),
+        "member_lists": MemberLists(),
+        "member_requests": MemberRequests(),
+    }
+    return State(**{**defaults, **kwargs})
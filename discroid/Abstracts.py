@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+from logging import getLogger
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -9,28 +11,41 @@ if TYPE_CHECKING:
 
     from discroid.Casts import Message
     from discroid.Client import State
+    from discroid.RequestHandler import RequestHandler
+
+logger = getLogger(__name__)
 
 
 class Cast:
     """A class to cast JSON data to a functional python object"""
 
-    pass
+    __slots__ = ()
 
 
 class StateCast(Cast):
     """Represensents a Cast that needs the client state"""
 
+    __slots__ = ("_state",)
+
     _state: State
 
 
+class LazyCast(StateCast):
+    """Represents a StateCast that can defer building its sub casts and optionally keep its raw payload"""
+
+    __slots__ = ()
+
+
 class Messagable(StateCast):
+    __slots__ = ()
+
     id: int
 
     def __eq__(self, __o: object) -> bool:
         return self.id == __o.id if isinstance(__o, Messagable) else False
 
     def typing(self):
-        return Typing(self, self._state)
+        return Typing(self.id, self._state)
 
     async def send(self, *args, **kwargs) -> Message:
         return await self._state.client.send_message(*args, **kwargs)
@@ -39,28 +54,111 @@ class Messagable(StateCast):
 class Typing:
     def __init__(self, id: int, state: State):
         self.id: int = id
-        self.interval: int = 5
 
         self._state: State = state
-        self.__task: Task = None
 
     def __await__(self) -> Generator:
         return self._state.http.trigger_typing(self.id).__await__()
 
     async def __aenter__(self) -> None:
-        def handle_future(future: asyncio.Future):
-            try:
-                future.exception()
-            except (asyncio.CancelledError, Exception):
-                pass
+        self._state.http.typing.acquire(self.id)
 
-        async def worker() -> None:
-            while True:
-                await self._state.http.trigger_typing(self.id)
-                await asyncio.sleep(self.interval)
+    async def __aexit__(self, *args, **kwargs) -> None:
+        self._state.http.typing.release(self.id)
 
-        self.__task = self._state.loop.create_task(worker())
-        self.__task.add_done_callback(handle_future)
 
-    async def __aexit__(self, *args, **kwargs) -> None:
-        self.__task.cancel()
+class TypingManager:
+    """Keeps the typing indicators alive from a single task, nested or concurrent contexts on a channel share one keepalive"""
+
+    def __init__(self, http: RequestHandler, *, interval: float = 5.0):
+        self.interval: float = interval
+
+        self.__http: RequestHandler = http
+        self.__counts: dict[int, int] = dict()
+        self.__due: dict[int, float] = dict()
+        self.__heap: list[tuple[float, int]] = list()
+        self.__wakeup: asyncio.Event = None
+        self.__task: Task = None
+        self.__requests: set[Task] = set()
+
+    @property
+    def channels(self) -> list[int]:
+        return list(self.__counts)
+
+    def acquire(self, channel_id: int) -> None:
+        count = self.__counts.get(channel_id, 0)
+        self.__counts[channel_id] = count + 1
+        if count:
+            return
+
+        loop = asyncio.get_running_loop()
+        due = self.__due[channel_id] = loop.time()
+        heapq.heappush(self.__heap, (due, channel_id))
+
+        if self.__task is None:
+            self.__wakeup = asyncio.Event()
+            self.__task = loop.create_task(self.worker())
+        self.__wakeup.set()
+
+    def release(self, channel_id: int) -> None:
+        count = self.__counts.get(channel_id, 0) - 1
+        if count > 0:
+            self.__counts[channel_id] = count
+        elif self.__counts.pop(channel_id, None) is not None:
+            # its heap entry is now stale, the worker drops it and stops once no channel is left
+            self.__due.pop(channel_id, None)
+            if self.__wakeup is not None:
+                self.__wakeup.set()
+
+    async def worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        heap = self.__heap
+        try:
+            while self.__counts:
+                if len(heap) > 2 * len(self.__due):
+                    # released channels leave their entries behind, rebuilt once they outnumber the live ones
+                    heap[:] = [(due, channel_id) for channel_id, due in self.__due.items()]
+                    heapq.heapify(heap)
+                while heap and self.__due.get(heap[0][1]) != heap[0][0]:
+                    heapq.heappop(heap)
+                if not heap:
+                    break
+
+                due, channel_id = heap[0]
+                delay = due - loop.time()
+                if delay > 0:
+                    self.__wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self.__wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                heapq.heappop(heap)
+                due = self.__due[channel_id] = due + self.interval
+                heapq.heappush(heap, (due, channel_id))
+
+                # a slow request must not hold back the keepalives of the other channels
+                task = loop.create_task(self.trigger(channel_id))
+                self.__requests.add(task)
+                task.add_done_callback(self.__requests.discard)
+        finally:
+            self.__task = None
+            heap.clear()
+            self.__due.clear()
+            self.__counts.clear()
+
+    async def trigger(self, channel_id: int) -> None:
+        try:
+            await self.__http.trigger_typing(channel_id)
+        except Exception as exc:
+            logger.debug(f"typing keepalive of channel {channel_id} failed: {exc!r}")
+
+    async def close(self) -> None:
+        tasks = list(self.__requests)
+        if self.__task is not None:
+            tasks.append(self.__task)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, NamedTuple
+
+from discroid.Casts import Guild, TextChannel, User
+
+if TYPE_CHECKING:
+    from typing import Any, Iterator, Optional
+
+    from discroid.Casts import Message
+    from discroid.Client import State
+
+
+class MessageCache:
+    """A size bounded LRU cache of messages, with an index of the latest messages of every channel"""
+
+    def __init__(self, max_size: int = 1000, *, max_per_channel: int = None):
+        self.max_size: int = max_size
+        self.max_per_channel: Optional[int] = max_per_channel
+
+        self.__messages: OrderedDict[int, Message] = OrderedDict()
+        self.__channels: dict[int, deque[int]] = dict()
+
+    def __len__(self) -> int:
+        return len(self.__messages)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self.__messages
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self.__messages.values())
+
+    def get(self, message_id: int) -> Optional[Message]:
+        message = self.__messages.get(message_id)
+        if message is not None:
+            self.__messages.move_to_end(message_id)
+        return message
+
+    def add(self, message: Message) -> None:
+        if not self.max_size:
+            return
+
+        messages = self.__messages
+        if message.id in messages:
+            messages[message.id] = message
+            messages.move_to_end(message.id)
+            return
+
+        index = self.__channels.get(message.channel_id)
+        if index is None:
+            index = self.__channels[message.channel_id] = deque()
+        elif self.max_per_channel and len(index) >= self.max_per_channel:
+            messages.pop(index.popleft(), None)
+
+        messages[message.id] = message
+        index.append(message.id)
+
+        while len(messages) > self.max_size:
+            _, evicted = messages.popitem(last=False)
+            self.__unindex(evicted)
+
+    def remove(self, message_id: int) -> Optional[Message]:
+        message = self.__messages.pop(message_id, None)
+        if message is not None:
+            self.__unindex(message)
+        return message
+
+    def channel(self, channel_id: int) -> list[Message]:
+        """Returns the cached messages of a channel, oldest first"""
+        messages = self.__messages
+        return [messages[message_id] for message_id in self.__channels.get(channel_id, ()) if message_id in messages]
+
+    def clear(self) -> None:
+        self.__messages.clear()
+        self.__channels.clear()
+
+    def __unindex(self, message: Message) -> None:
+        index = self.__channels.get(message.channel_id)
+        if index is None:
+            return
+
+        if index and index[0] == message.id:
+            index.popleft()
+        else:
+            try:
+                index.remove(message.id)
+            except ValueError:
+                pass
+
+        if not index:
+            del self.__channels[message.channel_id]
+
+
+class EntityCache:
+    """Interns users, channels and guilds by their snowflake, so every cast shares and updates a single instance"""
+
+    def __init__(self, *, max_users: int = 10000, max_channels: int = 10000, max_guilds: int = 1000):
+        self.max_users: int = max_users
+        self.max_channels: int = max_channels
+        self.max_guilds: int = max_guilds
+
+        # the least recently stored entities are evicted first, they stay alive for as long as a cast still references them
+        self.__users: OrderedDict[int, User] = OrderedDict()
+        self.__channels: OrderedDict[int, TextChannel] = OrderedDict()
+        self.__guilds: OrderedDict[int, Guild] = OrderedDict()
+
+    @property
+    def users(self) -> list[User]:
+        return list(self.__users.values())
+
+    @property
+    def channels(self) -> list[TextChannel]:
+        return list(self.__channels.values())
+
+    @property
+    def guilds(self) -> list[Guild]:
+        return list(self.__guilds.values())
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        return self.__users.get(user_id)
+
+    def store_user(self, data: dict, state: State) -> User:
+        users = self.__users
+        user_id = int(data.get("id"))
+
+        user = users.get(user_id)
+        if user is None:
+            user = users[user_id] = User(data, state)
+            if self.max_users and len(users) > self.max_users:
+                users.popitem(last=False)
+        else:
+            user._update(data)
+            users.move_to_end(user_id)
+        return user
+
+    def get_channel(self, channel_id: int) -> Optional[TextChannel]:
+        return self.__channels.get(channel_id)
+
+    def store_channel(self, data: dict, state: State, *, guild_id: int = None) -> TextChannel:
+        channels = self.__channels
+        channel_id = int(data.get("id"))
+
+        channel = channels.get(channel_id)
+        if channel is None:
+            channel = channels[channel_id] = TextChannel(data, state, guild_id=guild_id)
+            if self.max_channels and len(channels) > self.max_channels:
+                channels.popitem(last=False)
+        else:
+            channel._update(data, guild_id=guild_id)
+            channels.move_to_end(channel_id)
+
+        if channel.guild_id and (guild := self.__guilds.get(channel.guild_id)):
+            guild._add_channel(channel)
+        return channel
+
+    def remove_channel(self, channel_id: int) -> Optional[TextChannel]:
+        channel = self.__channels.pop(channel_id, None)
+        if channel is not None and channel.guild_id and (guild := self.__guilds.get(channel.guild_id)):
+            guild._remove_channel(channel_id)
+        return channel
+
+    def get_guild(self, guild_id: int) -> Optional[Guild]:
+        return self.__guilds.get(guild_id)
+
+    def store_guild(self, data: dict, state: State) -> Guild:
+        guilds = self.__guilds
+        guild_id = int(data.get("id"))
+
+        guild = guilds.get(guild_id)
+        if guild is None:
+            guild = guilds[guild_id] = Guild(data, state)
+            if self.max_guilds and len(guilds) > self.max_guilds:
+                guilds.popitem(last=False)
+        else:
+            guild._update(data)
+            guilds.move_to_end(guild_id)
+
+        for member in data.get("members", list()):
+            if _user := member.get("user"):
+                self.store_user(_user, state)
+        return guild
+
+    def remove_guild(self, guild_id: int) -> Optional[Guild]:
+        guild = self.__guilds.pop(guild_id, None)
+        if guild is not None:
+            for channel in guild.channels:
+                self.__channels.pop(channel.id, None)
+        return guild
+
+    def clear(self) -> None:
+        self.__users.clear()
+        self.__channels.clear()
+        self.__guilds.clear()
+
+
+class CachedResponse(NamedTuple):
+    expires_at: float
+    etag: Optional[str]
+    data: Any
+
+
+class ResponseCache:
+    """A short lived cache of GET responses, expired entries with an ETag are revalidated instead of refetched"""
+
+    def __init__(self, ttl: float = 5.0, *, max_size: int = 512):
+        self.ttl: float = ttl
+        self.max_size: int = max_size
+
+        self.__responses: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__responses)
+
+    def get(self, route: str) -> Optional[CachedResponse]:
+        response = self.__responses.get(route)
+        if response is not None:
+            self.__responses.move_to_end(route)
+        return response
+
+    def is_fresh(self, response: CachedResponse) -> bool:
+        return time.monotonic() < response.expires_at
+
+    def add(self, route: str, data: Any, *, etag: str = None) -> None:
+        responses = self.__responses
+        responses[route] = CachedResponse(time.monotonic() + self.ttl, etag, data)
+        responses.move_to_end(route)
+
+        while len(responses) > self.max_size:
+            responses.popitem(last=False)
+
+    def remove(self, route: str) -> None:
+        self.__responses.pop(route, None)
+
+    def clear(self) -> None:
+        self.__responses.clear()
@@ -1,5 +1,21 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from discroid.Abstracts import Cast
 
+if TYPE_CHECKING:
+    from typing import Optional
+
 
 class Embed(Cast):
-    pass
+    __slots__ = ("type", "title", "description", "url", "timestamp", "color", "fields")
+
+    def __init__(self, data: dict):
+        self.type: str = data.get("type", "rich")
+        self.title: Optional[str] = data.get("title")
+        self.description: Optional[str] = data.get("description")
+        self.url: Optional[str] = data.get("url")
+        self.timestamp: Optional[str] = data.get("timestamp")
+        self.color: Optional[int] = data.get("color")
+        self.fields: list[dict] = data.get("fields", list())
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from discroid.Abstracts import StateCast
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+    from discroid.Client import State
+
+    from .TextChannel import TextChannel
+
+
+class Guild(StateCast):
+    __slots__ = ("id", "name", "icon", "owner_id", "member_count", "large", "unavailable", "__channels")
+
+    def __init__(self, data: dict, state: State):
+        self._state: State = state
+        self.__channels: dict[int, TextChannel] = dict()
+        self._update(data)
+
+    def _update(self, data: dict) -> None:
+        if properties := data.get("properties"):
+            # user accounts receive the guild fields nested depending on the capabilities
+            data = {**properties, **data}
+
+        self.id: int = int(data.get("id"))
+        self.name: Optional[str] = data.get("name")
+        self.icon: Optional[str] = data.get("icon")
+        self.owner_id: Optional[int] = int(x) if (x := data.get("owner_id")) else None
+        self.member_count: Optional[int] = data.get("member_count")
+        self.large: bool = data.get("large", False)
+        self.unavailable: bool = data.get("unavailable", False)
+
+        if "channels" in data:
+            entities = self._state.entities
+            self.__channels = {
+                channel.id: channel for channel in (entities.store_channel(_channel, self._state, guild_id=self.id) for _channel in data["channels"])
+            }
+
+    @property
+    def channels(self) -> list[TextChannel]:
+        return list(self.__channels.values())
+
+    def get_channel(self, channel_id: int) -> Optional[TextChannel]:
+        return self.__channels.get(channel_id)
+
+    def _add_channel(self, channel: TextChannel) -> None:
+        self.__channels[channel.id] = channel
+
+    def _remove_channel(self, channel_id: int) -> None:
+        self.__channels.pop(channel_id, None)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from discroid.Abstracts import StateCast
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+    from discroid.Client import State
+
+    from .User import User
+
+
+class Member(StateCast):
+    __slots__ = ("guild_id", "user", "nick", "avatar", "roles", "joined_at", "premium_since", "pending", "deaf", "mute", "status")
+
+    def __init__(self, data: dict, state: State, *, guild_id: int = None):
+        self._state: State = state
+        self.guild_id: Optional[int] = guild_id or (int(x) if (x := data.get("guild_id")) else None)
+        self._update(data)
+
+    def _update(self, data: dict) -> None:
+        self.user: User = self._state.entities.store_user(data.get("user"), self._state)
+        self.nick: Optional[str] = data.get("nick")
+        self.avatar: Optional[str] = data.get("avatar")
+        self.roles: list[int] = [int(role_id) for role_id in data.get("roles", list())]
+        self.joined_at: Optional[str] = data.get("joined_at")
+        self.premium_since: Optional[str] = data.get("premium_since")
+        self.pending: bool = data.get("pending", False)
+        self.deaf: bool = data.get("deaf", False)
+        self.mute: bool = data.get("mute", False)
+        # member list items carry the presence of the member
+        self.status: Optional[str] = presence.get("status") if (presence := data.get("presence")) else None
+
+    @property
+    def id(self) -> int:
+        return self.user.id
+
+    @property
+    def display_name(self) -> str:
+        return self.nick or self.user.username
+
+    def __eq__(self, __o: object) -> bool:
+        return isinstance(__o, Member) and self.id == __o.id and self.guild_id == __o.guild_id
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.guild_id))
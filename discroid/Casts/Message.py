@@ -2,13 +2,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, NamedTuple
 
-from discroid.Abstracts import StateCast
+from discroid.Abstracts import LazyCast
 from discroid.Errors import IllegalArgumentError
 from typing_extensions import Self
 
 from .Embed import Embed
 from .Reaction import Emoji, Reaction
-from .Role import Role
 from .TextChannel import ChannelMention, TextChannel
 from .User import User
 
@@ -35,39 +34,154 @@ class MessageReference(NamedTuple):
         return cls(message.guild_id, message.channel_id, message.id)
 
 
-class Message(StateCast):
-    def __init__(self, data: dict, state: State):
+class Message(LazyCast):
+    __slots__ = (
+        "id",
+        "tts",
+        "type",
+        "timestamp",
+        "edited_timestamp",
+        "mention_everyone",
+        "attachemnts",
+        "content",
+        "nonce",
+        "guild_id",
+        "webhook_id",
+        "channel_id",
+        "__raw_data",
+        "__keep_raw",
+        "__author",
+        "__mentions",
+        "__mention_roles",
+        "__mention_channels",
+        "__embeds",
+        "__reactions",
+    )
+
+    def __init__(self, data: dict, state: State, *, lazy: bool = False, keep_raw: bool = False):
         self.id: int = int(data.get("id"))
         self.tts: bool = data.get("tts", False)
         self.type: int = data.get("type")
         self.timestamp: str = data.get("timestamp")
         self.edited_timestamp: Optional[str] = _edited_timestamp if (_edited_timestamp := data.get("edited_timestamp")) else None
 
-        self.author: User = User(data.get("author"), state)
-        self.mentions: list[User] = [User(_user, state) for _user in data.get("mentions", list())]
-        self.mention_roles: list[Role] = [Role(_role) for _role in data.get("mention_roles", list())]
-        self.mention_channels: list[ChannelMention] = [ChannelMention(_mention) for _mention in data.get("mention_channels", list())]
         self.mention_everyone: bool = data.get("mention_everyone", False)
-
-        self.embeds: list[Embed] = [Embed(_embed) for _embed in data.get("embeds", list())]
-        self.reactions: list[Reaction] = [Reaction(_reaction, state) for _reaction in data.get("reactions", list())]
         self.attachemnts: Optional[list] = data.get("attachments")
 
         self.content: str = data.get("content")
+        self.nonce: Optional[str] = str(x) if (x := data.get("nonce")) is not None else None
 
         self.guild_id: Optional[int] = int(x) if (x := data.get("guild_id")) else None
         self.webhook_id: Optional[int] = int(x) if (x := data.get("webhoook_id")) else None
         self.channel_id: int = int(data.get("channel_id"))
 
         self._state: State = state
-        self.__raw_data: dict = data
+        self.__raw_data: Optional[dict] = data
+        self.__keep_raw: bool = keep_raw
+
+        # sub casts are built on first access when lazy, which needs the raw payload to be kept until then
+        self.__author: User = None
+        self.__mentions: list[User] = None
+        self.__mention_roles: list[int] = None
+        self.__mention_channels: list[ChannelMention] = None
+        self.__embeds: list[Embed] = None
+        self.__reactions: list[Reaction] = None
+
+        if not lazy:
+            self._materialize()
+
+    def _update(self, data: dict) -> None:
+        """Applies the partial payload of a MESSAGE_UPDATE"""
+        if "content" in data:
+            self.content = data["content"]
+        if "edited_timestamp" in data:
+            self.edited_timestamp = data["edited_timestamp"] or None
+        if "mention_everyone" in data:
+            self.mention_everyone = data["mention_everyone"]
+        if "attachments" in data:
+            self.attachemnts = data["attachments"]
+
+        if "mentions" in data:
+            self.__mentions = [self._state.entities.store_user(_user, self._state) for _user in data["mentions"]]
+        if "mention_roles" in data:
+            self.__mention_roles = [int(_role) for _role in data["mention_roles"]]
+        if "mention_channels" in data:
+            self.__mention_channels = [ChannelMention(_mention) for _mention in data["mention_channels"]]
+        if "embeds" in data:
+            self.__embeds = [Embed(_embed) for _embed in data["embeds"]]
+        if self.__raw_data is not None:
+            self.__built()
+
+    def _materialize(self) -> None:
+        """Builds every sub cast that has not been accessed yet"""
+        for name in ("author", "mentions", "mention_roles", "mention_channels", "embeds", "reactions"):
+            getattr(self, name)
+
+    def __built(self) -> None:
+        """Drops the raw payload once every sub cast has been built from it, unless it is kept"""
+        if not self.__keep_raw and None not in (
+            self.__author,
+            self.__mentions,
+            self.__mention_roles,
+            self.__mention_channels,
+            self.__embeds,
+            self.__reactions,
+        ):
+            self.__raw_data = None
+
+    @property
+    def author(self) -> User:
+        if self.__author is None:
+            self.__author = self._state.entities.store_user(self.__raw_data.get("author"), self._state)
+            self.__built()
+        return self.__author
+
+    @property
+    def mentions(self) -> list[User]:
+        if self.__mentions is None:
+            self.__mentions = [self._state.entities.store_user(_user, self._state) for _user in self.__raw_data.get("mentions", list())]
+            self.__built()
+        return self.__mentions
+
+    @property
+    def mention_roles(self) -> list[int]:
+        if self.__mention_roles is None:
+            self.__mention_roles = [int(_role) for _role in self.__raw_data.get("mention_roles", list())]
+            self.__built()
+        return self.__mention_roles
+
+    @property
+    def mention_channels(self) -> list[ChannelMention]:
+        if self.__mention_channels is None:
+            self.__mention_channels = [ChannelMention(_mention) for _mention in self.__raw_data.get("mention_channels", list())]
+            self.__built()
+        return self.__mention_channels
+
+    @property
+    def embeds(self) -> list[Embed]:
+        if self.__embeds is None:
+            self.__embeds = [Embed(_embed) for _embed in self.__raw_data.get("embeds", list())]
+            self.__built()
+        return self.__embeds
+
+    @property
+    def reactions(self) -> list[Reaction]:
+        if self.__reactions is None:
+            self.__reactions = [Reaction(_reaction, self._state) for _reaction in self.__raw_data.get("reactions", list())]
+            self.__built()
+        return self.__reactions
 
     def __str__(self) -> str:
         return self.content
 
+    @property
+    def raw_data(self) -> Optional[dict]:
+        """The payload the message was built from, only kept when 'keep_raw' is passed or until a lazy message built its sub casts"""
+        return self.__raw_data
+
     @property
     def channel(self):
-        return TextChannel.from_message(self.__raw_data)
+        return TextChannel.from_message({"channel_id": self.channel_id, "guild_id": self.guild_id}, self._state)
 
     async def reply(self, *args, **kwargs) -> Self:
         return await self._state.client.send_message(self.channel_id, *args, **kwargs, reference=MessageReference.from_message(self))
@@ -86,6 +200,7 @@ class Message(StateCast):
         if not emoji and reaction:
             emoji = reaction.emoji
 
+        if emoji:
             if not emoji_id:
                 emoji_id = emoji.id
             if not emoji_name:
@@ -114,6 +229,7 @@ class Message(StateCast):
         if not emoji and reaction:
             emoji = reaction.emoji
 
+        if emoji:
             if not emoji_id:
                 emoji_id = emoji.id
             if not emoji_name:
@@ -2,20 +2,23 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from discroid.Casts.User import User
-
 if TYPE_CHECKING:
+    from typing import Optional
+
+    from discroid.Casts.User import User
     from discroid.Client import State
 
 
 class Emoji:
+    __slots__ = ("id", "name", "roles", "user", "available", "require_colons", "managed", "animated")
+
     def __init__(self, data: dict, state: State):
         self.id: int = int(x) if (x := data.get("id")) else None
         self.name: str = data.get("name")
 
         if self.id:
             self.roles: list[int] = [int(x) for x in x] if (x := data.get("roles")) else list()
-            self.user: User = User(data.get("user"), state)
+            self.user: Optional[User] = state.entities.store_user(_user, state) if (_user := data.get("user")) else None
             self.available: bool = data.get("available", True)
             self.require_colons: bool = data.get("require_colons", False)
             self.managed: bool = data.get("managed", False)
@@ -23,9 +26,11 @@ class Emoji:
 
 
 class Reaction:
+    __slots__ = ("count", "me", "emoji")
+
     emoji: Emoji
 
-    def __inti__(self, data: dict, state: State):
+    def __init__(self, data: dict, state: State):
         self.count: int = int(data.get("count"))
         self.me: bool = data.get("me", False)
         self.emoji: Emoji = Emoji(data.get("emoji"), state)
@@ -5,6 +5,8 @@ from typing import TYPE_CHECKING
 from discroid.Abstracts import Messagable
 
 if TYPE_CHECKING:
+    from typing import Optional
+
     from discroid.Client import State
     from typing_extensions import Self
 
@@ -12,19 +14,56 @@ if TYPE_CHECKING:
 class TextChannel(Messagable):
     """Represents a text channel in a guild"""
 
-    def __init__(self, data: dict, state: State):
-        self.id: int = int(data.get("id"))
+    __slots__ = ("id", "type", "name", "topic", "position", "nsfw", "guild_id", "parent_id", "last_message_id")
 
+    def __init__(self, data: dict, state: State, *, guild_id: int = None):
         self._state = state
+        self.id: int = int(data.get("id"))
+        self.type: int = 0
+        self.name: Optional[str] = None
+        self.topic: Optional[str] = None
+        self.position: Optional[int] = None
+        self.nsfw: bool = False
+
+        self.guild_id: Optional[int] = None
+        self.parent_id: Optional[int] = None
+        self.last_message_id: Optional[int] = None
+        self._update(data, guild_id=guild_id)
+
+    def _update(self, data: dict, *, guild_id: int = None) -> None:
+        # channels built from a message only carry their ids, the fields they leave out keep their value
+        self.type = data.get("type", self.type)
+        self.name = data.get("name", self.name)
+        self.topic = data.get("topic", self.topic)
+        self.position = data.get("position", self.position)
+        self.nsfw = data.get("nsfw", self.nsfw)
+
+        if x := data.get("guild_id") or guild_id:
+            self.guild_id = int(x)
+        if "parent_id" in data:
+            self.parent_id = int(x) if (x := data["parent_id"]) else None
+        if "last_message_id" in data:
+            self.last_message_id = int(x) if (x := data["last_message_id"]) else None
 
     @classmethod
     def from_message(cls: Self, message_data: dict, state: State) -> Self:
-        """Returns a channel object by using data provided on a message"""
+        """Returns the cached channel of a message, or a partial channel built from the data provided on the message"""
+        channel_id = int(message_data.get("channel_id"))
+        if channel := state.entities.get_channel(channel_id):
+            return channel
+
         data = {
-            "id": message_data.get("channel_id"),
+            "id": channel_id,
+            "guild_id": message_data.get("guild_id"),
         }
-        return cls(data, state)
+        return state.entities.store_channel(data, state)
 
 
 class ChannelMention:
-    pass
+    __slots__ = ("id", "guild_id", "type", "name")
+
+    def __init__(self, data: dict):
+        self.id: int = int(data.get("id"))
+        self.guild_id: int = int(data.get("guild_id"))
+        self.type: int = data.get("type")
+        self.name: str = data.get("name")
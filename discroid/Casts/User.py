@@ -13,35 +13,70 @@ if TYPE_CHECKING:
 
 
 class User(Messagable):
+    __slots__ = (
+        "id",
+        "bot",
+        "system",
+        "username",
+        "discriminator",
+        "flags",
+        "public_flags",
+        "banner",
+        "banner_color",
+        "avatar",
+        "avatar_decoration",
+        "premium_type",
+    )
+
     def __init__(self, data: dict, state: State):
+        self._state: State = state
         self.id: int = int(data.get("id"))
-        self.bot: bool = data.get("bot", False)
-        self.system: bool = data.get("system", False)
+        self.bot: bool = False
+        self.system: bool = False
 
-        self.username: str = data.get("username")
-        self.discriminator: str = data.get("discriminator")
+        self.username: str = None
+        self.discriminator: str = None
 
-        self.flags: int = data.get("flags")
-        self.public_flags: int = data.get("public_flags")
+        self.flags: int = None
+        self.public_flags: int = None
 
-        self.banner: Optional[URL] = URL(BANNER_URL.format(self.id, banner)) if (banner := data.get("banner")) else None
-        self.banner_color: Optional[str] = data.get("banner_color")
-        self.avatar: URL = URL(AVATAR_URL.format(self.id, data.get("avatar")))
-        self.avatar_decoration: bool = data.get("avatar_decoration", False)
+        self.banner: Optional[URL] = None
+        self.banner_color: Optional[str] = None
+        self.avatar: URL = URL(AVATAR_URL.format(self.id, None))
+        self.avatar_decoration: bool = False
 
-        self.premium_type: int = data.get("premium_type")
+        self.premium_type: int = None
+        self._update(data)
 
-        self._state: State = state
+    def _update(self, data: dict) -> None:
+        # payloads like message authors and mentions are partial, the fields they leave out keep their value
+        self.bot = data.get("bot", self.bot)
+        self.system = data.get("system", self.system)
+
+        self.username = data.get("username", self.username)
+        self.discriminator = data.get("discriminator", self.discriminator)
+
+        self.flags = data.get("flags", self.flags)
+        self.public_flags = data.get("public_flags", self.public_flags)
+
+        if "banner" in data:
+            self.banner = URL(BANNER_URL.format(self.id, banner)) if (banner := data["banner"]) else None
+        self.banner_color = data.get("banner_color", self.banner_color)
+        if "avatar" in data:
+            self.avatar = URL(AVATAR_URL.format(self.id, data["avatar"]))
+        self.avatar_decoration = data.get("avatar_decoration", self.avatar_decoration)
+
+        self.premium_type = data.get("premium_type", self.premium_type)
 
 
 class ClientUser(User):
-    def __init__(self, data: dict, state: State):
-        super().__init__(data, state)
+    __slots__ = ("locale", "verified", "email", "phone", "mfa_enabled")
+
+    def _update(self, data: dict) -> None:
+        super()._update(data)
         self.locale: str = data.get("locale")
         self.verified: bool = data.get("verified", False)
 
         self.email: Optional[Email] = Email(_email) if (_email := data.get("email")) else None
         self.phone: Optional[Phone] = Phone(_phone) if (_phone := data.get("phone")) else None
         self.mfa_enabled: bool = data.get("mfa_enabled", False)
-
-        self._state: State = state
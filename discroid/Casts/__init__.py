@@ -1,4 +1,6 @@
 from .Embed import Embed
+from .Guild import Guild
+from .Member import Member
 from .Message import Message, MessageReference
 from .Reaction import Reaction
 from .Role import Role
@@ -7,6 +9,8 @@ from .User import ClientUser, User
 
 __all__ = (
     Embed,
+    Guild,
+    Member,
     Message,
     MessageReference,
     Reaction,
@@ -5,16 +5,30 @@ from typing import TYPE_CHECKING, NamedTuple
 
 import ua_parser.user_agent_parser
 
+from discroid.Cache import EntityCache, MessageCache
 from discroid.Casts import ClientUser
-from discroid.RequestHandler import RequestHandler
+from discroid.Codec import ETFCodec, get_codec
+from discroid.Dispatcher import Dispatcher
+from discroid.Errors import IllegalArgumentError
+from discroid.MemberList import MemberLists
+from discroid.MemberRequests import MemberRequests
+from discroid.Outbound import OutboundQueue
+from discroid.RequestHandler import RequestHandler, RetryPolicy
 from discroid.Websocket import Websocket
 
 if TYPE_CHECKING:
     from asyncio import AbstractEventLoop
-    from typing import Any, Awaitable, Callable, Optional
+    from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, Union
+
+    from aiohttp import BaseConnector
 
     from discroid.Abstracts import Cast
-    from discroid.Casts import Message, MessageReference
+    from discroid.Casts import Guild, Member, Message, MessageReference, TextChannel, User
+    from discroid.Codec import Codec
+    from discroid.MemberList import MemberList
+    from discroid.Metrics import Metrics
+    from discroid.RateLimiter import IdentifyLimiter
+    from discroid.Replay import Recorder
 
 
 class State(NamedTuple):
@@ -22,10 +36,40 @@ class State(NamedTuple):
     http: RequestHandler
     loop: AbstractEventLoop
     client: Client
+    messages: MessageCache
+    entities: EntityCache
+    outbound: OutboundQueue
+    member_lists: MemberLists
+    member_requests: MemberRequests
 
 
 class Client:
-    def __init__(self, *, proxy: str = None, locale: str = None, user_agent: str = None, api_version: int = 9, build_number: int = None):
+    def __init__(
+        self,
+        *,
+        proxy: str = None,
+        locale: str = None,
+        user_agent: str = None,
+        api_version: int = 9,
+        build_number: int = None,
+        codec: Union[str, Codec] = None,
+        encoding: str = "json",
+        lazy_casts: bool = False,
+        keep_raw_data: bool = False,
+        max_messages: int = 1000,
+        max_messages_per_channel: int = None,
+        max_users: int = 10000,
+        max_channels: int = 10000,
+        max_guilds: int = 1000,
+        dispatcher: Dispatcher = None,
+        connector_options: dict = None,
+        retry_policy: RetryPolicy = None,
+        response_cache_ttl: float = 0,
+        metrics: Metrics = None,
+        recorder: Recorder = None,
+        base_route: str = None,
+        websocket_route: str = None,
+    ):
         self.locale: str = locale or "en-US"
         self.user_agent: str = (
             user_agent or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.51 Safari/537.36"
@@ -33,10 +77,44 @@ class Client:
         self.build_number: int = build_number or 117300
         self.super_properties = self.get_super_properties()
 
-        self.__wss = Websocket(api_version=api_version)
-        self.__http = RequestHandler(proxy=proxy, api_version=api_version)
+        self.codec: Codec = get_codec(codec)
+        if encoding not in ("json", "etf"):
+            raise IllegalArgumentError(f"unknown gateway encoding '{encoding}', expected 'json' or 'etf'")
+
+        self.__wss = Websocket(
+            api_version=api_version,
+            codec=ETFCodec() if encoding == "etf" else self.codec,
+            lazy_casts=lazy_casts,
+            keep_raw_data=keep_raw_data,
+            dispatcher=dispatcher,
+        )
+        # limit, limit_per_host, keepalive_timeout and ttl_dns_cache of the connection pool
+        self.__http = RequestHandler(
+            proxy=proxy,
+            api_version=api_version,
+            codec=self.codec,
+            retry_policy=retry_policy,
+            response_cache_ttl=response_cache_ttl,
+            base_route=base_route,
+            **(connector_options or dict()),
+        )
+        # points the client at another api or gateway, like a local FakeGateway
+        self.websocket_route: Optional[str] = websocket_route
         self.__loop: AbstractEventLoop = None
         self.__state: State = None
+        self.__messages: MessageCache = MessageCache(max_messages, max_per_channel=max_messages_per_channel)
+        self.__entities: EntityCache = EntityCache(max_users=max_users, max_channels=max_channels, max_guilds=max_guilds)
+        self.outbound: OutboundQueue = OutboundQueue(self.__http)
+        self.__member_lists: MemberLists = MemberLists()
+        self.__member_requests: MemberRequests = MemberRequests()
+
+        # metrics are only recorded when an instance is passed, it can be shared by several clients
+        self.metrics: Optional[Metrics] = metrics
+        if metrics is not None:
+            self.__wss.metrics = self.__http.metrics = metrics
+        # tracked while the client runs, a shared instance would otherwise keep every closed client alive
+        self.__queue_depth: Callable[[], int] = lambda: self.__wss.dispatcher.queue_depth
+        self.__wss.recorder = recorder
         self.__setup_hook: Optional[Awaitable] = None
 
         self.user: ClientUser = None  # will be set after login
@@ -45,6 +123,10 @@ class Client:
     def latency(self):
         return self.__wss.latency
 
+    @property
+    def dispatcher(self) -> Dispatcher:
+        return self.__wss.dispatcher
+
     async def __aenter__(self) -> None:
         await self.__setup_hook() if self.__setup_hook else None
 
@@ -52,8 +134,14 @@ class Client:
         await self.close()
 
     async def close(self) -> None:
+        if self.metrics is not None:
+            self.metrics.queue_depth.untrack(self.__queue_depth)
         await self.__wss.close()
+        await self.outbound.close()
         await self.__http.close()
+        if self.__wss.recorder is not None:
+            # waits for the buffered frames to be written without blocking the loop
+            await asyncio.get_running_loop().run_in_executor(None, self.__wss.recorder.close)
 
     def setup(self):
         def decorator(func):
@@ -62,17 +150,26 @@ class Client:
 
         return decorator
 
+    def error(self):
+        """Registers a coroutine called with the event name and exception when a handler raises"""
+
+        def decorator(func):
+            self.__wss.dispatcher.error_handler = func
+            return func
+
+        return decorator
+
     def on(self, *, raw: bool = False):
         def decorator(func: Callable[[Cast]]) -> Callable:
             event: str = func.__name__.upper()
-            self.__wss.register_handler(event, func=func)
+            self.__wss.register_handler(event, func=func, raw=raw)
             return func
 
         return decorator
 
     def event(self, event: str, *, raw: bool = False) -> Callable:
         def decorator(func: Callable[[Cast]]) -> Callable:
-            self.__wss.register_handler(event, func=func)
+            self.__wss.register_handler(event, func=func, raw=raw)
             return func
 
         return decorator
@@ -92,8 +189,65 @@ class Client:
     async def login(self, token: str) -> None:
         self.user = await self.__http.login(token)
 
-    async def send_message(self, channel_id: int, content: str, *, reference: MessageReference = None) -> Message:
-        return await self.__http.send_message(channel_id, content, message_reference=reference.to_dict())
+    def get_message(self, message_id: int) -> Optional[Message]:
+        """Returns a message from the cache"""
+        return self.__messages.get(message_id)
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        return self.__entities.get_user(user_id)
+
+    def get_channel(self, channel_id: int) -> Optional[TextChannel]:
+        return self.__entities.get_channel(channel_id)
+
+    def get_guild(self, guild_id: int) -> Optional[Guild]:
+        return self.__entities.get_guild(guild_id)
+
+    def get_member_list(self, guild_id: int, list_id: str = "everyone") -> Optional[MemberList]:
+        """Returns a member list subscribed to with subscribe_member_list"""
+        return self.__member_lists.get(guild_id, list_id)
+
+    async def request_members(
+        self,
+        guild_id: int,
+        *,
+        query: str = "",
+        limit: int = 0,
+        user_ids: Iterable[int] = None,
+        presences: bool = False,
+        max_chunks: int = 16,
+        timeout: float = 30.0,
+    ) -> AsyncIterator[Member]:
+        """Yields the members of a guild as their chunks arrive, raises MemberRequestOverflow if more than 'max_chunks' chunks pile up"""
+        request = self.__member_requests.create(guild_id, max_chunks=max_chunks, timeout=timeout)
+        try:
+            await self.__wss.request_guild_members(
+                guild_id, nonce=request.nonce, query=query, limit=limit, user_ids=user_ids, presences=presences
+            )
+            async for member in request:
+                yield member
+        finally:
+            request.close()
+            self.__member_requests.remove(request.nonce)
+
+    async def subscribe_member_list(self, guild_id: int, channel_id: int, ranges: Iterable[tuple[int, int]] = ((0, 99),)) -> None:
+        """Subscribes to ranges of the member list shown in a channel, the list is kept up to date as it changes"""
+        await self.__wss.lazy_request(guild_id, channels={channel_id: ranges})
+
+    async def send_message(
+        self,
+        channel_id: int,
+        content: str,
+        *,
+        reference: MessageReference = None,
+        confirm: bool = False,
+    ) -> Message:
+        """Queues a message behind the ones already being sent to the channel, 'confirm' resolves it from the gateway echo"""
+        message = await self.outbound.send(
+            channel_id, content, confirm=confirm, message_reference=reference.to_dict() if reference else None
+        )
+        if message is not None:
+            self.__messages.add(message)
+        return message
 
     async def trigger_typing(self, channel_id: int) -> None:
         return await self.__http.trigger_typing(channel_id)
@@ -101,16 +255,35 @@ class Client:
     async def trigger_slash_command(self, *args, **kwargs):
         return await self.__http.interactions(2, *args, **kwargs)
 
-    def run(self, token: str, *, reconnect: bool = True) -> None:
-        async def runner():
-            async with self:
-                self.user = await self.__http.login(self, token, locale=self.locale, user_agent=self.user_agent)
-                self.__wss = await self.__wss.connect(self, token, reconnect=reconnect)
+    async def start(
+        self,
+        token: str,
+        *,
+        reconnect: bool = True,
+        connector: BaseConnector = None,
+        identify_limiter: IdentifyLimiter = None,
+    ) -> None:
+        """Logs in and runs the websocket on the running loop, until the client is closed"""
+        if connector:
+            self.__http.connector = connector
+        if identify_limiter:
+            self.__wss.identify_limiter = identify_limiter
+
+        if self.metrics is not None:
+            self.metrics.queue_depth.track(self.__queue_depth)
 
+        self.__loop = asyncio.get_running_loop()
+        self.__state = State(
+            self.__wss, self.__http, self.__loop, self, self.__messages, self.__entities, self.outbound, self.__member_lists, self.__member_requests
+        )
+
+        async with self:
+            self.user = await self.__http.login(self, token, locale=self.locale, user_agent=self.user_agent)
+            await self.__wss.connect(self, token, reconnect=reconnect, websocket_route=self.websocket_route)
+
+    def run(self, token: str, *, reconnect: bool = True) -> None:
         try:
-            self.__loop = asyncio.get_event_loop()
-            self.__state = State(self.__wss, self.__http, self.__loop, self)
-            self.__loop.run_until_complete(runner())
+            asyncio.get_event_loop().run_until_complete(self.start(token, reconnect=reconnect))
         except Exception as e:
             raise Exception(e)
 
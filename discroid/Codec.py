@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from discroid import ETF
+from discroid.Errors import IllegalArgumentError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if TYPE_CHECKING:
+    from typing import Any, Union
+
+
+class Codec:
+    """Serializes payloads sent and received over the gateway and the REST API"""
+
+    name: str = None
+    encoding: str = "json"  # the gateway encoding the codec speaks
+    binary: bool = False  # whether the payloads are sent as binary frames, json codecs may still dump to bytes
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        raise NotImplementedError
+
+    def dumps(self, obj: Any) -> Union[bytes, str]:
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+class UJSONCodec(Codec):
+    name = "ujson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return ujson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return ujson.dumps(obj, ensure_ascii=False)
+
+
+class ORJSONCodec(Codec):
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+class ETFCodec(Codec):
+    """Erlang external term format, only understood by the gateway"""
+
+    name = "etf"
+    encoding = "etf"
+    binary = True
+
+    def loads(self, data: bytes) -> Any:
+        return ETF.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return ETF.dumps(obj)
+
+
+CODECS: dict[str, type[Codec]] = {
+    JSONCodec.name: JSONCodec,
+    UJSONCodec.name: UJSONCodec,
+    ORJSONCodec.name: ORJSONCodec,
+}
+
+
+def get_codec(codec: Union[str, Codec] = None) -> Codec:
+    """Returns the codec by name, defaults to the fastest json library installed"""
+    if isinstance(codec, Codec):
+        return codec
+
+    if codec is None:
+        if orjson is not None:
+            return ORJSONCodec()
+        if ujson is not None:
+            return UJSONCodec()
+        return JSONCodec()
+
+    try:
+        codec_cls = CODECS[codec]
+    except KeyError:
+        raise IllegalArgumentError(f"unknown codec '{codec}', expected one of {', '.join(CODECS)}") from None
+
+    if (codec_cls is ORJSONCodec and orjson is None) or (codec_cls is UJSONCodec and ujson is None):
+        raise ImportError(f"the codec '{codec}' requires the {codec} package to be installed")
+    return codec_cls()
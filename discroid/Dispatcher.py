@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+
+from discroid.Errors import IllegalArgumentError
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop, Event, Queue, Semaphore, Task
+    from typing import Any, Awaitable, Callable, Optional
+
+logger = getLogger(__name__)
+
+
+class OVERFLOW:
+    BLOCK = "block"  # stop reading the websocket until the queue has room
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued event
+    DROP_NEWEST = "drop_newest"  # discard the event being dispatched
+
+
+class Job(NamedTuple):
+    event: str
+    handler: Callable[[Any], Awaitable]
+    data: Any
+
+
+class DispatchMetrics(NamedTuple):
+    queue_depth: int
+    running: int
+    dispatched: int
+    dropped: int
+    failed: int
+
+
+class Dispatcher:
+    """Runs event handlers with bounded concurrency, queueing the events that don't fit
+
+    Events over their per event limit wait in a backlog of their own without holding a slot, so a burst of one event
+    doesn't stall the others.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 64,
+        max_concurrency_per_event: int = None,
+        max_queue_size: int = 1024,
+        overflow: str = OVERFLOW.BLOCK,
+        error_handler: Callable[[str, Exception], Any] = None,
+    ):
+        if overflow not in (OVERFLOW.BLOCK, OVERFLOW.DROP_OLDEST, OVERFLOW.DROP_NEWEST):
+            raise IllegalArgumentError(f"unknown overflow policy '{overflow}'")
+
+        self.max_concurrency: int = max_concurrency
+        self.max_concurrency_per_event: Optional[int] = max_concurrency_per_event
+        self.max_queue_size: int = max_queue_size
+        self.overflow: str = overflow
+        self.error_handler: Optional[Callable[[str, Exception], Any]] = error_handler
+
+        self.dispatched: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0
+
+        self.__loop: AbstractEventLoop = None
+        self.__queue: Queue[Job] = None
+        self.__semaphore: Semaphore = None
+        self.__event_running: dict[str, int] = dict()
+        self.__backlogs: dict[str, deque[Job]] = dict()
+        self.__backlogged: int = 0
+        self.__backlog_room: Event = None
+        self.__acquiring: Optional[Job] = None  # the job the worker holds while waiting for a slot
+        self.__tasks: set[Task] = set()
+        self.__worker: Task = None
+
+    @property
+    def queue_depth(self) -> int:
+        queued = self.__queue.qsize() if self.__queue else 0
+        return queued + self.__backlogged + (self.__acquiring is not None)
+
+    @property
+    def running(self) -> int:
+        return len(self.__tasks)
+
+    @property
+    def metrics(self) -> DispatchMetrics:
+        return DispatchMetrics(self.queue_depth, self.running, self.dispatched, self.dropped, self.failed)
+
+    def start(self, loop: AbstractEventLoop) -> None:
+        if self.__worker is not None:
+            return
+
+        self.__loop = loop
+        self.__queue = asyncio.Queue(self.max_queue_size)
+        self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.__backlog_room = asyncio.Event()
+        self.__backlog_room.set()
+        self.__worker = loop.create_task(self.worker())
+
+    async def dispatch(self, event: str, handler: Callable[[Any], Awaitable], data: Any) -> None:
+        job = Job(event, handler, data)
+        queue = self.__queue
+
+        if not queue.full():
+            return queue.put_nowait(job)
+
+        if self.overflow == OVERFLOW.BLOCK:
+            await queue.put(job)
+        elif self.overflow == OVERFLOW.DROP_OLDEST:
+            dropped = queue.get_nowait()
+            queue.put_nowait(job)
+            self.dropped += 1
+            logger.warning(f"dispatch queue full, dropped the oldest {dropped.event} event")
+        else:
+            self.dropped += 1
+            logger.warning(f"dispatch queue full, dropped a {event} event")
+
+    async def worker(self) -> None:
+        while True:
+            job = await self.__queue.get()
+
+            limit = self.max_concurrency_per_event
+            if limit and self.__event_running.get(job.event, 0) >= limit:
+                # picked up by the next handler of the event to finish, without taking a slot until then
+                self.__backlogs.setdefault(job.event, deque()).append(job)
+                self.__backlogged += 1
+                if self.__backlogged >= self.max_queue_size:
+                    self.__backlog_room.clear()
+                    await self.__backlog_room.wait()
+                continue
+
+            self.__acquiring = job
+            await self.__semaphore.acquire()
+            self.__acquiring = None
+            self.__start(job)
+
+    def __start(self, job: Job) -> None:
+        self.__event_running[job.event] = self.__event_running.get(job.event, 0) + 1
+
+        task = self.__loop.create_task(self.run(job))
+        # keep a strong reference so running handlers are not garbage collected
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def run(self, job: Job) -> None:
+        try:
+            await job.handler(job.data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.failed += 1
+            if self.error_handler:
+                try:
+                    await self.error_handler(job.event, exc)
+                except Exception:
+                    logger.exception(f"error handler raised while handling an exception in a {job.event} handler")
+            else:
+                logger.exception(f"unhandled exception in a {job.event} handler", exc_info=exc)
+        finally:
+            self.dispatched += 1
+            self.__finish(job.event)
+
+    def __finish(self, event: str) -> None:
+        running = self.__event_running[event] - 1
+        if running:
+            self.__event_running[event] = running
+        else:
+            del self.__event_running[event]
+
+        backlog = self.__backlogs.get(event)
+        if not backlog or self.__worker is None:
+            self.__semaphore.release()
+            return
+
+        # the slot is handed over to the next backlogged event of the same type
+        job = backlog.popleft()
+        if not backlog:
+            del self.__backlogs[event]
+        self.__backlogged -= 1
+        self.__backlog_room.set()
+        self.__start(job)
+
+    async def close(self, *, drain: bool = False) -> None:
+        """Stops the dispatcher, the queued events are run first when draining and dropped otherwise"""
+        if self.__worker is None:
+            return
+
+        # a handler closing the client runs this from its own task, which can't wait on or cancel itself
+        current = asyncio.current_task()
+        if drain:
+            while self.queue_depth or self.__tasks - {current}:
+                if tasks := self.__tasks - {current}:
+                    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    # the worker hasn't picked up the queued events yet
+                    await asyncio.sleep(0)
+
+        self.__worker.cancel()
+        self.__worker = None
+
+        if pending := self.queue_depth:
+            self.dropped += pending
+            logger.warning(f"dropped {pending} queued events on close")
+        while not self.__queue.empty():
+            self.__queue.get_nowait()
+        self.__backlogs.clear()
+        self.__backlogged = 0
+        self.__backlog_room.set()
+        self.__acquiring = None
+
+        tasks = [task for task in self.__tasks if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import TYPE_CHECKING
+
+from discroid.Errors import ETFError
+
+try:
+    import erlpack
+except ImportError:
+    erlpack = None
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Union
+
+
+class TAG:
+    VERSION = 131
+    NEW_FLOAT_EXT = 70
+    COMPRESSED = 80
+    SMALL_INTEGER_EXT = 97
+    INTEGER_EXT = 98
+    FLOAT_EXT = 99
+    ATOM_EXT = 100
+    SMALL_TUPLE_EXT = 104
+    LARGE_TUPLE_EXT = 105
+    NIL_EXT = 106
+    STRING_EXT = 107
+    LIST_EXT = 108
+    BINARY_EXT = 109
+    SMALL_BIG_EXT = 110
+    LARGE_BIG_EXT = 111
+    SMALL_ATOM_EXT = 115
+    MAP_EXT = 116
+    ATOM_UTF8_EXT = 118
+    SMALL_ATOM_UTF8_EXT = 119
+
+
+ATOMS = {"nil": None, "true": True, "false": False}
+
+_u16 = struct.Struct(">H")
+_u32 = struct.Struct(">I")
+_i32 = struct.Struct(">i")
+_f64 = struct.Struct(">d")
+
+
+class Decoder:
+    """A pure python decoder for the erlang external term format"""
+
+    def __init__(self, data: bytes):
+        self.data: bytes = data
+        self.offset: int = 0
+
+        self.__tags: dict[int, Callable[[], Any]] = {
+            TAG.SMALL_INTEGER_EXT: self.small_integer,
+            TAG.INTEGER_EXT: self.integer,
+            TAG.NEW_FLOAT_EXT: self.new_float,
+            TAG.FLOAT_EXT: self.string_float,
+            TAG.ATOM_EXT: self.atom,
+            TAG.ATOM_UTF8_EXT: self.atom,
+            TAG.SMALL_ATOM_EXT: self.small_atom,
+            TAG.SMALL_ATOM_UTF8_EXT: self.small_atom,
+            TAG.SMALL_TUPLE_EXT: self.small_tuple,
+            TAG.LARGE_TUPLE_EXT: self.large_tuple,
+            TAG.NIL_EXT: list,
+            TAG.STRING_EXT: self.string,
+            TAG.LIST_EXT: self.term_list,
+            TAG.BINARY_EXT: self.binary,
+            TAG.SMALL_BIG_EXT: self.small_big,
+            TAG.LARGE_BIG_EXT: self.large_big,
+            TAG.MAP_EXT: self.map,
+        }
+
+    def decode(self) -> Any:
+        if not self.data or self.data[0] != TAG.VERSION:
+            raise ETFError("missing the external term format version byte")
+        self.offset = 1
+
+        if self.data[1] == TAG.COMPRESSED:
+            size = _u32.unpack_from(self.data, 2)[0]
+            self.data = zlib.decompress(self.data[6:])
+            self.offset = 0
+            if len(self.data) != size:
+                raise ETFError("compressed term size mismatch")
+
+        return self.term()
+
+    def term(self) -> Any:
+        tag = self.data[self.offset]
+        self.offset += 1
+        try:
+            return self.__tags[tag]()
+        except KeyError:
+            raise ETFError(f"unknown tag {tag} at offset {self.offset - 1}") from None
+
+    def read(self, size: int) -> bytes:
+        start = self.offset
+        self.offset += size
+        return self.data[start : self.offset]
+
+    def small_integer(self) -> int:
+        self.offset += 1
+        return self.data[self.offset - 1]
+
+    def integer(self) -> int:
+        self.offset += 4
+        return _i32.unpack_from(self.data, self.offset - 4)[0]
+
+    def new_float(self) -> float:
+        self.offset += 8
+        return _f64.unpack_from(self.data, self.offset - 8)[0]
+
+    def string_float(self) -> float:
+        return float(self.read(31).rstrip(b"\x00"))
+
+    def atom(self) -> Any:
+        self.offset += 2
+        name = self.read(_u16.unpack_from(self.data, self.offset - 2)[0]).decode("utf-8")
+        return ATOMS.get(name, name)
+
+    def small_atom(self) -> Any:
+        self.offset += 1
+        name = self.read(self.data[self.offset - 1]).decode("utf-8")
+        return ATOMS.get(name, name)
+
+    def small_tuple(self) -> tuple:
+        self.offset += 1
+        return tuple(self.term() for _ in range(self.data[self.offset - 1]))
+
+    def large_tuple(self) -> tuple:
+        self.offset += 4
+        return tuple(self.term() for _ in range(_u32.unpack_from(self.data, self.offset - 4)[0]))
+
+    def string(self) -> str:
+        self.offset += 2
+        return self.read(_u16.unpack_from(self.data, self.offset - 2)[0]).decode("latin-1")
+
+    def term_list(self) -> list:
+        self.offset += 4
+        length = _u32.unpack_from(self.data, self.offset - 4)[0]
+        term = self.term
+        value = [term() for _ in range(length)]
+
+        if self.data[self.offset] == TAG.NIL_EXT:
+            self.offset += 1
+        else:
+            # improper lists are not sent by discord, keep the tail as the last element
+            value.append(self.term())
+        return value
+
+    def binary(self) -> Union[str, bytes]:
+        self.offset += 4
+        value = self.read(_u32.unpack_from(self.data, self.offset - 4)[0])
+        try:
+            return value.decode("utf-8")
+        except UnicodeDecodeError:
+            return value
+
+    def big(self, size: int) -> int:
+        sign = self.data[self.offset]
+        self.offset += 1
+        value = int.from_bytes(self.read(size), "little")
+        return -value if sign else value
+
+    def small_big(self) -> int:
+        self.offset += 1
+        return self.big(self.data[self.offset - 1])
+
+    def large_big(self) -> int:
+        self.offset += 4
+        return self.big(_u32.unpack_from(self.data, self.offset - 4)[0])
+
+    def map(self) -> dict:
+        self.offset += 4
+        term = self.term
+        return {term(): term() for _ in range(_u32.unpack_from(self.data, self.offset - 4)[0])}
+
+
+class Encoder:
+    """A pure python encoder for the erlang external term format"""
+
+    def __init__(self):
+        self.buffer: bytearray = bytearray()
+
+    def encode(self, obj: Any) -> bytes:
+        self.buffer = bytearray((TAG.VERSION,))
+        self.term(obj)
+        return bytes(self.buffer)
+
+    def term(self, obj: Any) -> None:
+        buffer = self.buffer
+
+        if obj is None:
+            self.atom("nil")
+        elif obj is True:
+            self.atom("true")
+        elif obj is False:
+            self.atom("false")
+        elif isinstance(obj, int):
+            if 0 <= obj <= 255:
+                buffer += bytes((TAG.SMALL_INTEGER_EXT, obj))
+            elif -(2**31) <= obj < 2**31:
+                buffer.append(TAG.INTEGER_EXT)
+                buffer += _i32.pack(obj)
+            else:
+                value = abs(obj).to_bytes((abs(obj).bit_length() + 7) // 8, "little")
+                if len(value) > 255:
+                    raise ETFError("integers larger than 255 bytes are not supported")
+                buffer += bytes((TAG.SMALL_BIG_EXT, len(value), obj < 0))
+                buffer += value
+        elif isinstance(obj, float):
+            buffer.append(TAG.NEW_FLOAT_EXT)
+            buffer += _f64.pack(obj)
+        elif isinstance(obj, (str, bytes)):
+            value = obj.encode("utf-8") if isinstance(obj, str) else obj
+            buffer.append(TAG.BINARY_EXT)
+            buffer += _u32.pack(len(value))
+            buffer += value
+        elif isinstance(obj, dict):
+            buffer.append(TAG.MAP_EXT)
+            buffer += _u32.pack(len(obj))
+            for key, value in obj.items():
+                self.term(key)
+                self.term(value)
+        elif isinstance(obj, list):
+            if obj:
+                buffer.append(TAG.LIST_EXT)
+                buffer += _u32.pack(len(obj))
+                for value in obj:
+                    self.term(value)
+            buffer.append(TAG.NIL_EXT)
+        elif isinstance(obj, tuple):
+            if len(obj) <= 255:
+                buffer += bytes((TAG.SMALL_TUPLE_EXT, len(obj)))
+            else:
+                buffer.append(TAG.LARGE_TUPLE_EXT)
+                buffer += _u32.pack(len(obj))
+            for value in obj:
+                self.term(value)
+        else:
+            raise ETFError(f"cannot encode objects of type {type(obj).__name__}")
+
+    def atom(self, name: str) -> None:
+        value = name.encode("utf-8")
+        self.buffer += bytes((TAG.SMALL_ATOM_UTF8_EXT, len(value)))
+        self.buffer += value
+
+
+def _normalize(obj: Any) -> Any:
+    """Converts the binaries returned by erlpack to str, matching the pure python decoder"""
+    if isinstance(obj, bytes):
+        try:
+            return obj.decode("utf-8")
+        except UnicodeDecodeError:
+            return obj
+    if isinstance(obj, dict):
+        return {_normalize(key): _normalize(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_normalize(value) for value in obj]
+    if isinstance(obj, tuple):
+        return tuple(_normalize(value) for value in obj)
+    return obj
+
+
+def loads(data: bytes) -> Any:
+    if erlpack is not None:
+        return _normalize(erlpack.unpack(bytes(data)))
+    return Decoder(data).decode()
+
+
+def dumps(obj: Any) -> bytes:
+    if erlpack is not None:
+        return erlpack.pack(obj)
+    return Encoder().encode(obj)
@@ -1,3 +1,11 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
 class IllegalArgumentError(ValueError):
     pass
 
@@ -7,6 +15,41 @@ class DiscroidError(Exception):
 
 
 class HTTPError(DiscroidError):
+    def __init__(self, message: str = None, *, status: int = None, body: Any = None, method: str = None, route: str = None):
+        super().__init__(message or f"{method} {route} failed with status {status}: {body}")
+        self.status: int = status
+        self.body: Any = body
+        self.method: str = method
+        self.route: str = route
+
+    @staticmethod
+    def from_status(status: int, **kwargs) -> HTTPError:
+        if status >= 500:
+            return ServerError(status=status, **kwargs)
+        return HTTP_ERRORS.get(status, HTTPError)(status=status, **kwargs)
+
+
+class BadRequest(HTTPError):
+    pass
+
+
+class Unauthorized(HTTPError):
+    pass
+
+
+class Forbidden(HTTPError):
+    pass
+
+
+class NotFound(HTTPError):
+    pass
+
+
+class RateLimited(HTTPError):
+    pass
+
+
+class ServerError(HTTPError):
     pass
 
 
@@ -18,5 +61,31 @@ class LoginFailure(HTTPError):
     pass
 
 
+class MemberRequestOverflow(DiscroidError):
+    pass
+
+
+class PoolFailure(DiscroidError):
+    def __init__(self, failures: dict[Any, BaseException]):
+        super().__init__(f"every client of the pool stopped, {len(failures)} with an exception")
+        self.failures: dict[Any, BaseException] = failures
+
+
 class WebsocketClosure(WebsocketError):
+    def __init__(self, code: int = None, *, resumable: bool = True):
+        super().__init__(f"websocket closed with code {code}" if code else "websocket closed")
+        self.code: int = code
+        self.resumable: bool = resumable
+
+
+class ETFError(DiscroidError):
     pass
+
+
+HTTP_ERRORS: dict[int, type[HTTPError]] = {
+    400: BadRequest,
+    401: Unauthorized,
+    403: Forbidden,
+    404: NotFound,
+    429: RateLimited,
+}
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+
+from discroid.Casts import Member
+
+if TYPE_CHECKING:
+    from typing import Any, Iterable, Iterator, Optional, Union
+
+    from discroid.Client import State
+
+logger = getLogger(__name__)
+
+
+class ChunkedList:
+    """A list split in chunks with a Fenwick tree over their lengths, positional inserts and deletes are O(log n)
+
+    Lookups walk the tree down to the chunk holding an index, the chunks are bounded so shifting inside one stays cheap.
+    """
+
+    def __init__(self, values: Iterable[Any] = (), *, chunk_size: int = 512):
+        self.chunk_size: int = chunk_size
+
+        self.__chunks: list[list[Any]] = list()
+        self.__tree: list[int] = [0]
+        self.__length: int = 0
+
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self.__chunks:
+            yield from chunk
+
+    def __getitem__(self, index: int) -> Any:
+        chunk, offset = self.__locate(self.__index(index))
+        return self.__chunks[chunk][offset]
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        chunk, offset = self.__locate(self.__index(index))
+        self.__chunks[chunk][offset] = value
+
+    def insert(self, index: int, value: Any) -> None:
+        if index >= self.__length or not self.__chunks:
+            return self.append(value)
+
+        chunk, offset = self.__locate(max(0, index))
+        self.__chunks[chunk].insert(offset, value)
+        self.__add(chunk, 1)
+        self.__length += 1
+
+        if len(self.__chunks[chunk]) > self.chunk_size * 2:
+            self.__split(chunk)
+
+    def append(self, value: Any) -> None:
+        if not self.__chunks or len(self.__chunks[-1]) >= self.chunk_size * 2:
+            self.__chunks.append([value])
+            self.__length += 1
+            return self.__rebuild()
+
+        self.__chunks[-1].append(value)
+        self.__add(len(self.__chunks) - 1, 1)
+        self.__length += 1
+
+    def extend(self, values: Iterable[Any]) -> None:
+        values = list(values)
+        if not values:
+            return
+
+        if self.__chunks and (room := self.chunk_size - len(self.__chunks[-1])) > 0:
+            self.__chunks[-1].extend(values[:room])
+            values = values[room:]
+
+        size = self.chunk_size
+        self.__chunks.extend(values[start : start + size] for start in range(0, len(values), size))
+        self.__length = sum(len(chunk) for chunk in self.__chunks)
+        self.__rebuild()
+
+    def pop(self, index: int = -1) -> Any:
+        chunk, offset = self.__locate(self.__index(index))
+        value = self.__chunks[chunk].pop(offset)
+        self.__length -= 1
+
+        if self.__chunks[chunk]:
+            self.__add(chunk, -1)
+        else:
+            del self.__chunks[chunk]
+            self.__rebuild()
+        return value
+
+    def slice(self, start: int, stop: int) -> list[Any]:
+        """The values between start and stop, like list[start:stop] without negative indexes"""
+        start, stop = max(0, start), min(stop, self.__length)
+        if start >= stop:
+            return list()
+
+        chunk, offset = self.__locate(start)
+        values = list()
+        remaining = stop - start
+        while remaining > 0:
+            part = self.__chunks[chunk][offset : offset + remaining]
+            values.extend(part)
+            remaining -= len(part)
+            chunk, offset = chunk + 1, 0
+        return values
+
+    def clear(self) -> None:
+        self.__chunks.clear()
+        self.__tree = [0]
+        self.__length = 0
+
+    def __index(self, index: int) -> int:
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("list index out of range")
+        return index
+
+    def __locate(self, index: int) -> tuple[int, int]:
+        """Returns the chunk holding the index and the offset of the index in it"""
+        tree = self.__tree
+        count = len(tree) - 1
+
+        position = 0
+        step = 1 << (count.bit_length() - 1) if count else 0
+        while step:
+            following = position + step
+            if following <= count and tree[following] <= index:
+                position = following
+                index -= tree[following]
+            step >>= 1
+        return position, index
+
+    def __add(self, chunk: int, delta: int) -> None:
+        tree = self.__tree
+        index = chunk + 1
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def __split(self, chunk: int) -> None:
+        values = self.__chunks[chunk]
+        half = len(values) // 2
+        self.__chunks[chunk : chunk + 1] = [values[:half], values[half:]]
+        self.__rebuild()
+
+    def __rebuild(self) -> None:
+        # O(number of chunks), only needed when chunks are added or removed
+        count = len(self.__chunks)
+        tree = [0] * (count + 1)
+        for index, chunk in enumerate(self.__chunks, 1):
+            tree[index] += len(chunk)
+            if (parent := index + (index & -index)) <= count:
+                tree[parent] += tree[index]
+        self.__tree = tree
+
+
+class MemberListGroup(NamedTuple):
+    id: str
+    count: int
+
+
+class MemberList:
+    """The member sidebar of a guild, kept up to date from the GUILD_MEMBER_LIST_UPDATE ops
+
+    Only the synced ranges are known, every other position holds None.
+    """
+
+    def __init__(self, guild_id: int, list_id: str, state: State, *, chunk_size: int = 512):
+        self.guild_id: int = guild_id
+        self.id: str = list_id
+        self.groups: list[MemberListGroup] = list()
+        self.member_count: Optional[int] = None
+        self.online_count: Optional[int] = None
+
+        self._state: State = state
+        self.__items: ChunkedList = ChunkedList(chunk_size=chunk_size)
+        self.__members: dict[int, Member] = dict()
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __iter__(self) -> Iterator[Optional[Union[Member, MemberListGroup]]]:
+        return iter(self.__items)
+
+    def __getitem__(self, index: int) -> Optional[Union[Member, MemberListGroup]]:
+        return self.__items[index]
+
+    @property
+    def members(self) -> list[Member]:
+        """The members currently known, in no particular order"""
+        return list(self.__members.values())
+
+    def get(self, index: int) -> Optional[Union[Member, MemberListGroup]]:
+        try:
+            return self.__items[index]
+        except IndexError:
+            return None
+
+    def range(self, start: int, stop: int) -> list[Optional[Union[Member, MemberListGroup]]]:
+        return self.__items.slice(start, stop)
+
+    def get_member(self, user_id: int) -> Optional[Member]:
+        return self.__members.get(user_id)
+
+    def apply(self, data: dict) -> None:
+        """Applies the ops of a GUILD_MEMBER_LIST_UPDATE"""
+        if "groups" in data:
+            self.groups = [MemberListGroup(group.get("id"), group.get("count", 0)) for group in data["groups"]]
+        if "member_count" in data:
+            self.member_count = data["member_count"]
+        if "online_count" in data:
+            self.online_count = data["online_count"]
+
+        items = self.__items
+        for op in data.get("ops", list()):
+            kind = op.get("op")
+            if kind == "SYNC":
+                self.sync(op["range"][0], op.get("items", list()))
+            elif kind == "INSERT":
+                index = op["index"]
+                self.__pad(index)
+                items.insert(index, self.__remember(op.get("item")))
+            elif kind == "UPDATE":
+                self.__replace(op["index"], self.__remember(op.get("item")))
+            elif kind == "DELETE":
+                if op["index"] < len(items):
+                    self.__forget(items.pop(op["index"]))
+            elif kind == "INVALIDATE":
+                start, stop = op["range"]
+                for index in range(start, min(stop + 1, len(items))):
+                    self.__replace(index, None)
+            else:
+                logger.debug(f"unhandled member list op {kind}")
+
+    def sync(self, start: int, items: list[dict]) -> None:
+        self.__pad(start)
+        length = len(self.__items)
+
+        overlap = max(0, min(len(items), length - start))
+        for index in range(overlap):
+            self.__replace(start + index, self.__remember(items[index]))
+        self.__items.extend(self.__remember(item) for item in items[overlap:])
+
+    def __pad(self, index: int) -> None:
+        if (missing := index - len(self.__items)) > 0:
+            self.__items.extend([None] * missing)
+
+    def __replace(self, index: int, item: Optional[Union[Member, MemberListGroup]]) -> None:
+        self.__pad(index + 1)
+        previous = self.__items[index]
+        if previous is not None and previous is not item:
+            # only drops the member when the new item isn't the same member
+            self.__forget(previous)
+        self.__items[index] = item
+
+    def __remember(self, item: Optional[dict]) -> Optional[Union[Member, MemberListGroup]]:
+        if not item:
+            return None
+
+        if (group := item.get("group")) is not None:
+            return MemberListGroup(group.get("id"), group.get("count", 0))
+
+        member = Member(item["member"], self._state, guild_id=self.guild_id)
+        self.__members[member.id] = member
+        return member
+
+    def __forget(self, item: Optional[Union[Member, MemberListGroup]]) -> None:
+        if isinstance(item, Member) and self.__members.get(item.id) is item:
+            del self.__members[item.id]
+
+
+class MemberLists:
+    """The member lists of the subscribed guilds, by guild and list id"""
+
+    def __init__(self, *, chunk_size: int = 512):
+        self.chunk_size: int = chunk_size
+
+        self.__lists: dict[int, dict[str, MemberList]] = dict()
+
+    def get(self, guild_id: int, list_id: str = "everyone") -> Optional[MemberList]:
+        return self.__lists.get(guild_id, dict()).get(list_id)
+
+    def guild(self, guild_id: int) -> list[MemberList]:
+        return list(self.__lists.get(guild_id, dict()).values())
+
+    def apply(self, data: dict, state: State) -> MemberList:
+        guild_id = int(data.get("guild_id"))
+        list_id = str(data.get("id", "everyone"))
+
+        lists = self.__lists.get(guild_id)
+        if lists is None:
+            lists = self.__lists[guild_id] = dict()
+
+        member_list = lists.get(list_id)
+        if member_list is None:
+            member_list = lists[list_id] = MemberList(guild_id, list_id, state, chunk_size=self.chunk_size)
+
+        member_list.apply(data)
+        return member_list
+
+    def remove_guild(self, guild_id: int) -> None:
+        self.__lists.pop(guild_id, None)
+
+    def clear(self) -> None:
+        self.__lists.clear()
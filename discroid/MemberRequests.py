@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from discroid.Casts import Member
+from discroid.Errors import MemberRequestOverflow
+from discroid.Utils import Utils
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+    from discroid.Client import State
+
+logger = getLogger(__name__)
+
+
+class MemberRequest:
+    """Iterates over the members of a REQUEST_GUILD_MEMBERS as their chunks arrive
+
+    At most 'max_chunks' chunks are buffered without ever holding up the gateway, a consumer falling further behind
+    loses the rest of the request and gets a MemberRequestOverflow once the buffered members are consumed.
+    """
+
+    def __init__(self, guild_id: int, nonce: str, *, max_chunks: int = 16, timeout: float = 30.0):
+        self.guild_id: int = guild_id
+        self.nonce: str = nonce
+        self.timeout: float = timeout
+        self.chunk_count: Optional[int] = None
+        self.received: int = 0
+        self.not_found: list[int] = list()
+
+        self.__queue: asyncio.Queue[list[Member]] = asyncio.Queue(max_chunks)
+        self.__members: deque[Member] = deque()
+        self.__consumed: int = 0
+        self.__error: Optional[BaseException] = None
+        self.__closed: bool = False
+
+    @property
+    def is_done(self) -> bool:
+        return self.chunk_count is not None and self.__consumed >= self.chunk_count
+
+    @property
+    def is_failed(self) -> bool:
+        return self.__error is not None
+
+    def __aiter__(self) -> MemberRequest:
+        return self
+
+    async def __anext__(self) -> Member:
+        while not self.__members:
+            if self.__error is not None and self.__queue.empty():
+                raise self.__error
+            if self.is_done:
+                raise StopAsyncIteration
+
+            try:
+                self.__members.extend(await asyncio.wait_for(self.__queue.get(), self.timeout))
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(f"no member chunk received for nonce {self.nonce} in {self.timeout}s") from None
+            self.__consumed += 1
+
+        return self.__members.popleft()
+
+    def feed(self, data: dict, members: list[Member]) -> None:
+        """Buffers a chunk, the request fails when the buffer is full"""
+        if self.__closed or self.__error is not None:
+            return
+
+        self.chunk_count = data.get("chunk_count", 1)
+        self.received += 1
+        self.not_found.extend(int(user_id) for user_id in data.get("not_found", list()))
+
+        try:
+            self.__queue.put_nowait(members)
+        except asyncio.QueueFull:
+            logger.warning(f"member request {self.nonce} fell {self.__queue.maxsize} chunks behind, dropping it")
+            self.__error = MemberRequestOverflow(f"the consumer of member request {self.nonce} fell too far behind")
+
+    def close(self) -> None:
+        """Stops buffering chunks and drops the buffered ones"""
+        self.__closed = True
+        self.__members.clear()
+        while not self.__queue.empty():
+            self.__queue.get_nowait()
+
+
+class MemberRequests:
+    """Routes the GUILD_MEMBERS_CHUNK events to the request of their nonce"""
+
+    def __init__(self):
+        self.__requests: dict[str, MemberRequest] = dict()
+
+    def __len__(self) -> int:
+        return len(self.__requests)
+
+    def create(self, guild_id: int, *, max_chunks: int = 16, timeout: float = 30.0) -> MemberRequest:
+        nonce = Utils.calculate_nonce()
+        while nonce in self.__requests:
+            nonce = Utils.calculate_nonce()
+
+        request = self.__requests[nonce] = MemberRequest(guild_id, nonce, max_chunks=max_chunks, timeout=timeout)
+        return request
+
+    def remove(self, nonce: str) -> None:
+        self.__requests.pop(nonce, None)
+
+    def feed(self, data: dict, state: State) -> None:
+        """Builds the members of a chunk, storing their users, and hands them to the request of the chunk's nonce"""
+        request = self.__requests.get(data.get("nonce"))
+        if request is None:
+            for _member in data.get("members", list()):
+                state.entities.store_user(_member.get("user"), state)
+            return
+
+        guild_id = int(data.get("guild_id"))
+        members = [Member(_member, state, guild_id=guild_id) for _member in data.get("members", list())]
+
+        request.feed(data, members)
+        if request.is_failed or data.get("chunk_index", 0) + 1 >= data.get("chunk_count", 1):
+            # nothing else will be routed to the request, the buffered chunks are still consumed
+            self.remove(request.nonce)
+
+    def clear(self) -> None:
+        self.__requests.clear()
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import bisect
+import math
+import time
+from collections import deque
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Optional
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class EventCounts(NamedTuple):
+    at: float
+    counts: dict[tuple, float]
+
+
+class Counter:
+    """A monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name: str = name
+        self.description: str = description
+        self.labels: tuple[str, ...] = labels
+        self.values: dict[tuple, float] = dict()
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def snapshot(self) -> dict:
+        return {_label_key(labels): value for labels, value in self.values.items()}
+
+
+class Gauge:
+    """A value that goes up and down, either set directly or read from the tracked callables when collected"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        self.name: str = name
+        self.description: str = description
+        self.value: float = 0
+
+        self.__sources: list[Callable[[], float]] = list()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def track(self, source: Callable[[], float]) -> None:
+        self.__sources.append(source)
+
+    def untrack(self, source: Callable[[], float]) -> None:
+        if source in self.__sources:
+            self.__sources.remove(source)
+
+    def get(self) -> float:
+        return self.value + sum(source() for source in self.__sources)
+
+    def snapshot(self) -> float:
+        return self.get()
+
+
+class Histogram:
+    """Counts observations into fixed buckets per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = (), *, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name: str = name
+        self.description: str = description
+        self.labels: tuple[str, ...] = labels
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        # a count per bucket plus the overflow bucket, followed by the sum of the observations
+        self.values: dict[tuple, list[float]] = dict()
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def snapshot(self) -> dict:
+        snapshot = dict()
+        for labels, counts in self.values.items():
+            count = sum(counts[:-1])
+            snapshot[_label_key(labels)] = {
+                "count": count,
+                "sum": counts[-1],
+                "mean": counts[-1] / count if count else 0.0,
+                "buckets": dict(zip((*self.buckets, float("inf")), _cumulative(counts[:-1]))),
+            }
+        return snapshot
+
+
+class Window:
+    """Keeps the latest samples to compute percentiles over"""
+
+    kind = "summary"
+
+    def __init__(self, name: str, description: str, *, size: int = 128, quantiles: Iterable[float] = DEFAULT_QUANTILES):
+        self.name: str = name
+        self.description: str = description
+        self.quantiles: tuple[float, ...] = tuple(quantiles)
+        self.samples: deque[float] = deque(maxlen=size)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        if not self.samples:
+            return None
+
+        samples = sorted(self.samples)
+        # nearest rank
+        return samples[max(0, math.ceil(quantile * len(samples)) - 1)]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "quantiles": {quantile: self.percentile(quantile) for quantile in self.quantiles},
+        }
+
+
+class Metrics:
+    """Collects the runtime metrics of the clients it is attached to, components only record into it when one is attached"""
+
+    def __init__(self, *, buckets: Iterable[float] = DEFAULT_BUCKETS, window: int = 128):
+        self.rest_latency = Histogram(
+            "discroid_rest_request_seconds", "Latency of REST requests", ("method", "route"), buckets=buckets
+        )
+        self.rest_responses = Counter("discroid_rest_responses_total", "REST responses by status", ("method", "route", "status"))
+        self.rest_ratelimits = Counter("discroid_rest_ratelimited_total", "REST responses with the status 429", ("route", "scope"))
+        self.gateway_events = Counter("discroid_gateway_events_total", "Gateway dispatch events received", ("event",))
+        self.gateway_bytes = Counter("discroid_gateway_bytes_total", "Gateway bytes received, compressed and inflated", ("kind",))
+        self.heartbeat_rtt = Window("discroid_heartbeat_rtt_seconds", "Round trip time of the gateway heartbeats", size=window)
+        self.reconnects = Counter("discroid_gateway_reconnects_total", "Gateway reconnects", ("reason",))
+        self.queue_depth = Gauge("discroid_dispatch_queue_depth", "Events waiting for a handler slot")
+
+        self.exporters: list[Exporter] = list()
+        self.created_at: float = time.monotonic()
+
+    @property
+    def collectors(self) -> tuple:
+        return (
+            self.rest_latency,
+            self.rest_responses,
+            self.rest_ratelimits,
+            self.gateway_events,
+            self.gateway_bytes,
+            self.heartbeat_rtt,
+            self.reconnects,
+            self.queue_depth,
+        )
+
+    def event_counts(self) -> EventCounts:
+        """A copy of the gateway event counts, to compute the rates since with events_per_second"""
+        return EventCounts(time.monotonic(), dict(self.gateway_events.values))
+
+    def events_per_second(self, since: EventCounts = None) -> dict[str, float]:
+        """The rate of every gateway event type since the given counts, or since the metrics were created"""
+        since = since or EventCounts(self.created_at, dict())
+        current = self.event_counts()
+
+        elapsed = current.at - since.at
+        if elapsed <= 0:
+            return dict()
+        return {labels[0]: (count - since.counts.get(labels, 0)) / elapsed for labels, count in current.counts.items()}
+
+    def snapshot(self) -> dict[str, Any]:
+        snapshot = {collector.name: collector.snapshot() for collector in self.collectors}
+        snapshot["uptime"] = time.monotonic() - self.created_at
+        return snapshot
+
+    def add_exporter(self, exporter: Exporter) -> None:
+        self.exporters.append(exporter)
+
+    def export(self) -> dict[str, Any]:
+        """Runs every exporter, keyed by their name"""
+        return {exporter.name: exporter.export(self) for exporter in self.exporters}
+
+
+class Exporter:
+    """Turns the collected metrics into the format of an outside consumer"""
+
+    name: str = None
+
+    def export(self, metrics: Metrics) -> Any:
+        raise NotImplementedError
+
+
+class SnapshotExporter(Exporter):
+    """Exports a snapshot of the metrics, with the event rates since the previous export"""
+
+    name = "snapshot"
+
+    def __init__(self):
+        self.__previous: Optional[EventCounts] = None
+
+    def export(self, metrics: Metrics) -> dict[str, Any]:
+        snapshot = metrics.snapshot()
+        current = metrics.event_counts()
+        snapshot["events_per_second"] = metrics.events_per_second(self.__previous)
+        self.__previous = current
+        return snapshot
+
+
+class PrometheusExporter(Exporter):
+    """Renders the metrics in the Prometheus text exposition format"""
+
+    name = "prometheus"
+
+    def export(self, metrics: Metrics) -> str:
+        lines = list()
+        for collector in metrics.collectors:
+            lines.append(f"# HELP {collector.name} {collector.description}")
+            lines.append(f"# TYPE {collector.name} {collector.kind}")
+
+            if isinstance(collector, Counter):
+                for labels, value in collector.values.items():
+                    lines.append(f"{collector.name}{_labels(collector.labels, labels)} {_number(value)}")
+            elif isinstance(collector, Gauge):
+                lines.append(f"{collector.name} {_number(collector.get())}")
+            elif isinstance(collector, Histogram):
+                for labels, counts in collector.values.items():
+                    for bound, count in zip((*collector.buckets, float("inf")), _cumulative(counts[:-1])):
+                        extra = ("le", "+Inf" if bound == float("inf") else _number(bound))
+                        lines.append(f"{collector.name}_bucket{_labels(collector.labels, labels, extra)} {count}")
+                    lines.append(f"{collector.name}_sum{_labels(collector.labels, labels)} {_number(counts[-1])}")
+                    lines.append(f"{collector.name}_count{_labels(collector.labels, labels)} {sum(counts[:-1])}")
+            elif isinstance(collector, Window):
+                for quantile in collector.quantiles:
+                    value = collector.percentile(quantile)
+                    lines.append(f'{collector.name}{{quantile="{quantile}"}} {"NaN" if value is None else _number(value)}')
+                lines.append(f"{collector.name}_sum {_number(collector.sum)}")
+                lines.append(f"{collector.name}_count {collector.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _label_key(labels: tuple) -> str:
+    return ",".join(str(label) for label in labels)
+
+
+def _cumulative(counts: list[float]) -> list[float]:
+    total = 0
+    cumulative = list()
+    for count in counts:
+        total += count
+        cumulative.append(total)
+    return cumulative
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: tuple[str, str] = None) -> str:
+    pairs = [(name, value) for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
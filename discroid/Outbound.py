@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+
+from discroid.Utils import KeyedQueues, Utils
+
+if TYPE_CHECKING:
+    from asyncio import Future, Task
+    from typing import Optional
+
+    from discroid.Casts import Message
+    from discroid.RequestHandler import RequestHandler
+
+logger = getLogger(__name__)
+
+
+class OutboundMessage(NamedTuple):
+    channel_id: int
+    content: str
+    nonce: str
+    confirm: bool
+    options: dict
+    future: Future
+
+
+class OutboundQueue:
+    """Sends the messages of a channel one after the other in the order they were queued, channels are sent concurrently
+
+    Confirmed messages resolve when the gateway echoes their nonce, the next message of the channel goes out as soon as
+    their request was written instead of after their response. A confirmed message retried after a 429 or a connection
+    error can then land after the messages queued behind it.
+    """
+
+    def __init__(self, http: RequestHandler, *, confirm_timeout: float = 30.0):
+        self.confirm_timeout: float = confirm_timeout
+
+        self.__http: RequestHandler = http
+        self.__queues: KeyedQueues[deque[OutboundMessage]] = KeyedQueues(deque, self.sender)
+        # the requests of confirmed messages still waiting on their response
+        self.__requests: set[Task] = set()
+        self.__confirmations: dict[str, Future] = dict()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self.__queues) + len(self.__confirmations)
+
+    def send(self, channel_id: int, content: str, *, confirm: bool = False, **options) -> Future:
+        """Queues a message, the future resolves to the created Message"""
+        loop = asyncio.get_running_loop()
+
+        nonce = options.pop("nonce", None) or Utils.calculate_nonce()
+        while nonce in self.__confirmations:
+            nonce = Utils.calculate_nonce()
+
+        future = loop.create_future()
+        self.__queues.queue(channel_id).append(OutboundMessage(channel_id, content, nonce, confirm, options, future))
+        self.__queues.start(channel_id)
+        return future
+
+    async def sender(self, channel_id: int, queue: deque[OutboundMessage]) -> None:
+        while queue:
+            outbound = queue.popleft()
+            if outbound.future.done():
+                continue
+
+            if outbound.confirm:
+                await self.__dispatch(outbound)
+                continue
+
+            try:
+                message = await self.__http.send_message(channel_id, outbound.content, nonce=outbound.nonce, **outbound.options)
+            except asyncio.CancelledError:
+                outbound.future.cancel()
+                raise
+            except Exception as exc:
+                if not outbound.future.done():
+                    outbound.future.set_exception(exc)
+                continue
+
+            if not outbound.future.done():
+                outbound.future.set_result(message)
+
+    async def __dispatch(self, outbound: OutboundMessage) -> None:
+        """Sends a confirmed message and returns once its request was written, the response is awaited in the background"""
+        loop = asyncio.get_running_loop()
+        # registered before sending, the gateway can echo the message before the response arrives
+        self.__confirmations[outbound.nonce] = outbound.future
+
+        sent = loop.create_future()
+        request = loop.create_task(
+            self.__http.send_message(outbound.channel_id, outbound.content, nonce=outbound.nonce, wait=False, sent=sent, **outbound.options)
+        )
+        self.__requests.add(request)
+        request.add_done_callback(lambda task: self.__sent(outbound, task))
+
+        try:
+            # a request failing before it was written finishes the task first
+            await asyncio.wait((sent, request), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            request.cancel()
+            raise
+        finally:
+            sent.cancel()
+
+    def __sent(self, outbound: OutboundMessage, request: Task) -> None:
+        self.__requests.discard(request)
+
+        if request.cancelled():
+            self.__confirmations.pop(outbound.nonce, None)
+            outbound.future.cancel()
+        elif (exc := request.exception()) is not None:
+            self.__confirmations.pop(outbound.nonce, None)
+            if not outbound.future.done():
+                outbound.future.set_exception(exc)
+        elif not outbound.future.done():
+            asyncio.get_running_loop().call_later(self.confirm_timeout, self.__expire, outbound.nonce)
+
+    def resolve(self, message: Message) -> bool:
+        """Resolves the message waiting for the echo of its nonce, called with every MESSAGE_CREATE"""
+        if message.nonce is None or (future := self.__confirmations.pop(message.nonce, None)) is None:
+            return False
+
+        if not future.done():
+            future.set_result(message)
+        return True
+
+    def __expire(self, nonce: str) -> None:
+        future: Optional[Future] = self.__confirmations.pop(nonce, None)
+        if future is not None and not future.done():
+            future.set_exception(asyncio.TimeoutError(f"message with nonce {nonce} was not echoed by the gateway"))
+
+    async def close(self) -> None:
+        requests = list(self.__requests)
+        for request in requests:
+            request.cancel()
+        await asyncio.gather(*requests, return_exceptions=True)
+
+        for queue in await self.__queues.close():
+            for outbound in queue:
+                outbound.future.cancel()
+        for future in self.__confirmations.values():
+            future.cancel()
+        self.__confirmations.clear()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from discroid.Errors import PoolFailure
+from discroid.RateLimiter import IdentifyLimiter
+from discroid.RequestHandler import RequestHandler
+
+if TYPE_CHECKING:
+    from asyncio import Task
+
+    from aiohttp import TCPConnector
+
+    from discroid.Client import Client
+
+logger = getLogger(__name__)
+
+
+class ClientPool:
+    """Hosts many clients on a single event loop, sharing one connection pool and DNS cache"""
+
+    def __init__(
+        self,
+        *,
+        identify_interval: float = 5.0,
+        limit: int = 0,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 60.0,
+        ttl_dns_cache: int = 300,
+    ):
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.keepalive_timeout: float = keepalive_timeout
+        self.ttl_dns_cache: int = ttl_dns_cache
+
+        self.__identify_limiter: IdentifyLimiter = IdentifyLimiter(identify_interval)
+        self.__connector: TCPConnector = None
+        self.__tokens: dict[Client, str] = dict()
+        self.__tasks: dict[Client, Task] = dict()
+        self.__failures: dict[Client, BaseException] = dict()
+        self.__exhausted: bool = False  # every client stopped on its own
+        self.__closed: asyncio.Event = None
+
+    @property
+    def clients(self) -> list[Client]:
+        return list(self.__tokens)
+
+    @property
+    def is_running(self) -> bool:
+        return self.__connector is not None
+
+    @property
+    def failures(self) -> dict[Client, BaseException]:
+        """The exceptions the clients stopped with, until they are started again"""
+        return dict(self.__failures)
+
+    def add(self, client: Client, token: str) -> None:
+        """Adds a client to the pool, it is started right away if the pool is running"""
+        self.__tokens[client] = token
+        if self.is_running:
+            self.start_client(client)
+
+    def start_client(self, client: Client) -> Task:
+        if task := self.__tasks.get(client):
+            return task
+        self.__failures.pop(client, None)
+
+        async def runner():
+            try:
+                await client.start(self.__tokens[client], connector=self.__connector, identify_limiter=self.__identify_limiter)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception(f"client {client.user.id if client.user else client!r} stopped with an exception")
+                self.__failures[client] = exc
+
+        task = self.__tasks[client] = asyncio.get_running_loop().create_task(runner())
+        task.add_done_callback(lambda task: self.__stopped(client, task))
+        return task
+
+    def __stopped(self, client: Client, task: Task) -> None:
+        if self.__tasks.get(client) is not task:
+            # stopped by stop_client
+            return
+
+        del self.__tasks[client]
+        if not self.__tasks and self.is_running:
+            # nothing is left running, wait() returns so that run() can report it
+            logger.error(f"every client of the pool stopped, {len(self.__failures)} with an exception")
+            self.__exhausted = True
+            self.__closed.set()
+
+    async def stop_client(self, client: Client) -> None:
+        if task := self.__tasks.pop(client, None):
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def remove(self, client: Client) -> None:
+        """Stops a client and removes it from the pool"""
+        await self.stop_client(client)
+        self.__tokens.pop(client, None)
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+
+        self.__closed = asyncio.Event()
+        self.__exhausted = False
+        self.__connector = RequestHandler.create_connector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        for client in self.__tokens:
+            self.start_client(client)
+
+    async def wait(self) -> None:
+        """Waits until the pool is closed or every one of its clients stopped"""
+        await self.__closed.wait()
+
+    async def close(self) -> None:
+        if not self.is_running:
+            return
+
+        await asyncio.gather(*(self.stop_client(client) for client in list(self.__tasks)))
+        await self.__connector.close()
+        self.__connector = None
+        self.__closed.set()
+
+    def run(self) -> None:
+        """A blocking call that runs every client of the pool, raises PoolFailure when they all stopped and any of them failed"""
+
+        async def runner():
+            await self.start()
+            try:
+                await self.wait()
+            finally:
+                exhausted = self.__exhausted
+                await self.close()
+
+            if exhausted and self.__failures:
+                raise PoolFailure(self.failures)
+
+        asyncio.get_event_loop().run_until_complete(runner())
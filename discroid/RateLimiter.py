@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Mapping, Optional
+
+logger = getLogger(__name__)
+
+MAJOR_PARAMETERS = re.compile(r"^/(channels|guilds|webhooks)/(\d+)")
+SNOWFLAKES = re.compile(r"/\d{15,21}")
+REACTIONS = re.compile(r"/reactions/[^/?]+")
+
+
+class Bucket:
+    """Represents a single rate limit bucket, requests acquire a slot in FIFO order"""
+
+    def __init__(self, key: str):
+        self.key: str = key
+        self.limit: int = 1
+        self.remaining: int = 1
+        self.reset_at: Optional[float] = None
+
+        self.__inflight: int = 0
+        self.__unlimited: bool = False  # the route answered without rate limit headers
+        self.__window: Optional[str] = None  # the X-RateLimit-Reset of the current window
+        self.__expired: Optional[str] = None  # and the one of the window that ended before it
+        self.__lock: asyncio.Lock = asyncio.Lock()
+        self.__updated: asyncio.Event = asyncio.Event()
+
+    @property
+    def is_idle(self) -> bool:
+        return not self.__lock.locked() and self.remaining == self.limit
+
+    async def acquire(self) -> None:
+        if self.__unlimited:
+            return
+
+        async with self.__lock:
+            while True:
+                if self.__unlimited:
+                    return
+
+                now = time.monotonic()
+                if self.reset_at is not None and now >= self.reset_at:
+                    self.remaining = self.limit
+                    self.reset_at = None
+                    self.__expired, self.__window = self.__window, None
+
+                if self.remaining > 0:
+                    self.remaining -= 1
+                    self.__inflight += 1
+                    return
+
+                if self.reset_at is None:
+                    # the limits are unknown until an in flight request returns
+                    self.__updated.clear()
+                    await self.__updated.wait()
+                else:
+                    logger.debug(f"bucket {self.key} exhausted, waiting {self.reset_at - now:.2f}s")
+                    await asyncio.sleep(self.reset_at - now)
+
+    def release(self, headers: Mapping[str, str] = None) -> None:
+        """Updates the bucket with the rate limit headers of a response"""
+        self.__inflight = max(0, self.__inflight - 1)
+
+        window = headers.get("X-RateLimit-Reset") if headers else None
+        if window is not None and window == self.__expired:
+            # a late response of the previous window, its counts are already outdated
+            pass
+        elif headers and "X-RateLimit-Remaining" in headers:
+            self.__unlimited = False
+            self.__window = window
+            self.limit = int(headers.get("X-RateLimit-Limit", self.limit))
+            remaining = int(headers["X-RateLimit-Remaining"])
+            if self.reset_at is None:
+                # the first response of a window, the requests still in flight aren't counted in it yet
+                self.remaining = max(0, remaining - self.__inflight)
+            else:
+                # responses arrive out of order, an older one can't give back the slots taken since
+                self.remaining = min(self.remaining, remaining)
+            self.reset_at = time.monotonic() + float(headers.get("X-RateLimit-Reset-After", 0))
+        elif headers is not None and self.__window is None and self.reset_at is None:
+            # the route is not rate limited, its requests aren't held back until a response says otherwise
+            self.__unlimited = True
+            self.remaining = self.limit
+        elif self.reset_at is None:
+            # the request never reached discord
+            self.remaining = min(self.remaining + 1, self.limit)
+
+        self.__updated.set()
+
+    def delay(self, retry_after: float) -> None:
+        self.__unlimited = False
+        self.remaining = 0
+        self.reset_at = time.monotonic() + retry_after
+        self.__updated.set()
+
+
+class RateLimiter:
+    """Keeps track of the rate limit buckets, keyed by the bucket hash and major parameter"""
+
+    def __init__(self):
+        self.__buckets: dict[str, Bucket] = dict()
+        self.__hashes: dict[str, str] = dict()
+        self.__global: asyncio.Event = None
+
+    @staticmethod
+    def get_route_key(method: str, route: str) -> tuple[str, Optional[str]]:
+        path = route.split("?", 1)[0]
+        major = match.group(2) if (match := MAJOR_PARAMETERS.match(path)) else None
+
+        path = REACTIONS.sub("/reactions/{emoji}", path)
+        return f"{method} {SNOWFLAKES.sub('/{id}', path)}", major
+
+    def get_bucket(self, method: str, route: str) -> Bucket:
+        route_key, major = self.get_route_key(method, route)
+        key = f"{self.__hashes.get(route_key, route_key)}:{major}"
+
+        bucket = self.__buckets.get(key)
+        if bucket is None:
+            bucket = self.__buckets[key] = Bucket(key)
+            if len(self.__buckets) > 1024:
+                self.prune()
+        return bucket
+
+    def update(self, method: str, route: str, bucket: Bucket, headers: Mapping[str, str]) -> None:
+        if bucket_hash := headers.get("X-RateLimit-Bucket"):
+            route_key, major = self.get_route_key(method, route)
+            self.__hashes[route_key] = bucket_hash
+            # the next requests of the route look the bucket up by its hash, it keeps the limits learnt so far
+            self.__buckets.setdefault(f"{bucket_hash}:{major}", bucket)
+            if len(self.__hashes) > 1024:
+                self.prune()
+        bucket.release(headers)
+
+    def prune(self) -> None:
+        for key in [key for key, bucket in self.__buckets.items() if bucket.is_idle]:
+            del self.__buckets[key]
+
+        # the routes of the pruned buckets learn their hash again from their next response
+        hashes = {key.rsplit(":", 1)[0] for key in self.__buckets}
+        for route_key in [route_key for route_key, bucket_hash in self.__hashes.items() if bucket_hash not in hashes]:
+            del self.__hashes[route_key]
+
+    async def wait_global(self) -> None:
+        if self.__global is not None:
+            await self.__global.wait()
+
+    async def lock_global(self, retry_after: float) -> None:
+        if self.__global is None:
+            self.__global = asyncio.Event()
+            self.__global.set()
+
+        if not self.__global.is_set():
+            return await self.__global.wait()
+
+        logger.warning(f"global rate limit hit, retrying in {retry_after:.2f}s")
+        self.__global.clear()
+        try:
+            await asyncio.sleep(retry_after)
+        finally:
+            self.__global.set()
+
+    async def acquire(self, method: str, route: str) -> Bucket:
+        await self.wait_global()
+        bucket = self.get_bucket(method, route)
+        await bucket.acquire()
+        return bucket
+
+
+class IdentifyLimiter:
+    """Spaces out the IDENTIFY payloads of the clients sharing it, so that accounts don't all connect at once"""
+
+    def __init__(self, interval: float = 5.0):
+        self.interval: float = interval
+
+        self.__lock: asyncio.Lock = asyncio.Lock()
+        self.__last_identify: float = None
+
+    async def acquire(self) -> None:
+        async with self.__lock:
+            if self.__last_identify is not None:
+                delay = self.__last_identify + self.interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.__last_identify = time.monotonic()
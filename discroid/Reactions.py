@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import quote
+
+from discroid.Errors import IllegalArgumentError
+from discroid.Utils import KeyedQueues
+
+if TYPE_CHECKING:
+    from asyncio import Future
+    from typing import Optional, Union
+
+    from discroid.RequestHandler import RequestHandler
+
+logger = getLogger(__name__)
+
+ALL = "*"  # the emoji key of an operation clearing every reaction of a message
+
+
+class ReactionOperation(NamedTuple):
+    emoji: str
+    user_id: Optional[int]
+    remove: bool
+    futures: list[Future]
+
+
+def reaction_route(channel_id: int, message_id: int, emoji: str = None, *, user_id: Union[int, str] = None) -> str:
+    route = f"/channels/{channel_id}/messages/{message_id}/reactions"
+    if emoji is None:
+        return route
+    # keycaps like '#️⃣' would otherwise end the path, the ':' of a custom 'name:id' is kept
+    return route + f"/{quote(emoji, safe=':')}/{user_id or '@me'}?location=Message"
+
+
+def format_emoji(emoji_name: str, emoji_id: int = None) -> str:
+    if not emoji_name:
+        raise IllegalArgumentError("'emoji_name' must be passed as an argument")
+    return f"{emoji_name}:{emoji_id}" if emoji_id else emoji_name
+
+
+class ReactionPipeline:
+    """Queues reaction operations per message and sends them one by one, as fast as the reaction bucket allows
+
+    Pending operations on the same emoji and user collapse into the last one, the superseded futures resolve to None.
+    """
+
+    def __init__(self, http: RequestHandler):
+        self.__http: RequestHandler = http
+        self.__queues: KeyedQueues[OrderedDict[tuple[str, Optional[int]], ReactionOperation]] = KeyedQueues(OrderedDict, self.drain)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self.__queues)
+
+    def add(self, channel_id: int, message_id: int, emoji: str) -> Future:
+        return self.submit(channel_id, message_id, emoji)
+
+    def remove(self, channel_id: int, message_id: int, emoji: str, *, user_id: int = None) -> Future:
+        return self.submit(channel_id, message_id, emoji, user_id=user_id, remove=True)
+
+    def clear(self, channel_id: int, message_id: int) -> Future:
+        """Removes every reaction of a message, the operations queued before it are superseded"""
+        queue = self.__queues.get((channel_id, message_id))
+        if queue:
+            for operation in queue.values():
+                self.__resolve(operation.futures, None)
+            queue.clear()
+        return self.submit(channel_id, message_id, ALL, remove=True)
+
+    def submit(self, channel_id: int, message_id: int, emoji: str, *, user_id: int = None, remove: bool = False) -> Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        key = (channel_id, message_id)
+        queue = self.__queues.queue(key)
+
+        operation_key = (emoji, user_id)
+        pending = queue.get(operation_key)
+        if pending is None:
+            queue[operation_key] = ReactionOperation(emoji, user_id, remove, [future])
+        elif pending.remove == remove:
+            pending.futures.append(future)
+        else:
+            # the later operation decides the final state, the earlier one never has to be sent
+            self.__resolve(pending.futures, None)
+            del queue[operation_key]
+            queue[operation_key] = ReactionOperation(emoji, user_id, remove, [future])
+
+        self.__queues.start(key)
+        return future
+
+    async def drain(self, key: tuple[int, int], queue: OrderedDict[tuple[str, Optional[int]], ReactionOperation]) -> None:
+        channel_id, message_id = key
+        while queue:
+            _, operation = queue.popitem(last=False)
+            if all(future.done() for future in operation.futures):
+                continue
+
+            if operation.emoji == ALL:
+                route = reaction_route(channel_id, message_id)
+            else:
+                route = reaction_route(channel_id, message_id, operation.emoji, user_id=operation.user_id)
+
+            try:
+                # the rate limiter paces the requests to the reaction bucket of the message
+                result = await self.__http.request("DELETE" if operation.remove else "PUT", route)
+            except asyncio.CancelledError:
+                self.__cancel(operation.futures)
+                raise
+            except Exception as exc:
+                for future in operation.futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                self.__resolve(operation.futures, result)
+
+    async def close(self) -> None:
+        for queue in await self.__queues.close():
+            for operation in queue.values():
+                self.__cancel(operation.futures)
+
+    @staticmethod
+    def __resolve(futures: list[Future], result) -> None:
+        for future in futures:
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def __cancel(futures: list[Future]) -> None:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import struct
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+
+import aiohttp
+from aiohttp import web
+
+from discroid.Codec import get_codec
+from discroid.Errors import IllegalArgumentError
+from discroid.Websocket import OPCODE, Inflater
+
+if TYPE_CHECKING:
+    from typing import BinaryIO, Iterator, Optional, Union
+
+    from discroid.Codec import Codec
+
+logger = getLogger(__name__)
+
+MAGIC = b"DRPL\x01"
+# the time since the previous frame, whether the frame is binary and the length of the frame
+FRAME_HEADER = struct.Struct("<d?I")
+
+
+class Frame(NamedTuple):
+    delay: float
+    binary: bool
+    data: bytes
+
+
+class Recorder:
+    """Writes the raw frames received by a Websocket to a file, along with the time elapsed between them
+
+    Frames are buffered and written by a background thread once 'buffer_size' bytes piled up, so that the socket never
+    waits on the disk. The file is only complete once the recorder is closed.
+    """
+
+    def __init__(self, path: str, *, buffer_size: int = 1 << 20):
+        self.path: str = path
+        self.buffer_size: int = buffer_size
+        self.frames: int = 0
+
+        self.__file: BinaryIO = open(path, "wb")
+        self.__buffer: bytearray = bytearray(MAGIC)
+        # a single worker keeps the chunks in order
+        self.__writer: ThreadPoolExecutor = ThreadPoolExecutor(1, thread_name_prefix="discroid-recorder")
+        self.__last_frame: Optional[float] = None
+        self.__closed: bool = False
+
+    @property
+    def is_closed(self) -> bool:
+        return self.__closed
+
+    def record(self, data: Union[bytes, str]) -> None:
+        if self.__closed:
+            return
+
+        now = time.monotonic()
+        delay = 0.0 if self.__last_frame is None else now - self.__last_frame
+        self.__last_frame = now
+
+        binary = isinstance(data, (bytes, bytearray))
+        if not binary:
+            data = data.encode("utf-8")
+
+        self.__buffer += FRAME_HEADER.pack(delay, binary, len(data))
+        self.__buffer += data
+        self.frames += 1
+
+        if len(self.__buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hands the buffered frames to the writer thread"""
+        if self.__buffer:
+            self.__writer.submit(self.__file.write, bytes(self.__buffer))
+            self.__buffer.clear()
+
+    def close(self) -> None:
+        """Writes the buffered frames and closes the file, blocking until they are written"""
+        if self.__closed:
+            return
+
+        self.flush()
+        self.__closed = True
+        self.__writer.shutdown(wait=True)
+        self.__file.close()
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(self, *args, **kwargs) -> None:
+        self.close()
+
+
+def read_recording(path: str) -> Iterator[Frame]:
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise IllegalArgumentError(f"'{path}' is not a discroid recording")
+
+        while header := file.read(FRAME_HEADER.size):
+            if len(header) < FRAME_HEADER.size:
+                raise IllegalArgumentError(f"'{path}' is truncated")
+
+            delay, binary, length = FRAME_HEADER.unpack(header)
+            yield Frame(delay, binary, file.read(length))
+
+
+def load_payloads(path: str, *, codec: Codec = None) -> list[tuple[float, dict]]:
+    """Inflates and decodes the frames of a recording, returning every payload with the delay before it"""
+    codec = codec or get_codec()
+    inflater = Inflater()
+
+    payloads = list()
+    delay = 0.0
+    for frame in read_recording(path):
+        delay += frame.delay
+        if frame.binary:
+            data = inflater.feed(frame.data)
+            if data is None:
+                continue
+        else:
+            data = frame.data
+
+        payloads.append((delay, codec.loads(data)))
+        delay = 0.0
+    return payloads
+
+
+class FakeGateway:
+    """A local gateway replaying a recording to every client connecting to it
+
+    The dispatches are renumbered from 1 and deflated again for every connection, a resumed session continues after the
+    sequence it resumes from. A speed of 0 replays the recording as fast as possible, clearing 'ack_heartbeats' leaves
+    the heartbeats unanswered like a zombied connection would.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        speed: float = 1.0,
+        heartbeat_interval: int = 41250,
+        codec: Codec = None,
+    ):
+        self.speed: float = speed
+        self.heartbeat_interval: int = heartbeat_interval
+        self.codec: Codec = codec or get_codec()
+        self.url: Optional[str] = None
+        self.connections: int = 0
+        self.ack_heartbeats: bool = True
+        self.replayed: asyncio.Event = None
+
+        self.__payloads: list[tuple[float, dict]] = list()
+        self.__ready: Optional[dict] = None
+        self.__sessions: set[str] = set()
+        self.__sockets: set[web.WebSocketResponse] = set()
+        self.__runner: web.AppRunner = None
+
+        sequence = 0
+        for delay, payload in load_payloads(path, codec=self.codec):
+            # the handshake is generated by the fake gateway itself
+            if payload.get("op") != OPCODE.DISPATCH:
+                continue
+            if payload.get("t") == "READY":
+                self.__ready = payload.get("d")
+                continue
+
+            sequence += 1
+            self.__payloads.append((delay, {**payload, "s": sequence}))
+
+    @property
+    def events(self) -> int:
+        return len(self.__payloads)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts serving, returns the url to pass as the 'websocket_route' of Websocket.connect"""
+        self.replayed = asyncio.Event()
+
+        app = web.Application()
+        app.router.add_get("/", self.handler)
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        await web.SockSite(self.__runner, sock).start()
+
+        self.url = f"ws://{host}:{sock.getsockname()[1]}/"
+        return self.url
+
+    async def disconnect(self, code: int = 4000) -> None:
+        """Closes every connection, to test the reconnect and resume paths"""
+        await asyncio.gather(*(ws.close(code=code) for ws in list(self.__sockets)), return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.disconnect(1001)
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+
+        self.connections += 1
+        self.__sockets.add(ws)
+        deflater = zlib.compressobj() if request.query.get("compress") == "zlib-stream" else None
+
+        async def send(payload: dict) -> None:
+            data = self.codec.dumps(payload)
+            if deflater is not None:
+                if isinstance(data, str):
+                    data = data.encode("utf-8")
+                await ws.send_bytes(deflater.compress(data) + deflater.flush(zlib.Z_SYNC_FLUSH))
+            elif self.codec.binary:
+                await ws.send_bytes(data)
+            else:
+                await ws.send_str(data.decode("utf-8") if isinstance(data, bytes) else data)
+
+        replay: Optional[asyncio.Task] = None
+        try:
+            await send({"op": OPCODE.HELLO, "d": {"heartbeat_interval": self.heartbeat_interval}})
+
+            async for message in ws:
+                if message.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    break
+
+                payload = self.codec.loads(message.data)
+                op = payload.get("op")
+                data = payload.get("d")
+
+                if op == OPCODE.HEARTBEAT:
+                    if self.ack_heartbeats:
+                        await send({"op": OPCODE.HEARTBEAT_ACK})
+                elif op == OPCODE.IDENTIFY and replay is None:
+                    session_id = uuid.uuid4().hex
+                    self.__sessions.add(session_id)
+
+                    ready = {**(self.__ready or dict()), "session_id": session_id, "resume_gateway_url": self.url}
+                    await send({"op": OPCODE.DISPATCH, "t": "READY", "s": 0, "d": ready})
+                    replay = asyncio.get_running_loop().create_task(self.replay(send, 0))
+                elif op == OPCODE.RESUME and replay is None:
+                    if data.get("session_id") not in self.__sessions:
+                        await send({"op": OPCODE.INVALID_SESSION, "d": False})
+                        continue
+
+                    sequence = data.get("seq") or 0
+                    replay = asyncio.get_running_loop().create_task(self.replay(send, sequence, resumed=True))
+        finally:
+            if replay is not None:
+                replay.cancel()
+            self.__sockets.discard(ws)
+
+        return ws
+
+    async def replay(self, send, sequence: int, *, resumed: bool = False) -> None:
+        if resumed:
+            await send({"op": OPCODE.DISPATCH, "t": "RESUMED", "s": sequence, "d": dict()})
+
+        try:
+            for delay, payload in self.__payloads:
+                if payload["s"] <= sequence:
+                    continue
+
+                if self.speed and delay:
+                    await asyncio.sleep(delay / self.speed)
+                await send(payload)
+        except ConnectionResetError:
+            return
+
+        self.replayed.set()
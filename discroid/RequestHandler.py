@@ -1,27 +1,81 @@
 from __future__ import annotations
 
 import asyncio
-from json import loads
+import errno
+import random
+import socket
+import time
 from logging import getLogger
 from typing import TYPE_CHECKING
 
 import aiohttp
 import ua_parser.user_agent_parser
 
-from discroid.Abstracts import Cast, StateCast
+from discroid.Abstracts import Cast, StateCast, TypingManager
+from discroid.Cache import ResponseCache
 from discroid.Casts import ClientUser, Message
+from discroid.Codec import get_codec
+from discroid.RateLimiter import RateLimiter
+from discroid.Reactions import ReactionPipeline, format_emoji
 from discroid.Utils import Utils
-from discroid.Errors import IllegalArgumentError
+from discroid.Errors import HTTPError, IllegalArgumentError, LoginFailure, RateLimited, Unauthorized
 
 if TYPE_CHECKING:
-    from typing import Any
+    from asyncio import Future, Task
+    from typing import Any, Optional
 
     from aiohttp import ClientWebSocketResponse
 
+    from .Codec import Codec
     from .Client import Client, State
+    from .Metrics import Metrics
 
 logger = getLogger(__name__)
 
+SAFE_METHODS = ("GET", "HEAD")
+
+
+class RetryPolicy:
+    """Decides which failed requests are retried and how long to wait in between"""
+
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+    TRANSIENT_ERRNOS = (errno.ECONNRESET, errno.ECONNREFUSED, errno.ETIMEDOUT)
+
+    def __init__(
+        self,
+        retries: int = 3,
+        *,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 10.0,
+        retry_statuses: tuple[int, ...] = (500, 502, 503, 504),
+        max_retry_after: float = 60.0,
+        timeout: float = 30.0,
+    ):
+        self.retries: int = retries
+        self.backoff_base: float = backoff_base
+        self.backoff_cap: float = backoff_cap
+        self.retry_statuses: tuple[int, ...] = retry_statuses
+        self.max_retry_after: float = max_retry_after  # 429s asking to wait longer are raised instead
+        self.timeout: float = timeout
+
+    def is_retryable(self, method: str, json: dict = None) -> bool:
+        """Only retries requests that can't create duplicates, POSTs are made safe by the nonce discord deduplicates on"""
+        return method in self.IDEMPOTENT_METHODS or (isinstance(json, dict) and bool(json.get("nonce")))
+
+    def is_transient(self, exc: BaseException) -> bool:
+        """Only connection resets, refusals and timeouts are retried, a failed DNS lookup or certificate check won't fix itself"""
+        if isinstance(exc, (asyncio.TimeoutError, ConnectionResetError, ConnectionRefusedError, aiohttp.ServerDisconnectedError)):
+            return True
+        if isinstance(exc, aiohttp.ClientConnectorError):
+            exc = exc.os_error
+        if isinstance(exc, socket.gaierror):
+            return False
+        return isinstance(exc, OSError) and exc.errno in self.TRANSIENT_ERRNOS
+
+    def delay(self, tries: int) -> float:
+        delay = min(self.backoff_cap, self.backoff_base * 2**tries)
+        return delay / 2 + random.uniform(0, delay / 2)
+
 
 class RequestHandler:
     def __init__(
@@ -29,19 +83,88 @@ class RequestHandler:
         *,
         proxy: str = None,
         retries: int = 3,
+        retry_policy: RetryPolicy = None,
         cookies: Any = None,
         api_version: int = 9,
+        codec: Codec = None,
+        connector: aiohttp.BaseConnector = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 60.0,
+        ttl_dns_cache: int = 300,
+        response_cache_ttl: float = 0,
+        base_route: str = None,
     ):
-        self.retries: int = retries
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy(retries)
+        self.codec: Codec = codec or get_codec()
 
         self.api_version: int = api_version
-        self.base_route: str = f"https://discord.com/api/v{api_version}"
+        self.base_route: str = base_route or f"https://discord.com/api/v{api_version}"
 
         self._state: State = None
         self.__proxy: str = proxy
         self.__headers: dict = None
         self.__cookies: Any = cookies
-        self.__session: aiohttp.ClientSession = aiohttp.ClientSession()
+        self.__ratelimiter: RateLimiter = RateLimiter()
+        # a connector passed in is shared with other handlers and is not closed by this one
+        self.connector: Optional[aiohttp.BaseConnector] = connector
+        self.__connector_options: dict = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": ttl_dns_cache,
+        }
+        self.__session: aiohttp.ClientSession = None
+        # concurrent identical GETs share a single request
+        self.__inflight: dict[tuple[str, str], Task] = dict()
+        self.responses: Optional[ResponseCache] = ResponseCache(response_cache_ttl) if response_cache_ttl else None
+        self.reactions: ReactionPipeline = ReactionPipeline(self)
+        self.typing: TypingManager = TypingManager(self)
+        self.metrics: Optional[Metrics] = None
+
+    @staticmethod
+    def create_connector(
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 60.0,
+        ttl_dns_cache: int = 300,
+    ) -> aiohttp.TCPConnector:
+        """Creates a connector tuned to keep connections to discord alive, must be called in a running loop"""
+        return aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=ttl_dns_cache,
+            use_dns_cache=ttl_dns_cache != 0,
+            enable_cleanup_closed=True,
+        )
+
+    @staticmethod
+    def create_trace_config() -> aiohttp.TraceConfig:
+        """Resolves the 'sent' future passed to _request once the body of the request was written"""
+
+        async def on_request_chunk_sent(session, context, params) -> None:
+            sent = (context.trace_request_ctx or dict()).get("sent")
+            if sent is not None and not sent.done():
+                sent.set_result(None)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+        return trace_config
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The session, created on first use so that it is bound to the running loop"""
+        if self.__session is None or self.__session.closed:
+            trace_configs = [self.create_trace_config()]
+            if self.connector is None:
+                self.__session = aiohttp.ClientSession(
+                    connector=self.create_connector(**self.__connector_options), trace_configs=trace_configs
+                )
+            else:
+                self.__session = aiohttp.ClientSession(connector=self.connector, connector_owner=False, trace_configs=trace_configs)
+        return self.__session
 
     async def set_headers(
         self,
@@ -60,7 +183,6 @@ class RequestHandler:
             "Cache-Control": "no-cache",
             "Content-Type": "application/json",
             "Pragma": "no-cache",
-            "Referer": None,  # is set before every request
             "Sec-Ch-Ua": '" Not A;Brand";v="99", "Chromium";v="{0}", "Google Chrome";v="{0}"'.format(parsed_ua["user_agent"]["major"]),
             "Sec-Ch-Ua-Mobile": "?0",
             "Sec-Ch-Ua-Platform": '"{}"'.format(parsed_ua["os"]["family"]),
@@ -85,50 +207,167 @@ class RequestHandler:
         cast: Cast = None,
         base_route: str = None,
     ) -> Any:
+        if method in SAFE_METHODS:
+            data = await self.fetch(method, route, base_route=base_route)
+        else:
+            data = await self._request(method, route, json, base_route=base_route)
+            if self.responses is not None:
+                self.responses.remove(f"{base_route or self.base_route}{route}")
+
+        if cast:
+            if issubclass(cast, StateCast):
+                return cast(data, self._state)
+            return cast(data)
+        return data
+
+    async def fetch(self, method: str, route: str, *, base_route: str = None) -> Any:
+        """Coalesces concurrent identical requests into one and serves them from the response cache when enabled"""
+        key = (method, f"{base_route or self.base_route}{route}")
+
+        task = self.__inflight.get(key)
+        if task is None:
+            task = self.__inflight[key] = asyncio.get_running_loop().create_task(self.__fetch(method, route, base_route=base_route))
+            task.add_done_callback(lambda _: self.__inflight.pop(key, None))
+
+        # a caller being cancelled must not cancel the request the others are waiting on
+        return await asyncio.shield(task)
+
+    async def __fetch(self, method: str, route: str, *, base_route: str = None) -> Any:
+        responses = self.responses
+        if responses is None or method != "GET":
+            return await self._request(method, route, base_route=base_route)
+
+        url = f"{base_route or self.base_route}{route}"
+        cached = responses.get(url)
+        if cached is not None and responses.is_fresh(cached):
+            return cached.data
+
+        headers = {"If-None-Match": cached.etag} if cached is not None and cached.etag else None
+        status, response_headers, data = await self._request(method, route, base_route=base_route, headers=headers, full=True)
+        etag = response_headers.get("ETag")
+        if status == 304:
+            # a 304 doesn't have to repeat the ETag, the cached one still holds
+            data = cached.data
+            etag = etag or cached.etag
+
+        responses.add(url, data, etag=etag)
+        return data
+
+    async def _request(
+        self,
+        method: str,
+        /,
+        route: str,
+        json: dict = None,
+        *,
+        base_route: str = None,
+        headers: dict = None,
+        full: bool = False,
+        decode: bool = True,
+        sent: Future = None,
+    ) -> Any:
+        """Sends a request, retrying it as the policy allows, returns the decoded body or the status, headers and body if full
+
+        'sent' resolves as soon as the request was written, before its response arrives.
+        """
+        bucket_route = route
         route = f"{base_route or self.base_route}{route}"
-        self.__headers["Referer"] = route
 
         kwargs = {
-            "json": json,
+            "data": None if json is None else self.codec.dumps(json),
             "proxy": self.__proxy,
-            "headers": self.__headers,
+            "headers": {**self.__headers, "Referer": route, **(headers or dict())},
             "cookies": self.__cookies,
+            "timeout": aiohttp.ClientTimeout(total=self.retry_policy.timeout),
         }
+        if sent is not None:
+            kwargs["trace_request_ctx"] = {"sent": sent}
+
+        policy = self.retry_policy
+        retryable = policy.is_retryable(method, json)
+
+        metrics = self.metrics
+        if metrics is not None:
+            # routes are labelled by their template, so that every snowflake doesn't create a new series
+            template = RateLimiter.get_route_key(method, bucket_route)[0].partition(" ")[2]
 
-        for tries in range(self.retries):
+        tries = 0
+        while True:
+            error: HTTPError = None
+
+            bucket = await self.__ratelimiter.acquire(method, bucket_route)
+            # the slot is given back by update once a response arrives, only failures before that release it
+            released = False
             try:
-                async with self.__session.request(method, route, **kwargs) as response:
-                    text = await response.text(encoding="utf-8")
-                    data = text
-                    try:
-                        if response.headers["content-type"] == "application/json":
-                            data = loads(text)
-                    except KeyError:
-                        pass
+                started = time.perf_counter()
+                async with self.session.request(method, route, **kwargs) as response:
+                    if sent is not None and not sent.done():
+                        sent.set_result(None)
+                    self.__ratelimiter.update(method, bucket_route, bucket, response.headers)
+                    released = True
+                    if metrics is not None:
+                        metrics.rest_latency.observe(time.perf_counter() - started, (method, template))
+                        metrics.rest_responses.inc((method, template, response.status))
+
+                    body = await response.read()
+                    if not decode and 300 > response.status >= 200:
+                        data = None
+                    elif response.content_type == "application/json":
+                        data = self.codec.loads(body)
+                    else:
+                        data = body.decode("utf-8")
 
                     log_message = f"{method} {response.status} {route} : {json} -> {data}"
 
-                    if 300 > response.status >= 200:
+                    if 300 > response.status >= 200 or response.status == 304:
                         logger.debug(log_message)
-                        args = (data,)
-                        if cast:
-                            if issubclass(cast, StateCast):
-                                args = (data, self._state)
-
-                            return cast(*args)
+                        if full:
+                            return response.status, response.headers, data
                         return data
+                    elif response.status == 429:
+                        retry_after = float(response.headers.get("Retry-After", 0) or 0)
+                        if isinstance(data, dict):
+                            retry_after = float(data.get("retry_after", retry_after))
+
+                        is_global = bool(response.headers.get("X-RateLimit-Global") or (isinstance(data, dict) and data.get("global")))
+                        if metrics is not None:
+                            metrics.rest_ratelimits.inc((template, "global" if is_global else "bucket"))
+
+                        if retry_after > policy.max_retry_after:
+                            error = RateLimited(status=response.status, body=data, method=method, route=route)
+                        elif is_global:
+                            await self.__ratelimiter.lock_global(retry_after)
+                            continue
+                        else:
+                            logger.warning(f"{method} {route} rate limited, retrying in {retry_after:.2f}s")
+                            bucket.delay(retry_after)
+                            continue
                     else:
                         logger.error(log_message)
-                        break
-
-            except OSError as e:
-                if tries < 4 and e.errno in (54, 10054):
-                    await asyncio.sleep(1 + tries * 2)
-                    continue
+                        error = HTTPError.from_status(response.status, body=data, method=method, route=route)
+
+            except (OSError, asyncio.TimeoutError, aiohttp.ClientConnectionError) as exc:
+                if not released:
+                    bucket.release()
+                if not retryable or tries >= policy.retries or not policy.is_transient(exc):
+                    raise
+                logger.warning(f"{method} {route} failed with {exc!r}, retrying")
+            except BaseException:
+                if not released:
+                    bucket.release()
                 raise
+            else:
+                if not retryable or tries >= policy.retries or error.status not in policy.retry_statuses:
+                    raise error
+
+            await asyncio.sleep(policy.delay(tries))
+            tries += 1
 
     async def close(self):
-        await self.__session.close()
+        await self.reactions.close()
+        await self.typing.close()
+        if self.__session is not None:
+            await self.__session.close()
 
     async def login(
         self,
@@ -141,7 +380,10 @@ class RequestHandler:
         self._state = client.get_state()
 
         await self.set_headers(token=token, locale=locale, user_agent=user_agent)
-        return await self.request("GET", "/users/@me", cast=ClientUser)
+        try:
+            return await self.request("GET", "/users/@me", cast=ClientUser)
+        except Unauthorized as exc:
+            raise LoginFailure("improper token has been passed", status=exc.status, body=exc.body) from exc
 
     async def connect_to_websocket(
         self,
@@ -158,7 +400,7 @@ class RequestHandler:
             "compress": compress,
         }
 
-        return await self.__session.ws_connect(route, **kwargs)
+        return await self.session.ws_connect(route, **kwargs)
 
     async def location_metadata(self):
         raise NotImplementedError
@@ -189,7 +431,13 @@ class RequestHandler:
         allowed_mentions: list = None,
         message_reference: dict = None,
         nonce: str = None,
-    ) -> Message:
+        wait: bool = True,
+        sent: Future = None,
+    ) -> Optional[Message]:
+        """Sends a message, the created message isn't parsed out of the response unless 'wait' is passed
+
+        Without 'wait', the 'sent' future resolves as soon as the request was written.
+        """
         json = {
             "content": content,
             "nonce": nonce or Utils.calculate_nonce(),
@@ -204,6 +452,8 @@ class RequestHandler:
             json["message_reference"] = message_reference
 
         route = f"/channels/{channel_id}/messages"
+        if not wait:
+            return await self._request("POST", route, json, decode=False, sent=sent)
         return await self.request("POST", route, json=json, cast=Message)
 
     async def trigger_typing(self, channel_id: int) -> None:
@@ -279,20 +529,17 @@ class RequestHandler:
         remove_all: bool = False,
     ) -> None:
         if not remove and user_id:
-            raise IllegalArgumentError("cannot remove reactions sent by others")
+            raise IllegalArgumentError("cannot add reactions on behalf of other users")
         if emoji_id and not emoji_name:
             raise IllegalArgumentError("'emoji_name' must be passed as an argument for custom emojis")
 
-        route = f"/channels/{channel_id}/messages/{message_id}/reactions"
-
-        if not remove_all:
-            if not emoji_name:
-                raise IllegalArgumentError("'emoji_name' must be passed as an argument")
-
-            route += f"/{emoji_name}" + (":" + emoji_id if emoji_id else "")
-            route += f"/{user_id or '/@me'}?location=Message"
+        if remove_all:
+            return await self.reactions.clear(channel_id, message_id)
 
-        return await self.request("DELETE" if remove or remove_all else "PUT", route)
+        emoji = format_emoji(emoji_name, emoji_id)
+        if remove:
+            return await self.reactions.remove(channel_id, message_id, emoji, user_id=user_id)
+        return await self.reactions.add(channel_id, message_id, emoji)
 
     async def delete_reaction(self, *args, **kwargs):
         return await self.react(*args, **kwargs, remove=True)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import multiprocessing
+import os
+import queue
+import time
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+
+from discroid.Errors import PoolFailure
+from discroid.Pool import ClientPool
+
+if TYPE_CHECKING:
+    from multiprocessing.context import SpawnProcess
+    from typing import Any, Callable, Iterable, Optional
+
+    from discroid.Client import Client
+
+logger = getLogger(__name__)
+
+
+class ForwardedEvent(NamedTuple):
+    worker: int
+    user_id: Optional[int]
+    event: str
+    data: dict
+
+
+class HashRing:
+    """A consistent hash ring, adding or removing a node only moves the keys that belonged to it"""
+
+    def __init__(self, nodes: Iterable[int], *, replicas: int = 160):
+        self.replicas: int = replicas
+
+        self.__hashes: list[int] = list()
+        self.__nodes: list[int] = list()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def add(self, node: int) -> None:
+        for replica in range(self.replicas):
+            index = bisect.bisect(self.__hashes, value := self.hash(f"{node}:{replica}"))
+            self.__hashes.insert(index, value)
+            self.__nodes.insert(index, node)
+
+    def get(self, key: str) -> int:
+        index = bisect.bisect(self.__hashes, self.hash(key)) % len(self.__hashes)
+        return self.__nodes[index]
+
+
+def _run_worker(
+    index: int,
+    tokens: list[str],
+    factory: Callable[[], Client],
+    events: tuple[str, ...],
+    events_queue: Optional[multiprocessing.Queue],
+    identify_interval: float,
+) -> None:
+    pool = ClientPool(identify_interval=identify_interval)
+
+    for token in tokens:
+        client = factory()
+
+        for event in events:
+
+            async def forward(data: dict, client: Client = client, event: str = event) -> None:
+                try:
+                    events_queue.put_nowait(ForwardedEvent(index, client.user.id if client.user else None, event, data))
+                except queue.Full:
+                    logger.warning(f"event queue full, dropped a forwarded {event} event")
+
+            client.event(event, raw=True)(forward)
+
+        pool.add(client, token)
+
+    try:
+        pool.run()
+    except PoolFailure as exc:
+        # a non zero exit code gets the worker restarted by the supervisor
+        logger.error(f"worker {index} stopping: {exc}")
+        raise SystemExit(1) from exc
+
+
+class Supervisor:
+    """Spreads accounts across worker processes running a ClientPool each, the client factory must be a module level function"""
+
+    def __init__(
+        self,
+        factory: Callable[[], Client],
+        tokens: Iterable[str],
+        *,
+        workers: int = None,
+        forward_events: Iterable[str] = (),
+        consumer: Callable[[ForwardedEvent], Any] = None,
+        max_queue_size: int = 10000,
+        restart_delay: float = 5.0,
+        identify_interval: float = 5.0,
+    ):
+        self.factory: Callable[[], Client] = factory
+        self.workers: int = workers or os.cpu_count() or 1
+        self.forward_events: tuple[str, ...] = tuple(forward_events)
+        self.consumer: Optional[Callable[[ForwardedEvent], Any]] = consumer
+        self.restart_delay: float = restart_delay
+        self.identify_interval: float = identify_interval
+
+        self.__context = multiprocessing.get_context("spawn")
+        self.__queue: Optional[multiprocessing.Queue] = self.__context.Queue(max_queue_size) if self.forward_events else None
+        self.__ring: HashRing = HashRing(range(self.workers))
+        self.__assignments: dict[int, list[str]] = {worker: list() for worker in range(self.workers)}
+        self.__processes: dict[int, SpawnProcess] = dict()
+        self.__restarts: dict[int, float] = dict()
+        self.__running: bool = False
+
+        for token in tokens:
+            self.__assignments[self.__ring.get(token)].append(token)
+
+    @property
+    def assignments(self) -> dict[int, int]:
+        """The number of accounts assigned to every worker"""
+        return {worker: len(tokens) for worker, tokens in self.__assignments.items()}
+
+    def start_worker(self, index: int) -> None:
+        tokens = self.__assignments[index]
+        if not tokens:
+            return
+
+        process = self.__context.Process(
+            target=_run_worker,
+            args=(index, tokens, self.factory, self.forward_events, self.__queue, self.identify_interval),
+            name=f"discroid-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.__processes[index] = process
+        logger.debug(f"started worker {index} (pid {process.pid}) with {len(tokens)} accounts")
+
+    def check_workers(self) -> None:
+        """Restarts the workers that exited, after the restart delay"""
+        now = time.monotonic()
+        for index, process in list(self.__processes.items()):
+            if process.is_alive():
+                continue
+
+            if index not in self.__restarts:
+                logger.error(f"worker {index} exited with code {process.exitcode}, restarting in {self.restart_delay}s")
+                self.__restarts[index] = now + self.restart_delay
+            elif now >= self.__restarts[index]:
+                del self.__restarts[index]
+                self.start_worker(index)
+
+    def run(self) -> None:
+        """A blocking call that runs the workers and the consumer of the forwarded events"""
+        self.__running = True
+        for index in range(self.workers):
+            self.start_worker(index)
+
+        next_check = time.monotonic()
+        try:
+            while self.__running:
+                if self.__queue is None:
+                    time.sleep(1.0)
+                else:
+                    try:
+                        event = self.__queue.get(timeout=1.0)
+                    except queue.Empty:
+                        pass
+                    else:
+                        if self.consumer:
+                            try:
+                                self.consumer(event)
+                            except Exception:
+                                logger.exception(f"consumer raised while handling a forwarded {event.event} event")
+
+                if time.monotonic() >= next_check:
+                    self.check_workers()
+                    next_check = time.monotonic() + 1.0
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        self.__running = False
+
+    def close(self) -> None:
+        self.__running = False
+        for process in self.__processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.__processes.values():
+            process.join(timeout=10)
+        self.__processes.clear()
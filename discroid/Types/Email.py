@@ -1,2 +1,2 @@
 class Email(str):
-    pass
+    __slots__ = ()
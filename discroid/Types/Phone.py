@@ -1,2 +1,2 @@
 class Phone(str):
-    pass
+    __slots__ = ()
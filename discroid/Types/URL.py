@@ -1,2 +1,2 @@
 class URL(str):
-    pass
+    __slots__ = ()
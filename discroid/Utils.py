@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import time
 from random import randint
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Generic, TypeVar
 
 if TYPE_CHECKING:
-    from typing import Any
+    from asyncio import Task
+    from typing import Any, Awaitable, Callable, Hashable, Iterator, Optional
+
+Q = TypeVar("Q")
 
 
 class Utils:
@@ -16,3 +20,54 @@ class Utils:
     @staticmethod
     def bind_to_list(data: list, bind: Any) -> list[Any]:
         return [bind(datem) for datem in data]
+
+
+class KeyedQueues(Generic[Q]):
+    """A queue per key, drained by a task started with its first item and dropped along with the queue once it is empty"""
+
+    def __init__(self, factory: Callable[[], Q], drain: Callable[[Hashable, Q], Awaitable[None]]):
+        self.__factory: Callable[[], Q] = factory
+        self.__drain: Callable[[Hashable, Q], Awaitable[None]] = drain
+        self.__queues: dict[Hashable, Q] = dict()
+        self.__tasks: dict[Hashable, Task] = dict()
+
+    def __iter__(self) -> Iterator[Q]:
+        return iter(self.__queues.values())
+
+    def get(self, key: Hashable) -> Optional[Q]:
+        return self.__queues.get(key)
+
+    def queue(self, key: Hashable) -> Q:
+        """The queue of the key, created when there is none"""
+        queue = self.__queues.get(key)
+        if queue is None:
+            queue = self.__queues[key] = self.__factory()
+        return queue
+
+    def start(self, key: Hashable) -> None:
+        """Starts draining the queue of the key, unless it already is"""
+        if key not in self.__tasks:
+            self.__tasks[key] = asyncio.get_running_loop().create_task(self.__run(key))
+
+    async def __run(self, key: Hashable) -> None:
+        queue = self.__queues[key]
+        try:
+            await self.__drain(key, queue)
+        finally:
+            # dropped before the awaiters resume, so that the next item starts a new task
+            self.__tasks.pop(key, None)
+            if not queue:
+                self.__queues.pop(key, None)
+
+    async def close(self) -> list[Q]:
+        """Cancels the tasks, returns the queues left with the items that were never drained"""
+        tasks = list(self.__tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # a task cancelled before it started never reached its finally
+        self.__tasks.clear()
+
+        queues = list(self.__queues.values())
+        self.__queues.clear()
+        return queues
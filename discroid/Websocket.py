@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import random
 import time
 import zlib
 from logging import getLogger
@@ -9,21 +9,34 @@ from typing import TYPE_CHECKING, NamedTuple
 
 import aiohttp
 
-from discroid.Abstracts import Cast, StateCast
+from discroid.Abstracts import Cast, LazyCast, StateCast
 from discroid.Casts import Message
+from discroid.Codec import get_codec
+from discroid.Dispatcher import Dispatcher
 from discroid.Errors import WebsocketClosure, WebsocketError
 
 if TYPE_CHECKING:
     from asyncio import AbstractEventLoop, Event, Future, Task
-    from typing import Any, Awaitable, Callable, Optional
+    from typing import Any, Awaitable, Callable, Iterable, Optional
 
     from aiohttp import ClientWebSocketResponse
 
+    from .Codec import Codec
     from .Client import Client, State
+    from .Metrics import Metrics
+    from .Replay import Recorder
+    from .RateLimiter import IdentifyLimiter
 
 
 logger = getLogger(__name__)
 
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+# close codes after which reconnecting won't help
+FATAL_CLOSE_CODES = (4004, 4010, 4011, 4012, 4013, 4014)
+# close codes after which the session can't be resumed
+UNRESUMABLE_CLOSE_CODES = (1000, 1001, 4007, 4009)
+
 
 class OPCODE:
     DISPATCH = 0  # Receive         dispatches an event
@@ -67,6 +80,50 @@ class EventListener(NamedTuple):
     future: asyncio.Future[Any]
 
 
+class Inflater:
+    """Collects zlib-stream frames until a Z_SYNC_FLUSH and inflates them in one pass"""
+
+    def __init__(self, *, buffer_size: int = 2**20):
+        self.buffer_size: int = buffer_size
+
+        self.__buffer: bytearray = bytearray()
+        self.__zlib = zlib.decompressobj()
+
+    def feed(self, data: bytes) -> Optional[bytes]:
+        """Returns the inflated payload once a complete message was received, otherwise None, raises zlib.error on a corrupted stream"""
+        buffer = self.__buffer
+        buffer.extend(data)
+
+        if len(data) < 4 or data[-4:] != ZLIB_SUFFIX:
+            return None
+
+        try:
+            return self.__zlib.decompress(buffer)
+        finally:
+            if len(buffer) > self.buffer_size:
+                # don't hold on to the memory of a huge READY/GUILD_CREATE
+                self.__buffer = bytearray()
+            else:
+                buffer.clear()
+
+
+class Backoff:
+    """Exponential backoff with jitter, capped at a maximum delay"""
+
+    def __init__(self, base: float = 1.0, cap: float = 60.0):
+        self.base: float = base
+        self.cap: float = cap
+        self.attempts: int = 0
+
+    def delay(self) -> float:
+        delay = min(self.cap, self.base * 2**self.attempts)
+        self.attempts += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
 class Heart:
     """Handles heartbeating"""
 
@@ -79,6 +136,13 @@ class Heart:
         self.last_heartbeat_ack: float = None
         self.heartbeat_interval: int = None
 
+    @property
+    def is_acked(self) -> bool:
+        """Whether the last heartbeat sent was acknowledged"""
+        if self.last_heartbeat is None:
+            return True
+        return self.last_heartbeat_ack is not None and self.last_heartbeat_ack >= self.last_heartbeat
+
     @property
     def latency(self):
         if all((self.last_heartbeat_ack, self.last_heartbeat)):
@@ -87,6 +151,8 @@ class Heart:
 
     def ack(self):
         self.last_heartbeat_ack = time.perf_counter()
+        if self.wss.metrics is not None and self.last_heartbeat is not None:
+            self.wss.metrics.heartbeat_rtt.observe(self.latency)
 
     async def start(self):
         payload = await self.wss.receive()
@@ -96,10 +162,25 @@ class Heart:
             self.heartbeat_interval: int = data.get("heartbeat_interval")
 
         async def worker():
-            while True:
-                await self.wss.send({"op": OPCODE.HEARTBEAT, "d": self.wss.last_sequence})
-                self.last_heartbeat = time.perf_counter()
-                await asyncio.sleep((self.heartbeat_interval) / 1000)
+            interval = self.heartbeat_interval / 1000
+            # the first heartbeat is jittered so that reconnecting clients don't heartbeat in lockstep
+            await asyncio.sleep(interval * random.random())
+
+            try:
+                while True:
+                    if not self.is_acked:
+                        logger.warning("heartbeat was not acknowledged, reconnecting the zombied connection")
+                        break
+
+                    # set first, the ack can be read while the heartbeat is still being sent
+                    self.last_heartbeat = time.perf_counter()
+                    await self.wss.send({"op": OPCODE.HEARTBEAT, "d": self.wss.last_sequence})
+                    await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("failed to send a heartbeat, reconnecting")
+            await self.wss.abort()
 
         self.worker = self.loop.create_task(worker())
 
@@ -112,25 +193,55 @@ class Websocket:
     def __init__(
         self,
         api_version: int,
+        *,
+        codec: Codec = None,
+        lazy_casts: bool = False,
+        keep_raw_data: bool = False,
+        dispatcher: Dispatcher = None,
     ) -> None:
+        self.codec: Codec = codec or get_codec()
+        self.dispatcher: Dispatcher = dispatcher or Dispatcher()
+        self.lazy_casts: bool = lazy_casts
+        self.keep_raw_data: bool = keep_raw_data
         self.is_ready: Event = None
         self.is_closed: bool = True
         self.session_id: str = None
         self.api_version = api_version
-        self.last_sequence = None
+        self.last_sequence: Optional[int] = None
         self.websocket_route: str = None
+        self.resume_gateway_url: Optional[str] = None
+        self.identify_limiter: Optional[IdentifyLimiter] = None
+        self.metrics: Optional[Metrics] = None
+        self.recorder: Optional[Recorder] = None  # captures the raw frames received, see discroid.Replay
 
         self._state: State = None
         self.__heart: Heart = None
-        self.__zlib = None
+        self.__backoff: Backoff = None
+        self.__closing: Event = None  # set by close, stops connect from reconnecting
+        self.__inflater: Inflater = Inflater()
         self.__loop: AbstractEventLoop = None
         self.__websocket: ClientWebSocketResponse = None
         self.__dispatch_handlers: dict[str, list[Awaitable]] = dict()
-        self.__dispatch_listeners: list[EventListener] = list()
+        self.__raw_handlers: dict[str, list[Awaitable]] = dict()
+        self.__dispatch_listeners: dict[str, dict[Future, EventListener]] = dict()
+        self.__parsers: dict[str, Callable[[Any], None]] = {
+            "MESSAGE_CREATE": self.parse_message_create,
+            "MESSAGE_UPDATE": self.parse_message_update,
+            "MESSAGE_DELETE": self.parse_message_delete,
+            "MESSAGE_DELETE_BULK": self.parse_message_delete_bulk,
+            "GUILD_CREATE": self.parse_guild_create,
+            "GUILD_UPDATE": self.parse_guild_create,
+            "GUILD_DELETE": self.parse_guild_delete,
+            "CHANNEL_CREATE": self.parse_channel_create,
+            "CHANNEL_UPDATE": self.parse_channel_create,
+            "CHANNEL_DELETE": self.parse_channel_delete,
+            "GUILD_MEMBER_LIST_UPDATE": self.parse_guild_member_list_update,
+            "GUILD_MEMBERS_CHUNK": self.parse_guild_members_chunk,
+        }
 
     @property
     def latency(self) -> float:
-        return self.__heart.latency
+        return self.__heart.latency if self.__heart is not None else float("inf")
 
     @property
     def heartbeat_interval(self) -> float:
@@ -155,53 +266,149 @@ class Websocket:
     def prepare_payload(cls, op: int, /, data: dict) -> dict:
         return {"op": op, "d": data}
 
-    def decompress(self, payload) -> dict:
+    def decompress(self, payload: bytes) -> Optional[dict]:
         try:
-            payload = self.__zlib.decompress(payload)
-        except zlib.error:
-            logger.error(f"error decompressing {payload}")
+            payload = self.__inflater.feed(payload)
+        except zlib.error as exc:
+            # every following frame depends on the broken one, a new connection starts a new stream and resuming
+            # replays the events lost with it
+            logger.error(f"corrupted zlib-stream, reconnecting: {exc}")
+            raise WebsocketClosure(resumable=True) from exc
+        if payload is None:
+            return None
 
-        return json.loads(payload.decode("UTF8"))
+        if self.metrics is not None:
+            self.metrics.gateway_bytes.inc(("inflated",), len(payload))
+
+        return self.codec.loads(payload)
 
     async def send(self, payload: dict) -> None:
         logger.debug(f"sending {payload}")
-        await self.__websocket.send_json(payload)
+        data = self.codec.dumps(payload)
+        if self.codec.binary:
+            await self.__websocket.send_bytes(data)
+        else:
+            # json has to go out as a text frame, even when the codec dumped it to bytes
+            await self.__websocket.send_str(data.decode("utf-8") if isinstance(data, bytes) else data)
 
     async def receive(self) -> dict:
-        payload = await self.__websocket.receive(self.heartbeat_interval)
-
-        if payload.type is aiohttp.WSMsgType.BINARY:
-            _json = self.decompress(payload.data)
-            logger.debug(f"received {_json}")
-            return _json
-        elif payload.type is aiohttp.WSMsgType.ERROR:
-            raise WebsocketError(payload.data)
-        elif payload.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSE):
-            raise WebsocketClosure
-        else:
-            logger.warn(f"unhandled websocket payload type {payload.type}")
+        # acks arrive every heartbeat, so going two intervals without a message means the connection is dead
+        timeout = self.heartbeat_interval * 2 / 1000 if self.__heart and self.heartbeat_interval else None
+        while True:
+            payload = await self.__websocket.receive(timeout)
+
+            if payload.type is aiohttp.WSMsgType.BINARY:
+                if self.recorder is not None:
+                    self.recorder.record(payload.data)
+                if self.metrics is not None:
+                    self.metrics.gateway_bytes.inc(("compressed",), len(payload.data))
+                _json = self.decompress(payload.data)
+                if _json is None:
+                    # the message is split across multiple frames
+                    continue
+                logger.debug(f"received {_json}")
+                return _json
+            elif payload.type is aiohttp.WSMsgType.TEXT:
+                if self.recorder is not None:
+                    self.recorder.record(payload.data)
+                if self.metrics is not None:
+                    self.metrics.gateway_bytes.inc(("inflated",), len(payload.data))
+                _json = self.codec.loads(payload.data)
+                logger.debug(f"received {_json}")
+                return _json
+            elif payload.type is aiohttp.WSMsgType.ERROR:
+                raise WebsocketError(payload.data)
+            elif payload.type is aiohttp.WSMsgType.CLOSE:
+                raise WebsocketClosure(payload.data)
+            elif payload.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING):
+                raise WebsocketClosure(self.__websocket.close_code)
+            else:
+                logger.warn(f"unhandled websocket payload type {payload.type}")
 
     def register_listner(self, event: str, *, check: Callable[[dict[str, Any]], bool], result: Any = None, future: Future = None) -> Future:
         if not future:
             future = self.__loop.create_future()
         entry = EventListener(event=event, check=check, result=result, future=future)
-        self.__dispatch_listeners.append(entry)
+        self.__dispatch_listeners.setdefault(event, dict())[future] = entry
+        # drops listeners as soon as they are resolved, cancelled or timed out
+        future.add_done_callback(lambda future: self.remove_listener(event, future))
         return future
 
-    def register_handler(self, event: str, *, func: Awaitable, cast_to: Any = None) -> None:
-        handlers = self.__dispatch_handlers.get(event, list())
+    def remove_listener(self, event: str, future: Future) -> None:
+        listeners = self.__dispatch_listeners.get(event)
+        if listeners is not None:
+            listeners.pop(future, None)
+            if not listeners:
+                del self.__dispatch_listeners[event]
+
+    def register_handler(self, event: str, *, func: Awaitable, cast_to: Any = None, raw: bool = False) -> None:
+        """Registers a handler for an event, raw handlers receive the payload before it is cast"""
+        registry = self.__raw_handlers if raw else self.__dispatch_handlers
+        handlers = registry.get(event, list())
         handlers.append(func)
-        self.__dispatch_handlers[event] = handlers
+        registry[event] = handlers
 
     async def hello(self) -> None:
         self.__heart = Heart(self.__loop, self)
         await self.__heart.start()
 
     async def ready(self, data: dict) -> None:
-        self.is_ready.set()
         self.session_id = data.get("session_id")
+        self.resume_gateway_url = data.get("resume_gateway_url")
+        # subscriptions don't survive a new session
+        self._state.member_lists.clear()
+
+        entities = self._state.entities
+        for _user in data.get("users", list()):
+            entities.store_user(_user, self._state)
+        for _guild in data.get("guilds", list()):
+            entities.store_guild(_guild, self._state)
+        for _channel in data.get("private_channels", list()):
+            entities.store_channel(_channel, self._state)
+
+        self.is_ready.set()
+
+    def parse_message_create(self, message: Message) -> None:
+        self._state.messages.add(message)
+        if message.nonce is not None:
+            self._state.outbound.resolve(message)
+
+    def parse_message_update(self, data: dict) -> None:
+        if message := self._state.messages.get(int(data.get("id"))):
+            message._update(data)
+
+    def parse_message_delete(self, data: dict) -> None:
+        self._state.messages.remove(int(data.get("id")))
+
+    def parse_message_delete_bulk(self, data: dict) -> None:
+        for message_id in data.get("ids", list()):
+            self._state.messages.remove(int(message_id))
+
+    def parse_guild_create(self, data: dict) -> None:
+        if not data.get("unavailable"):
+            self._state.entities.store_guild(data, self._state)
+
+    def parse_guild_delete(self, data: dict) -> None:
+        if not data.get("unavailable"):
+            self._state.entities.remove_guild(int(data.get("id")))
+            self._state.member_lists.remove_guild(int(data.get("id")))
+
+    def parse_channel_create(self, data: dict) -> None:
+        self._state.entities.store_channel(data, self._state)
+
+    def parse_channel_delete(self, data: dict) -> None:
+        self._state.entities.remove_channel(int(data.get("id")))
+
+    def parse_guild_member_list_update(self, data: dict) -> None:
+        self._state.member_lists.apply(data, self._state)
+
+    def parse_guild_members_chunk(self, data: dict) -> None:
+        self._state.member_requests.feed(data, self._state)
 
     async def identify(self, token: str) -> None:
+        if self.identify_limiter:
+            await self.identify_limiter.acquire()
+
         payload = self.prepare_payload(
             OPCODE.IDENTIFY,
             {
@@ -222,28 +429,83 @@ class Websocket:
 
         await self.send(payload)
 
-    async def resume(self, token: str, session_id: str):
+    async def lazy_request(
+        self,
+        guild_id: int,
+        *,
+        channels: dict[int, Iterable[tuple[int, int]]] = None,
+        members: Iterable[int] = None,
+        typing: bool = True,
+        threads: bool = True,
+        activities: bool = True,
+    ) -> None:
+        """Subscribes to ranges of the member list of channels, discord answers with GUILD_MEMBER_LIST_UPDATE"""
+        payload = self.prepare_payload(
+            OPCODE.LAZY_REQUEST,
+            {
+                "guild_id": str(guild_id),
+                "typing": typing,
+                "threads": threads,
+                "activities": activities,
+                "members": [str(member_id) for member_id in members or ()],
+                "channels": {str(channel_id): [list(_range) for _range in ranges] for channel_id, ranges in (channels or dict()).items()},
+            },
+        )
+        await self.send(payload)
+
+    async def request_guild_members(
+        self,
+        guild_id: int,
+        *,
+        nonce: str,
+        query: str = "",
+        limit: int = 0,
+        user_ids: Iterable[int] = None,
+        presences: bool = False,
+    ) -> None:
+        """Requests members of a guild, discord answers with GUILD_MEMBERS_CHUNK events carrying the nonce"""
+        data = {"guild_id": str(guild_id), "limit": limit, "presences": presences, "nonce": nonce}
+        if user_ids is not None:
+            data["user_ids"] = [str(user_id) for user_id in user_ids]
+        else:
+            data["query"] = query
+
+        await self.send(self.prepare_payload(OPCODE.REQUEST_GUILD_MEMBERS, data))
+
+    async def resume(self, token: str, session_id: str, sequence: Optional[int]):
         payload = self.prepare_payload(
             OPCODE.RESUME,
             {
                 "token": token,
                 "session_id": session_id,
-                "seq": 1337,
+                "seq": sequence,
             },
         )
         await self.send(payload)
 
+    def reset_session(self) -> None:
+        self.session_id = None
+        self.last_sequence = None
+        self.resume_gateway_url = None
+
     async def setup(self, client: Client, *, websocket_route: str = None):
         self._state = client.get_state()
 
-        self.websocket_route = websocket_route or self.get_websocket("wss://gateway.discord.gg/", self.api_version)
+        if websocket_route:
+            self.websocket_route = websocket_route
+        elif self.session_id and self.resume_gateway_url:
+            self.websocket_route = self.get_websocket(f"{self.resume_gateway_url.rstrip('/')}/", self.api_version, encoding=self.codec.encoding)
+        else:
+            self.websocket_route = self.get_websocket("wss://gateway.discord.gg/", self.api_version, encoding=self.codec.encoding)
 
-        self.is_ready = asyncio.Event()
+        if self.is_ready is None:
+            self.is_ready = asyncio.Event()
         self.is_closed = False
 
         self._client: Client = client
-        self.__zlib = zlib.decompressobj()
+        self.__inflater = Inflater()
         self.__loop: AbstractEventLoop = self._state.loop
+        self.dispatcher.start(self.__loop)
         self.__websocket: ClientWebSocketResponse = await self._state.http.connect_to_websocket(self.websocket_route)
 
     async def socket_loop(self):
@@ -255,48 +517,65 @@ class Websocket:
             data: dict = payload.get("d")
             event: str = payload.get("t")
 
+            if (sequence := payload.get("s")) is not None:
+                self.last_sequence = sequence
+
             if op == OPCODE.HEARTBEAT_ACK:
                 self.__heart.ack()
+            elif op == OPCODE.HEARTBEAT:
+                await self.send({"op": OPCODE.HEARTBEAT, "d": self.last_sequence})
+            elif op == OPCODE.RECONNECT:
+                logger.debug("gateway requested a reconnect")
+                raise WebsocketClosure(resumable=True)
+            elif op == OPCODE.INVALID_SESSION:
+                logger.debug(f"invalid session, resumable: {data}")
+                raise WebsocketClosure(resumable=bool(data))
 
             if event == "READY":
+                self.__backoff.reset()
                 await self.ready(data)
+            elif event == "RESUMED":
+                logger.debug(f"resumed session {self.session_id} at sequence {self.last_sequence}")
+                self.__backoff.reset()
+                self.is_ready.set()
 
             if data and event:
+                if self.metrics is not None:
+                    self.metrics.gateway_events.inc((event,))
+
+                if raw_handlers := self.__raw_handlers.get(event):
+                    for handler in raw_handlers:
+                        await self.dispatcher.dispatch(event, handler, data)
+
                 cast: Cast = getattr(EVENTS, event, None)
                 if cast:
-                    if issubclass(cast, StateCast):
-                        args = (data, self._state)
+                    if issubclass(cast, LazyCast):
+                        data = cast(data, self._state, lazy=self.lazy_casts, keep_raw=self.keep_raw_data)
+                    elif issubclass(cast, StateCast):
+                        data = cast(data, self._state)
                     else:
-                        args = (data,)
-                    data = cast(*args)
-
-                removed = list()
-                for index, entry in enumerate(self.__dispatch_listeners):
-                    if entry.event != event:
-                        continue
-
-                    future = entry.future
-                    if future.cancelled():
-                        removed.append(index)
-                        continue
-
-                    try:
-                        valid = entry.check(data)
-                    except Exception as exc:
-                        future.set_exception(exc)
-                        removed.append(index)
-                    else:
-                        if valid:
-                            ret = data if entry.result is None else entry.result(data)
-                            future.set_result(ret)
-                            removed.append(index)
+                        data = cast(data)
+
+                if parser := self.__parsers.get(event):
+                    parser(data)
 
-                for index in reversed(removed):
-                    del self.__dispatch_listeners[index]
+                if listeners := self.__dispatch_listeners.get(event):
+                    for future, entry in list(listeners.items()):
+                        if future.done():
+                            continue
+
+                        try:
+                            valid = entry.check(data)
+                        except Exception as exc:
+                            future.set_exception(exc)
+                        else:
+                            if valid:
+                                ret = data if entry.result is None else entry.result(data)
+                                future.set_result(ret)
 
                 if handlers := self.__dispatch_handlers.get(event):
                     for handler in handlers:
-                        self.__loop.create_task(handler(data))
+                        await self.dispatcher.dispatch(event, handler, data)
 
     async def connect(
         self,
@@ -304,38 +583,82 @@ class Websocket:
         token: str,
         *,
         reconnect: bool = True,
-        reconnect_interval: int = 10,
+        reconnect_interval: float = 1.0,
+        max_reconnect_interval: float = 60.0,
         websocket_route: str = None,
         resume: str = None,
     ) -> None:
+        if resume:
+            self.session_id = resume
+        self.__backoff = Backoff(reconnect_interval, max_reconnect_interval)
+        self.__closing = asyncio.Event()
+
         async def post_setup():
             await self.setup(client, websocket_route=websocket_route)
             await self.hello()
-            await self.identify(token)
-
-            if resume or self.session_id:
-                await self.resume(token, session_id=resume or self.session_id)
-
-        if reconnect:
-            while True:
-                try:
-                    await post_setup()
-                    await self.socket_loop()
-                except WebsocketClosure:
-                    self.is_ready.clear()
-                    self.is_closed = True
-
-                logger.error("connection closed attempting reconnect")
-                await asyncio.sleep(reconnect_interval)
-        else:
-            await post_setup()
-            await self.socket_loop()
 
-        await self.close()
+            if self.session_id:
+                await self.resume(token, self.session_id, self.last_sequence)
+            else:
+                await self.identify(token)
+
+        while not self.__closing.is_set():
+            try:
+                await post_setup()
+                await self.socket_loop()
+            except WebsocketClosure as exc:
+                await self.disconnect()
+                if self.__closing.is_set():
+                    # closed on purpose by close()
+                    return
+                if not reconnect or exc.code in FATAL_CLOSE_CODES:
+                    raise
+
+                if not exc.resumable or exc.code in UNRESUMABLE_CLOSE_CODES:
+                    self.reset_session()
+                reason = str(exc.code) if exc.code else "reconnect"
+            except (OSError, asyncio.TimeoutError, aiohttp.ClientError) as exc:
+                await self.disconnect()
+                if self.__closing.is_set():
+                    return
+                if not reconnect:
+                    raise
+                reason = type(exc).__name__
+
+            if self.metrics is not None:
+                self.metrics.reconnects.inc((reason,))
+
+            delay = self.__backoff.delay()
+            logger.error(f"connection closed, attempting to {'resume' if self.session_id else 'reconnect'} in {delay:.2f}s")
+            try:
+                # woken up early by close()
+                await asyncio.wait_for(self.__closing.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def abort(self) -> None:
+        """Closes the connection from under the socket loop, which then reconnects"""
+        if self.__websocket and not self.__websocket.closed:
+            await self.__websocket.close(code=4000)
+
+    async def disconnect(self) -> None:
+        """Closes the current connection without invalidating the session, so that it can be resumed"""
+        if self.is_ready:
+            self.is_ready.clear()
+        if self.__heart:
+            self.__heart.stop()
+        if self.__websocket and not self.__websocket.closed:
+            await self.__websocket.close(code=4000)
+        self.is_closed = True
 
     async def close(self) -> None:
+        if self.__closing is not None:
+            self.__closing.set()
+        await self.dispatcher.close()
         if self.is_closed:
             return
         if self.__heart:
             self.__heart.stop()
+        if self.__websocket and not self.__websocket.closed:
+            await self.__websocket.close()
         self.is_closed = True
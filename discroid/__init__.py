@@ -1,8 +1,11 @@
 import logging
 
 from .Client import Client
-from .Errors import DiscroidError, LoginFailure
-from .RequestHandler import RequestHandler
+from .Errors import DiscroidError, HTTPError, LoginFailure
+from .Metrics import Metrics, PrometheusExporter, SnapshotExporter
+from .Pool import ClientPool
+from .RequestHandler import RequestHandler, RetryPolicy
+from .Supervisor import Supervisor
 from .Utils import Utils
 from .Websocket import Websocket
 
@@ -10,9 +13,16 @@ version = (1, 0, 0)
 
 __all__ = (
     Client,
+    ClientPool,
     DiscroidError,
+    HTTPError,
     LoginFailure,
+    Metrics,
+    PrometheusExporter,
     RequestHandler,
+    RetryPolicy,
+    SnapshotExporter,
+    Supervisor,
     Utils,
     Websocket,
 )
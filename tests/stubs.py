@@ -0,0 +1,192 @@
+"""Local stand-ins for the discord api and gateway"""
+
+import asyncio
+import json
+import socket
+import zlib
+
+from aiohttp import web
+
+from discroid.Replay import FRAME_HEADER, MAGIC
+from discroid.Websocket import OPCODE
+
+USER = {"id": "100", "username": "user", "discriminator": "0001", "avatar": None}
+
+
+def write_recording(path, payloads, *, delay: float = 0.0, codec=None, compress: bool = False) -> None:
+    """Writes frames the way a Recorder would, with a fixed delay between them, deflated as a zlib-stream if compress"""
+    deflater = zlib.compressobj()
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        for payload in payloads:
+            data = codec.dumps(payload) if codec else json.dumps(payload)
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            if compress:
+                data = deflater.compress(data) + deflater.flush(zlib.Z_SYNC_FLUSH)
+
+            file.write(FRAME_HEADER.pack(delay, compress, len(data)))
+            file.write(data)
+
+
+def dispatches(event: str, count: int) -> list[dict]:
+    payloads = [{"op": OPCODE.DISPATCH, "t": "READY", "s": 1, "d": {"user": USER}}]
+    payloads.extend({"op": OPCODE.DISPATCH, "t": event, "s": index + 2, "d": {"index": index}} for index in range(count))
+    return payloads
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+class FakeMessage:
+    def __init__(self, content, nonce):
+        self.content = content
+        self.nonce = nonce
+
+
+class FakeHTTP:
+    """Records the requests made through it, messages are answered once 'release' is set and fail if their content is 'fail'"""
+
+    def __init__(self, *, fail: str = None):
+        self.requests = list()
+        self.sent = list()
+        self.triggered = list()
+        self.release = asyncio.Event()
+        self.release.set()
+        self.fail = fail
+
+    async def request(self, method, route):
+        self.requests.append((method, route))
+        await asyncio.sleep(0)
+        return route
+
+    async def send_message(self, channel_id, content, *, nonce=None, wait=True, sent=None, **options):
+        # 'sent' resolves as soon as the request starts
+        self.sent.append(content)
+        if sent is not None:
+            sent.set_result(None)
+        await self.release.wait()
+
+        if content == self.fail:
+            raise RuntimeError(content)
+        return FakeMessage(content, nonce) if wait else None
+
+    async def trigger_typing(self, channel_id):
+        self.triggered.append(channel_id)
+
+
+class StubAPI:
+    """Answers /users/@me, message creation and channels, with optional rate limit headers per route
+
+    Channels are served with an ETag and answer a matching If-None-Match with a 304, which carries the ETag again
+    unless 'etag_on_304' is False.
+    """
+
+    def __init__(self, *, limit: int = None, reset_after: float = 0.05, latency: float = 0.0, etag_on_304: bool = True):
+        self.limit = limit
+        self.reset_after = reset_after
+        self.latency = latency
+        self.url = None
+        self.requests = list()
+        self.contents = list()
+        self.ratelimited = 0
+        self.concurrent = 0
+        self.peak = 0
+        self.etag_on_304 = etag_on_304
+        self.channels = dict()
+        self.not_modified = 0
+
+        self.__remaining = dict()
+        self.__runner = None
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/users/@me", self.me)
+        app.router.add_post("/channels/{channel_id}/messages", self.message)
+        app.router.add_get("/channels/{channel_id}", self.channel)
+        app.router.add_patch("/channels/{channel_id}", self.edit_channel)
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        await web.SockSite(self.__runner, sock).start()
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        return self.url
+
+    async def close(self) -> None:
+        await self.__runner.cleanup()
+
+    async def me(self, request: web.Request) -> web.Response:
+        self.requests.append(("GET", request.path))
+        if request.headers.get("Authorization") == "invalid":
+            return web.json_response({"message": "401: Unauthorized", "code": 0}, status=401)
+        return web.json_response(USER)
+
+    async def message(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        channel_id = request.match_info["channel_id"]
+        self.requests.append(("POST", request.path))
+        self.contents.append(body.get("content"))
+
+        self.concurrent += 1
+        self.peak = max(self.peak, self.concurrent)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.concurrent -= 1
+
+        headers = dict()
+        if self.limit is not None:
+            loop = asyncio.get_running_loop()
+            remaining, reset = self.__remaining.get(channel_id, (self.limit, 0.0))
+            if loop.time() >= reset:
+                remaining, reset = self.limit, loop.time() + self.reset_after
+            if remaining <= 0:
+                self.ratelimited += 1
+                return web.json_response(
+                    {"message": "rate limited", "retry_after": reset - loop.time(), "global": False},
+                    status=429,
+                    headers={"Retry-After": str(reset - loop.time())},
+                )
+            self.__remaining[channel_id] = (remaining - 1, reset)
+            headers = {
+                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Remaining": str(remaining - 1),
+                "X-RateLimit-Reset": f"{reset:.6f}",
+                "X-RateLimit-Reset-After": str(max(0.0, reset - loop.time())),
+                "X-RateLimit-Bucket": f"messages-{channel_id}",
+            }
+
+        message = {
+            "id": str(len(self.requests)),
+            "channel_id": channel_id,
+            "content": body.get("content"),
+            "nonce": body.get("nonce"),
+            "author": USER,
+            "mentions": [],
+            "mention_roles": [],
+            "embeds": [],
+        }
+        return web.json_response(message, headers=headers)
+
+    async def channel(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info["channel_id"]
+        self.requests.append(("GET", request.path))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        name = self.channels.get(channel_id, "general")
+        etag = f'"{channel_id}-{name}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag} if self.etag_on_304 else None)
+        return web.json_response({"id": channel_id, "type": 0, "name": name}, headers={"ETag": etag})
+
+    async def edit_channel(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info["channel_id"]
+        self.requests.append(("PATCH", request.path))
+        self.channels[channel_id] = (await request.json())["name"]
+        return web.json_response({"id": channel_id, "type": 0, "name": self.channels[channel_id]})
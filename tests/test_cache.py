@@ -0,0 +1,38 @@
+from discroid.Cache import EntityCache
+
+
+def test_partial_user_keeps_known_fields():
+    entities = EntityCache()
+    user = entities.store_user({"id": "1", "username": "a", "bot": True, "flags": 4, "banner": "abc"}, None)
+
+    # message authors only carry a few fields
+    assert entities.store_user({"id": "1", "username": "b", "avatar": "def"}, None) is user
+    assert user.username == "b"
+    assert user.bot and user.flags == 4
+    assert user.banner is not None and "def" in str(user.avatar)
+
+    entities.store_user({"id": "1", "banner": None}, None)
+    assert user.banner is None
+
+
+def test_partial_channel_keeps_known_fields():
+    entities = EntityCache()
+    channel = entities.store_channel({"id": "1", "name": "general", "topic": "hi", "position": 3, "nsfw": True, "parent_id": "5", "last_message_id": "9"}, None, guild_id=2)
+
+    # the partial channel of a message only carries its ids
+    assert entities.store_channel({"id": "1", "guild_id": None}, None) is channel
+    assert (channel.name, channel.topic, channel.position, channel.nsfw) == ("general", "hi", 3, True)
+    assert (channel.guild_id, channel.parent_id, channel.last_message_id) == (2, 5, 9)
+
+    entities.store_channel({"id": "1", "parent_id": None, "last_message_id": "10"}, None)
+    assert channel.parent_id is None and channel.last_message_id == 10
+
+
+def test_channels_are_evicted_least_recently_stored_first():
+    entities = EntityCache(max_channels=2)
+    for channel_id in range(3):
+        entities.store_channel({"id": channel_id + 1}, None)
+    entities.store_channel({"id": 2}, None)
+    entities.store_channel({"id": 4}, None)
+
+    assert sorted(channel.id for channel in entities.channels) == [2, 4]
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from discroid.Cache import EntityCache
+from discroid.Casts import Message
+
+from .stubs import USER
+
+MESSAGE = {"id": "10", "channel_id": "20", "content": "hello", "author": USER, "mentions": [USER], "embeds": []}
+
+
+def test_lazy_message_drops_its_payload_once_built():
+    state = SimpleNamespace(entities=EntityCache())
+    message = Message(dict(MESSAGE), state, lazy=True)
+
+    assert message.author.id == int(USER["id"])
+    assert message.raw_data is not None
+
+    message._materialize()
+    assert message.raw_data is None
+    assert message.mentions == [message.author]
+
+
+def test_kept_payload_survives_materialization():
+    state = SimpleNamespace(entities=EntityCache())
+    assert Message(dict(MESSAGE), state, keep_raw=True).raw_data is not None
+    assert Message(dict(MESSAGE), state).raw_data is None
+
+    message = Message(dict(MESSAGE), state, lazy=True, keep_raw=True)
+    message._materialize()
+    assert message.raw_data is not None
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import struct
+import zlib
+
+import pytest
+
+from discroid import Client, ETF
+from discroid.Codec import CODECS, ETFCodec, get_codec
+from discroid.Errors import ETFError
+from discroid.Replay import FakeGateway
+
+from .stubs import StubAPI, dispatches, write_recording
+from .test_gateway import wait_until
+
+PAYLOAD = {
+    "op": 0,
+    "s": 42,
+    "t": "MESSAGE_CREATE",
+    "d": {
+        "id": "1012345678901234567",
+        "content": "héllo wörld ✓",
+        "tts": False,
+        "pinned": True,
+        "edited_timestamp": None,
+        "mentions": [],
+        "embeds": [{"title": "embed", "fields": [{"name": "a", "value": "b", "inline": True}]}],
+        "flags": 0,
+        "position": 300,
+        "negative": -5,
+        "large": 2**40,
+        "negative_large": -(2**50),
+        "ratio": 0.25,
+    },
+}
+
+
+def available_codecs():
+    codecs = list()
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.mark.parametrize("codec", available_codecs(), ids=lambda codec: codec.name)
+def test_json_codecs_round_trip(codec):
+    assert codec.loads(codec.dumps(PAYLOAD)) == PAYLOAD
+
+
+def test_etf_round_trip():
+    assert ETF.loads(ETF.dumps(PAYLOAD)) == PAYLOAD
+    assert ETF.loads(ETF.dumps([(1, "a"), []])) == [(1, "a"), []]
+    # larger than json can carry
+    assert ETF.loads(ETF.dumps([2**70, -(2**200)])) == [2**70, -(2**200)]
+
+
+def test_etf_matches_json():
+    codec = ETFCodec()
+    for json_codec in available_codecs():
+        assert codec.loads(codec.dumps(PAYLOAD)) == json_codec.loads(json_codec.dumps(PAYLOAD))
+
+
+def test_etf_decodes_erlang_terms():
+    # 'ok' as an atom, [1, 2] as a string of bytes, a compressed term and a tuple
+    assert ETF.Decoder(b"\x83d\x00\x03nil").decode() is None
+    assert ETF.Decoder(b"\x83k\x00\x02\x01\x02").decode() == "\x01\x02"
+    assert ETF.Decoder(b"\x83h\x02a\x01a\x02").decode() == (1, 2)
+
+    term = ETF.dumps(PAYLOAD)[1:]
+    compressed = b"\x83P" + struct.pack(">I", len(term)) + zlib.compress(term)
+    assert ETF.Decoder(compressed).decode() == PAYLOAD
+
+
+def test_etf_rejects_garbage():
+    with pytest.raises(ETFError):
+        ETF.Decoder(b"\x00").decode()
+    with pytest.raises(ETFError):
+        ETF.dumps({"value": object()})
+
+
+def test_client_over_etf(tmp_path):
+    async def main():
+        path = tmp_path / "etf.rec"
+        write_recording(path, dispatches("TYPING_START", 20), codec=ETFCodec(), compress=True)
+
+        api = StubAPI()
+        await api.start()
+        gateway = FakeGateway(str(path), speed=0, codec=ETFCodec())
+        url = await gateway.start()
+
+        client = Client(base_route=api.url, websocket_route=url + "?encoding=etf&v=9&compress=zlib-stream", encoding="etf")
+        received = list()
+
+        @client.event("TYPING_START")
+        async def on_typing(data):
+            received.append(data["index"])
+
+        task = asyncio.get_running_loop().create_task(client.start("token"))
+        await wait_until(lambda: len(received) == 20)
+        assert received == list(range(20))
+
+        await client.close()
+        await asyncio.wait_for(task, 2)
+        await gateway.close()
+        await api.close()
+
+    asyncio.run(main())
+
+
+def test_client_over_uncompressed_orjson(tmp_path):
+    pytest.importorskip("orjson")
+    assert isinstance(get_codec("orjson").dumps(PAYLOAD), bytes)
+
+    async def main():
+        path = tmp_path / "json.rec"
+        write_recording(path, dispatches("TYPING_START", 20))
+
+        api = StubAPI()
+        await api.start()
+        gateway = FakeGateway(str(path), speed=0, codec=get_codec("orjson"))
+        url = await gateway.start()
+
+        # text frames both ways, the payloads dumped to bytes are sent as text
+        client = Client(base_route=api.url, websocket_route=url + "?encoding=json&v=9", codec="orjson")
+        received = list()
+
+        @client.event("TYPING_START")
+        async def on_typing(data):
+            received.append(data["index"])
+
+        task = asyncio.get_running_loop().create_task(client.start("token"))
+        await wait_until(lambda: len(received) == 20)
+        assert received == list(range(20))
+        assert (await client.send_message(1, "hello")).content == "hello"
+
+        await client.close()
+        await asyncio.wait_for(task, 2)
+        await gateway.close()
+        await api.close()
+
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import asyncio
+
+from discroid.Dispatcher import Dispatcher
+
+from .stubs import run
+
+
+def test_burst_of_one_event_does_not_stall_the_others():
+    async def main():
+        dispatcher = Dispatcher(max_concurrency=2, max_concurrency_per_event=1)
+        dispatcher.start(asyncio.get_running_loop())
+
+        release = asyncio.Event()
+        done = list()
+
+        async def slow(data):
+            await release.wait()
+            done.append(data)
+
+        async def fast(data):
+            done.append(data)
+
+        for index in range(10):
+            await dispatcher.dispatch("MESSAGE_CREATE", slow, index)
+        await dispatcher.dispatch("TYPING_START", fast, "typing")
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert done == ["typing"]
+        assert dispatcher.running == 1
+        assert dispatcher.queue_depth == 9
+
+        release.set()
+        await dispatcher.close(drain=True)
+        assert done == ["typing", *range(10)]
+
+    run(main())
+
+
+def test_global_limit_is_kept():
+    async def main():
+        dispatcher = Dispatcher(max_concurrency=3, max_concurrency_per_event=2)
+        dispatcher.start(asyncio.get_running_loop())
+
+        running = peak = 0
+
+        async def handler(data):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+
+        for index in range(30):
+            await dispatcher.dispatch(f"EVENT_{index % 3}", handler, index)
+        await dispatcher.close(drain=True)
+
+        assert peak == 3
+        assert dispatcher.dispatched == 30
+
+    run(main())
+
+
+def test_close_without_drain_counts_dropped_events():
+    async def main():
+        dispatcher = Dispatcher(max_concurrency=1)
+        dispatcher.start(asyncio.get_running_loop())
+
+        async def handler(data):
+            await asyncio.sleep(1)
+
+        for index in range(5):
+            await dispatcher.dispatch("MESSAGE_CREATE", handler, index)
+        await asyncio.sleep(0)
+        await dispatcher.close()
+
+        assert dispatcher.dropped == 4
+        assert dispatcher.queue_depth == 0
+
+    run(main())
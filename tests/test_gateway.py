@@ -0,0 +1,174 @@
+import asyncio
+
+from discroid import Client
+from discroid.Replay import FakeGateway
+from discroid.Websocket import Backoff, Inflater
+
+from .stubs import StubAPI, dispatches, write_recording
+
+EVENTS = 60
+
+
+async def wait_until(predicate, timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+async def start(tmp_path, *, compress: bool = True, delay: float = 0.005, heartbeat_interval: int = 41250):
+    path = tmp_path / "gateway.rec"
+    write_recording(path, dispatches("TYPING_START", EVENTS), delay=delay)
+
+    api = StubAPI()
+    await api.start()
+    gateway = FakeGateway(str(path), speed=1.0, heartbeat_interval=heartbeat_interval)
+    url = await gateway.start()
+
+    client = Client(base_route=api.url, websocket_route=url + ("?encoding=json&v=9&compress=zlib-stream" if compress else ""))
+    received, ready = list(), list()
+
+    @client.event("TYPING_START")
+    async def on_typing(data):
+        received.append(data["index"])
+
+    @client.event("READY")
+    async def on_ready(data):
+        ready.append(data["session_id"])
+
+    task = asyncio.get_running_loop().create_task(client.start("token"))
+    return api, gateway, client, task, received, ready
+
+
+async def stop(api, gateway, client, task):
+    await client.close()
+    await asyncio.wait_for(task, 2)
+    await gateway.close()
+    await api.close()
+
+
+def test_resumes_after_a_drop(tmp_path):
+    async def main():
+        api, gateway, client, task, received, ready = await start(tmp_path)
+
+        await wait_until(lambda: len(received) >= 10)
+        await gateway.disconnect(4000)
+        await wait_until(lambda: len(received) == EVENTS)
+
+        # every event exactly once and in order, without a second identify
+        assert received == list(range(EVENTS))
+        assert len(ready) == 1
+        assert gateway.connections == 2
+
+        await stop(api, gateway, client, task)
+
+    asyncio.run(main())
+
+
+def test_identifies_again_after_an_unresumable_close(tmp_path):
+    async def main():
+        api, gateway, client, task, received, ready = await start(tmp_path, compress=False)
+
+        await wait_until(lambda: len(received) >= 10)
+        await gateway.disconnect(4009)
+        await wait_until(lambda: len(ready) == 2)
+
+        assert ready[0] != ready[1]
+        await stop(api, gateway, client, task)
+
+    asyncio.run(main())
+
+
+def test_close_does_not_reconnect(tmp_path):
+    async def main():
+        api, gateway, client, task, received, ready = await start(tmp_path)
+
+        await wait_until(lambda: len(ready) == 1)
+        await client.close()
+        await asyncio.wait_for(task, 2)
+        await asyncio.sleep(0.1)
+
+        assert gateway.connections == 1
+        await gateway.close()
+        await api.close()
+
+    asyncio.run(main())
+
+
+def test_close_from_a_handler(tmp_path):
+    async def main():
+        api, gateway, client, task, received, ready = await start(tmp_path)
+        closed = list()
+
+        @client.event("TYPING_START")
+        async def on_typing(data):
+            if data["index"] == 5:
+                await client.close()
+                closed.append(True)
+
+        # start returns and the handler finishes its own close, nothing is left running
+        await asyncio.wait_for(task, 3)
+        await wait_until(lambda: closed == [True] and client.dispatcher.running == 0, 3)
+
+        await gateway.close()
+        await api.close()
+
+    asyncio.run(main())
+
+
+def test_resumes_after_a_corrupted_stream(tmp_path, monkeypatch):
+    feed = Inflater.feed
+    frames = list()
+
+    def corrupting_feed(self, data):
+        frames.append(data)
+        if len(frames) == 15:
+            data = b"\x00corrupted" + data
+        return feed(self, data)
+
+    monkeypatch.setattr(Inflater, "feed", corrupting_feed)
+
+    async def main():
+        api, gateway, client, task, received, ready = await start(tmp_path)
+
+        # the broken frame and the ones after it can't be inflated, the resumed stream replays them
+        await wait_until(lambda: len(received) == EVENTS)
+        assert received == list(range(EVENTS))
+        assert len(ready) == 1 and gateway.connections == 2
+
+        await stop(api, gateway, client, task)
+
+    asyncio.run(main())
+
+
+def test_backoff_grows_to_its_cap_with_jitter():
+    backoff = Backoff(base=1.0, cap=8.0)
+    for delay in (1.0, 2.0, 4.0, 8.0, 8.0):
+        assert delay / 2 <= backoff.delay() <= delay
+
+    backoff.reset()
+    assert backoff.attempts == 0
+    assert 0.5 <= backoff.delay() <= 1.0
+
+
+def test_unacknowledged_heartbeats_reconnect(tmp_path, caplog):
+    async def main():
+        # events keep coming in, only the missing acks show that the connection is dead
+        api, gateway, client, task, received, ready = await start(tmp_path, delay=0.02, heartbeat_interval=100)
+
+        await wait_until(lambda: client.latency < float("inf"))
+        assert 0 <= client.latency < 1
+
+        gateway.ack_heartbeats = False
+        await wait_until(lambda: gateway.connections == 2)
+        gateway.ack_heartbeats = True
+        assert "heartbeat was not acknowledged" in caplog.text
+
+        await wait_until(lambda: len(received) == EVENTS)
+        assert received == list(range(EVENTS))
+        assert len(ready) == 1
+
+        await stop(api, gateway, client, task)
+
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from discroid.Cache import EntityCache
+from discroid.MemberList import ChunkedList, MemberList, MemberListGroup
+
+
+def test_chunked_list_matches_a_list():
+    rng = random.Random(0)
+    for chunk_size in (1, 2, 4, 16):
+        expected = list(range(rng.randrange(50)))
+        chunked = ChunkedList(expected, chunk_size=chunk_size)
+
+        for step in range(2000):
+            action = rng.random()
+            if action < 0.4:
+                index = rng.randrange(len(expected) + 2)
+                expected.insert(index, step)
+                chunked.insert(index, step)
+            elif action < 0.7 and expected:
+                index = rng.randrange(-len(expected), len(expected))
+                assert chunked.pop(index) == expected.pop(index)
+            elif action < 0.8 and expected:
+                index = rng.randrange(len(expected))
+                expected[index] = chunked[index] = -step
+            elif action < 0.9:
+                values = list(range(step, step + rng.randrange(10)))
+                expected.extend(values)
+                chunked.extend(values)
+            else:
+                expected.append(step)
+                chunked.append(step)
+
+            assert len(chunked) == len(expected)
+            if step % 50 == 0:
+                assert list(chunked) == expected
+                assert [chunked[index] for index in range(len(expected))] == expected
+                start = rng.randrange(len(expected) + 1)
+                stop = rng.randrange(start, len(expected) + 5)
+                assert chunked.slice(start, stop) == expected[start:stop]
+
+        assert list(chunked) == expected
+
+
+def test_chunked_list_index_errors():
+    chunked = ChunkedList([1, 2, 3])
+    with pytest.raises(IndexError):
+        chunked[3]
+    with pytest.raises(IndexError):
+        chunked.pop(-4)
+    assert chunked[-1] == 3
+
+
+def member(user_id):
+    return {"member": {"user": {"id": str(user_id), "username": f"user{user_id}"}, "roles": []}}
+
+
+def group(group_id, count):
+    return {"group": {"id": group_id, "count": count}}
+
+
+def ids(member_list):
+    return [item.id if isinstance(item, MemberListGroup) else item.user.id if item is not None else None for item in member_list]
+
+
+@pytest.fixture
+def member_list():
+    member_list = MemberList(1, "everyone", SimpleNamespace(entities=EntityCache()), chunk_size=2)
+    member_list.apply({"ops": [{"op": "SYNC", "range": [0, 99], "items": [group("online", 3), member(1), member(2), member(3)]}]})
+    return member_list
+
+
+def test_sync(member_list):
+    assert ids(member_list) == ["online", 1, 2, 3]
+    assert member_list.get_member(2).user.id == 2
+
+    # a range further down is padded with unknown positions
+    member_list.apply({"ops": [{"op": "SYNC", "range": [6, 7], "items": [member(7)]}]})
+    assert ids(member_list) == ["online", 1, 2, 3, None, None, 7]
+
+
+def test_sync_overwrites_an_existing_range(member_list):
+    member_list.apply({"ops": [{"op": "SYNC", "range": [2, 4], "items": [member(4), member(5), member(6)]}]})
+
+    assert ids(member_list) == ["online", 1, 4, 5, 6]
+    assert member_list.get_member(2) is None and member_list.get_member(3) is None
+    assert sorted(member.id for member in member_list.members) == [1, 4, 5, 6]
+
+
+def test_insert(member_list):
+    member_list.apply({"ops": [{"op": "INSERT", "index": 1, "item": member(4)}, {"op": "INSERT", "index": 7, "item": member(5)}]})
+    assert ids(member_list) == ["online", 4, 1, 2, 3, None, None, 5]
+    assert member_list.get_member(5).user.id == 5
+
+
+def test_update(member_list):
+    member_list.apply({"ops": [{"op": "UPDATE", "index": 2, "item": member(4)}, {"op": "UPDATE", "index": 1, "item": member(1)}]})
+    assert ids(member_list) == ["online", 1, 4, 3]
+    # a member updated in place stays known
+    assert member_list.get_member(1) is member_list[1]
+    assert member_list.get_member(2) is None
+
+
+def test_delete(member_list):
+    member_list.apply({"ops": [{"op": "DELETE", "index": 1}, {"op": "DELETE", "index": 10}]})
+    assert ids(member_list) == ["online", 2, 3]
+    assert member_list.get_member(1) is None
+
+
+def test_delete_of_a_moved_member_keeps_it(member_list):
+    # a member moving down is inserted at its new position before its old one is deleted
+    member_list.apply({"ops": [{"op": "INSERT", "index": 4, "item": member(1)}, {"op": "DELETE", "index": 1}]})
+    assert ids(member_list) == ["online", 2, 3, 1]
+    assert member_list.get_member(1) is member_list[3]
+
+
+def test_invalidate(member_list):
+    member_list.apply({"ops": [{"op": "INVALIDATE", "range": [1, 2]}], "member_count": 10, "groups": [{"id": "online", "count": 3}]})
+    assert ids(member_list) == ["online", None, None, 3]
+    assert member_list.get_member(1) is None and member_list.get_member(3) is not None
+    assert member_list.member_count == 10 and member_list.groups == [MemberListGroup("online", 3)]
@@ -0,0 +1,40 @@
+import pytest
+
+from discroid.Errors import MemberRequestOverflow
+from discroid.MemberRequests import MemberRequest
+
+from .stubs import run
+
+
+def chunk(index, count):
+    return {"chunk_index": index, "chunk_count": count}
+
+
+def test_chunks_are_yielded_in_order():
+    async def main():
+        request = MemberRequest(1, "nonce", max_chunks=4)
+        for index in range(3):
+            assert request.feed(chunk(index, 3), [index * 2, index * 2 + 1]) is None
+
+        assert [member async for member in request] == list(range(6))
+        assert request.is_done
+
+    run(main())
+
+
+def test_overflow_never_blocks_the_feed():
+    async def main():
+        request = MemberRequest(1, "nonce", max_chunks=2)
+        for index in range(5):
+            # the gateway keeps reading while nobody consumes the request
+            assert request.feed(chunk(index, 5), [index]) is None
+        assert request.is_failed
+
+        members = list()
+        with pytest.raises(MemberRequestOverflow):
+            async for member in request:
+                members.append(member)
+        # the chunks buffered before the overflow are still consumed
+        assert members == [0, 1]
+
+    run(main())
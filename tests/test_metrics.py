@@ -0,0 +1,26 @@
+from discroid.Metrics import Metrics, SnapshotExporter
+
+
+def test_event_rates_are_read_only():
+    metrics = Metrics()
+    metrics.gateway_events.inc(("MESSAGE_CREATE",), 10)
+    since = metrics.event_counts()
+
+    # reading the rates doesn't reset them for the other readers
+    assert metrics.events_per_second()["MESSAGE_CREATE"] > 0
+    assert metrics.events_per_second()["MESSAGE_CREATE"] > 0
+    assert metrics.events_per_second(since)["MESSAGE_CREATE"] == 0
+
+    metrics.gateway_events.inc(("MESSAGE_CREATE",), 5)
+    assert metrics.events_per_second(since)["MESSAGE_CREATE"] > 0
+
+
+def test_snapshot_exporter_rates_since_its_previous_export():
+    metrics = Metrics()
+    exporter = SnapshotExporter()
+    metrics.gateway_events.inc(("READY",))
+
+    assert exporter.export(metrics)["events_per_second"]["READY"] > 0
+    assert exporter.export(metrics)["events_per_second"]["READY"] == 0
+    # another exporter keeps its own previous counts
+    assert SnapshotExporter().export(metrics)["events_per_second"]["READY"] > 0
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from discroid.Outbound import OutboundQueue
+
+from .stubs import FakeHTTP, FakeMessage, run
+
+
+def test_sequential_awaits_resolve():
+    async def main():
+        queue = OutboundQueue(FakeHTTP())
+
+        first = await queue.send(1, "one")
+        second = await queue.send(1, "two")
+
+        assert (first.content, second.content) == ("one", "two")
+        await queue.close()
+
+    run(main())
+
+
+def test_channel_order_is_kept():
+    async def main():
+        http = FakeHTTP()
+        queue = OutboundQueue(http)
+
+        await asyncio.gather(*(queue.send(channel_id, f"{channel_id}-{index}") for index in range(6) for channel_id in (1, 2)))
+
+        for channel_id in (1, 2):
+            sent = [content for content in http.sent if content.startswith(f"{channel_id}-")]
+            assert sent == [f"{channel_id}-{index}" for index in range(6)]
+        await queue.close()
+
+    run(main())
+
+
+def test_errors_resolve_their_own_message():
+    async def main():
+        queue = OutboundQueue(FakeHTTP(fail="bad"))
+
+        failed = queue.send(1, "bad")
+        sent = queue.send(1, "good")
+
+        with pytest.raises(RuntimeError):
+            await failed
+        assert (await sent).content == "good"
+        await queue.close()
+
+    run(main())
+
+
+def test_confirm_sends_without_waiting_for_responses():
+    async def main():
+        http = FakeHTTP()
+        http.release.clear()
+        queue = OutboundQueue(http)
+
+        first = queue.send(1, "one", confirm=True)
+        second = queue.send(1, "two", confirm=True)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        # the second message went out while the response to the first is still pending
+        assert http.sent == ["one", "two"]
+
+        await queue.close()
+        assert first.cancelled() and second.cancelled()
+
+    run(main())
+
+
+def test_confirm_resolves_from_echo():
+    async def main():
+        queue = OutboundQueue(FakeHTTP())
+        loop = asyncio.get_running_loop()
+
+        future = queue.send(1, "one", confirm=True, nonce="123")
+        loop.call_later(0.01, queue.resolve, FakeMessage("one", "123"))
+
+        assert (await future).content == "one"
+        assert queue.pending == 0
+        await queue.close()
+
+    run(main())
@@ -0,0 +1,85 @@
+import asyncio
+
+from discroid import Client, ClientPool, LoginFailure
+from discroid.Replay import FakeGateway
+
+from .stubs import StubAPI, dispatches, write_recording
+from .test_gateway import wait_until
+
+CLIENTS = 3
+EVENTS = 20
+
+
+def test_pool_runs_clients_on_one_loop(tmp_path):
+    async def main():
+        path = tmp_path / "pool.rec"
+        write_recording(path, dispatches("TYPING_START", EVENTS))
+
+        api = StubAPI()
+        await api.start()
+        gateway = FakeGateway(str(path), speed=0)
+        url = await gateway.start()
+
+        pool = ClientPool(identify_interval=0.05)
+        loop = asyncio.get_running_loop()
+        received = {index: list() for index in range(CLIENTS)}
+        ready = list()
+
+        for index in range(CLIENTS):
+            client = Client(base_route=api.url, websocket_route=url + "?encoding=json&v=9&compress=zlib-stream")
+
+            @client.event("TYPING_START")
+            async def on_typing(data, index=index):
+                received[index].append(data["index"])
+
+            @client.event("READY")
+            async def on_ready(data):
+                ready.append(loop.time())
+
+            pool.add(client, f"token-{index}")
+
+        await pool.start()
+        await wait_until(lambda: all(len(events) == EVENTS for events in received.values()))
+
+        assert all(events == list(range(EVENTS)) for events in received.values())
+        assert gateway.connections == CLIENTS
+        assert len([request for request in api.requests if request == ("GET", "/users/@me")]) == CLIENTS
+        # the identifies are spaced out by the shared limiter
+        assert all(later - earlier >= 0.04 for earlier, later in zip(ready, ready[1:]))
+
+        # a client added to a running pool is started right away
+        late = Client(base_route=api.url, websocket_route=url)
+        pool.add(late, "token-late")
+        await wait_until(lambda: gateway.connections == CLIENTS + 1)
+
+        await pool.remove(late)
+        assert late not in pool.clients
+
+        await pool.close()
+        assert not pool.is_running
+        await gateway.close()
+        await api.close()
+
+    asyncio.run(main())
+
+
+def test_wait_returns_once_every_client_failed():
+    async def main():
+        api = StubAPI()
+        await api.start()
+
+        pool = ClientPool()
+        clients = [Client(base_route=api.url, websocket_route="ws://127.0.0.1:1/") for _ in range(2)]
+        for client in clients:
+            pool.add(client, "invalid")
+
+        await pool.start()
+        await asyncio.wait_for(pool.wait(), 5)
+
+        assert set(pool.failures) == set(clients)
+        assert all(isinstance(exc, LoginFailure) for exc in pool.failures.values())
+
+        await pool.close()
+        await api.close()
+
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+import asyncio
+
+from discroid.RateLimiter import RateLimiter
+from discroid.RequestHandler import RequestHandler
+
+from .stubs import StubAPI
+
+
+async def handler(api: StubAPI) -> RequestHandler:
+    http = RequestHandler(base_route=api.url)
+    await http.set_headers(token="token", locale="en-US", user_agent="Mozilla/5.0")
+    return http
+
+
+def send(http: RequestHandler, channel_id: int, content: str):
+    return http.request("POST", f"/channels/{channel_id}/messages", {"content": content})
+
+
+def test_buckets_avoid_429s():
+    async def main():
+        api = StubAPI(limit=5, reset_after=0.05)
+        await api.start()
+        http = await handler(api)
+
+        await asyncio.gather(*(send(http, 1, str(index)) for index in range(30)))
+
+        assert api.ratelimited == 0
+        assert len(api.contents) == 30
+        await http.close()
+        await api.close()
+
+    asyncio.run(main())
+
+
+def test_requests_of_a_bucket_are_sent_in_order():
+    async def main():
+        api = StubAPI(limit=1, reset_after=0.005)
+        await api.start()
+        http = await handler(api)
+
+        await asyncio.gather(*(send(http, 1, str(index)) for index in range(15)))
+
+        assert api.contents == [str(index) for index in range(15)]
+        await http.close()
+        await api.close()
+
+    asyncio.run(main())
+
+
+def test_exhausted_bucket_does_not_block_other_routes():
+    async def main():
+        api = StubAPI(limit=2, reset_after=0.5)
+        await api.start()
+        http = await handler(api)
+        loop = asyncio.get_running_loop()
+
+        # the first channel runs out of requests and waits for its reset
+        await asyncio.gather(*(send(http, 1, "first") for _ in range(2)))
+        blocked = loop.create_task(send(http, 1, "blocked"))
+
+        started = loop.time()
+        await asyncio.gather(*(send(http, 2, "second") for _ in range(2)))
+        assert loop.time() - started < 0.25
+        assert not blocked.done()
+
+        await blocked
+        assert api.ratelimited == 0
+        await http.close()
+        await api.close()
+
+    asyncio.run(main())
+
+
+def test_prune_drops_the_hashes_of_idle_buckets():
+    async def main():
+        limiter = RateLimiter()
+        for channel_id in range(10):
+            route = f"/channels/{channel_id}/messages"
+            bucket = await limiter.acquire("POST", route)
+            limiter.update("POST", route, bucket, {"X-RateLimit-Bucket": f"hash-{channel_id}"})
+
+        limiter.prune()
+        assert limiter._RateLimiter__hashes == dict()
+
+    asyncio.run(main())
+
+
+def test_routes_without_rate_limits_are_not_serialized():
+    async def main():
+        api = StubAPI(latency=0.05)
+        await api.start()
+        http = await handler(api)
+
+        # the first request learns that the route sends no limits, the others then run concurrently
+        await send(http, 1, "first")
+        await asyncio.gather(*(send(http, 1, str(index)) for index in range(10)))
+
+        assert api.peak == 10
+        await http.close()
+        await api.close()
+
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import asyncio
+
+from yarl import URL
+
+from discroid.RateLimiter import RateLimiter
+from discroid.Reactions import ReactionPipeline, format_emoji, reaction_route
+
+from .stubs import FakeHTTP, run
+
+
+def test_sequential_awaits_resolve():
+    async def main():
+        http = FakeHTTP()
+        pipeline = ReactionPipeline(http)
+
+        await pipeline.add(1, 2, "a")
+        await pipeline.add(1, 2, "b")
+        await pipeline.remove(1, 2, "a")
+
+        assert [method for method, _ in http.requests] == ["PUT", "PUT", "DELETE"]
+        assert pipeline.pending == 0
+        await pipeline.close()
+
+    run(main())
+
+
+def test_contradicting_operations_collapse():
+    async def main():
+        http = FakeHTTP()
+        pipeline = ReactionPipeline(http)
+
+        first = pipeline.add(1, 2, "x")
+        added = pipeline.add(1, 2, "a")
+        removed = pipeline.remove(1, 2, "a")
+        await asyncio.gather(first, added, removed)
+
+        assert added.result() is None
+        assert http.requests == [
+            ("PUT", "/channels/1/messages/2/reactions/x/@me?location=Message"),
+            ("DELETE", "/channels/1/messages/2/reactions/a/@me?location=Message"),
+        ]
+        await pipeline.close()
+
+    run(main())
+
+
+def test_close_cancels_pending():
+    async def main():
+        pipeline = ReactionPipeline(FakeHTTP())
+        futures = [pipeline.add(1, 2, emoji) for emoji in "abc"]
+        await pipeline.close()
+
+        assert all(future.done() for future in futures)
+        assert pipeline.pending == 0
+
+    run(main())
+
+
+def test_emojis_are_quoted_in_the_route():
+    keycap = reaction_route(1, 2, "#️⃣")
+    assert URL("https://discord.com" + keycap).path == "/channels/1/messages/2/reactions/#️⃣/@me"
+
+    # the fragment used to cut the emoji out, sending the request to another route and bucket
+    route = reaction_route(100000000000000001, 100000000000000002, "#️⃣")
+    assert RateLimiter.get_route_key("PUT", route) == ("PUT /channels/{id}/messages/{id}/reactions/{emoji}/@me", "100000000000000001")
+
+    custom = reaction_route(1, 2, format_emoji("blob", 123456789012345678), user_id=3)
+    assert custom.startswith("/channels/1/messages/2/reactions/blob:123456789012345678/3")
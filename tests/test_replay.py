@@ -0,0 +1,18 @@
+from discroid.Replay import Recorder, read_recording
+
+
+def test_recorder_buffers_frames_until_closed(tmp_path):
+    path = str(tmp_path / "gateway.drpl")
+    frames = [b"\x00" * 100, '{"op": 11}', b"\xff" * 5000]
+
+    recorder = Recorder(path, buffer_size=4096)
+    for frame in frames:
+        recorder.record(frame)
+    recorder.close()
+    # frames received after the client closed the recorder are ignored
+    recorder.record(b"late")
+
+    recorded = list(read_recording(path))
+    assert [frame.data for frame in recorded] == [frames[0], frames[1].encode("utf-8"), frames[2]]
+    assert [frame.binary for frame in recorded] == [True, False, True]
+    assert recorder.is_closed and recorder.frames == 3
@@ -0,0 +1,82 @@
+import asyncio
+
+from discroid.RequestHandler import RequestHandler
+
+from .stubs import StubAPI, run
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.51 Safari/537.36"
+
+
+async def start(**options):
+    api = StubAPI(**options)
+    await api.start()
+    http = RequestHandler(base_route=api.url, response_cache_ttl=0.05)
+    await http.set_headers(token="token", locale="en-US", user_agent=USER_AGENT)
+    return api, http
+
+
+async def stop(api, http):
+    await http.close()
+    await api.close()
+
+
+def test_concurrent_gets_make_one_request():
+    async def main():
+        api, http = await start(latency=0.05)
+
+        channels = await asyncio.gather(*(http.request("GET", "/channels/1") for _ in range(20)))
+        assert [channel["name"] for channel in channels] == ["general"] * 20
+        assert api.requests == [("GET", "/channels/1")]
+
+        # served from the cache while fresh
+        assert (await http.request("GET", "/channels/1"))["name"] == "general"
+        assert len(api.requests) == 1
+        await stop(api, http)
+
+    run(main())
+
+
+def test_a_cancelled_waiter_leaves_the_others_waiting():
+    async def main():
+        api, http = await start(latency=0.05)
+
+        waiters = [asyncio.get_running_loop().create_task(http.request("GET", "/channels/1")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert [channel["name"] for channel in results[1:]] == ["general", "general"]
+        assert len(api.requests) == 1
+        await stop(api, http)
+
+    run(main())
+
+
+def test_an_edit_invalidates_the_cached_get():
+    async def main():
+        api, http = await start()
+
+        assert (await http.request("GET", "/channels/1"))["name"] == "general"
+        await http.request("PATCH", "/channels/1", {"name": "renamed"})
+        assert (await http.request("GET", "/channels/1"))["name"] == "renamed"
+        assert api.requests == [("GET", "/channels/1"), ("PATCH", "/channels/1"), ("GET", "/channels/1")]
+        await stop(api, http)
+
+    run(main())
+
+
+def test_not_modified_returns_the_cached_body():
+    async def main():
+        api, http = await start(etag_on_304=False)
+
+        first = await http.request("GET", "/channels/1")
+        for _ in range(2):
+            # the entry expires and is revalidated, the second time with the ETag kept from before the first 304
+            await asyncio.sleep(0.06)
+            assert await http.request("GET", "/channels/1") == first
+        assert api.not_modified == 2
+        assert len(api.requests) == 3
+        await stop(api, http)
+
+    run(main())
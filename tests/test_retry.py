@@ -0,0 +1,24 @@
+import asyncio
+import errno
+import socket
+
+import aiohttp
+from aiohttp.client_reqrep import ConnectionKey
+
+from discroid.RequestHandler import RetryPolicy
+
+KEY = ConnectionKey("discord.com", 443, True, None, None, None, None)
+
+
+def test_connection_drops_and_timeouts_are_retried():
+    policy = RetryPolicy()
+    assert policy.is_transient(asyncio.TimeoutError())
+    assert policy.is_transient(aiohttp.ServerDisconnectedError())
+    assert policy.is_transient(aiohttp.ClientOSError(errno.ECONNRESET, "Connection reset by peer"))
+    assert policy.is_transient(aiohttp.ClientConnectorError(KEY, ConnectionRefusedError(errno.ECONNREFUSED, "Connection refused")))
+
+
+def test_dns_and_other_os_errors_are_not_retried():
+    policy = RetryPolicy()
+    assert not policy.is_transient(aiohttp.ClientConnectorError(KEY, socket.gaierror(socket.EAI_NONAME, "Name or service not known")))
+    assert not policy.is_transient(OSError(errno.ENOSPC, "No space left on device"))
@@ -0,0 +1,52 @@
+from discroid.Supervisor import HashRing, Supervisor
+
+KEYS = [f"token-{index}" for index in range(5000)]
+
+
+def broken_factory():
+    # module level, the spawned workers import it by name
+    raise RuntimeError("no client")
+
+
+def test_keys_keep_their_node():
+    first, second = HashRing(range(8)), HashRing(range(8))
+    assert [first.get(key) for key in KEYS] == [second.get(key) for key in KEYS]
+    assert len({first.get(key) for key in KEYS}) == 8
+
+
+def test_adding_a_node_moves_about_a_share_of_the_keys():
+    before, after = HashRing(range(8)), HashRing(range(9))
+
+    moved = [key for key in KEYS if before.get(key) != after.get(key)]
+    # every moved key goes to the new node, about 1/9 of them
+    assert all(after.get(key) == 8 for key in moved)
+    assert 0.5 / 9 < len(moved) / len(KEYS) < 1.5 / 9
+
+
+def test_removing_a_node_only_moves_its_keys():
+    before, after = HashRing(range(8)), HashRing(range(7))
+
+    moved = [key for key in KEYS if before.get(key) != after.get(key)]
+    assert all(before.get(key) == 7 for key in moved)
+    assert 0.5 / 8 < len(moved) / len(KEYS) < 1.5 / 8
+
+
+def test_dead_workers_are_restarted():
+    supervisor = Supervisor(broken_factory, ["token"], workers=1, restart_delay=0.0)
+    processes = supervisor._Supervisor__processes
+    try:
+        supervisor.start_worker(0)
+        first = processes[0]
+        first.join(timeout=30)
+        assert first.exitcode != 0
+
+        supervisor.check_workers()  # notices the exit
+        supervisor.check_workers()  # restarts once the delay passed
+        second = processes[0]
+        assert second is not first
+
+        # the new worker ran the factory again
+        second.join(timeout=30)
+        assert second.exitcode != 0
+    finally:
+        supervisor.close()
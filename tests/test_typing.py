@@ -0,0 +1,43 @@
+import asyncio
+
+from discroid.Abstracts import TypingManager
+
+from .stubs import FakeHTTP, run
+
+
+def test_worker_stops_as_soon_as_every_channel_is_released():
+    async def main():
+        http = FakeHTTP()
+        manager = TypingManager(http, interval=60.0)
+
+        manager.acquire(1)
+        await asyncio.sleep(0.01)
+        assert http.triggered == [1]
+
+        worker = manager._TypingManager__task
+        manager.release(1)
+        # the stale entry of the released channel is due in a minute, the worker must not wait for it
+        await asyncio.wait_for(worker, 1)
+        assert manager.channels == []
+        await manager.close()
+
+    run(main())
+
+
+def test_released_channels_are_skipped():
+    async def main():
+        http = FakeHTTP()
+        manager = TypingManager(http, interval=0.05)
+
+        manager.acquire(1)
+        manager.acquire(2)
+        await asyncio.sleep(0.01)
+        manager.release(1)
+        await asyncio.sleep(0.12)
+
+        assert http.triggered.count(1) == 1
+        assert http.triggered.count(2) >= 3
+        manager.release(2)
+        await manager.close()
+
+    run(main())